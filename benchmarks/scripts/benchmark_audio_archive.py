@@ -0,0 +1,99 @@
+"""
+Time a turn spends saving its debug audio: synchronous WAV vs AudioArchiver.
+
+The previous code wrote every utterance with sf.write() before returning the
+transcript; AudioArchiver.save() only copies the clip onto a queue and a
+background thread writes FLAC. Each mode saves NUM_CLIPS utterances of
+CLIP_SECONDS, spaced like turns. A final burst, saved with no spacing,
+shows the drop-on-backpressure policy.
+"""
+import csv
+import shutil
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from voice_assist.utils.audio_archive import AudioArchiver
+
+# --- CONFIG ---
+NUM_CLIPS = 30
+CLIP_SECONDS = 5.0
+SAMPLE_RATE = 16000
+TURN_SPACING = 0.05  # seconds between saves
+BURST = 200  # clips saved back to back at the end
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "audio_archive_benchmark.csv"
+ARCHIVE_DIR = OUTPUT_DIR / "audio_archive"
+
+
+# --- HELPERS ---
+def speech_like(seconds, rate=SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t) ** 2
+    return (0.1 * envelope * (np.sin(2 * np.pi * 150 * t) + 0.02 * rng.standard_normal(len(t)))).astype(np.float32)
+
+
+def legacy_save(directory, audio, i):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sf.write(directory / f"mic_clean_{timestamp}_{i}.wav", audio, SAMPLE_RATE)
+
+
+def time_saves(save, clips):
+    times = []
+    for i, audio in enumerate(clips):
+        start = time.perf_counter()
+        save(audio, i)
+        times.append((time.perf_counter() - start) * 1000)
+        time.sleep(TURN_SPACING)
+    return times
+
+
+def directory_bytes(directory):
+    return sum(p.stat().st_size for p in directory.iterdir())
+
+
+# --- RUN BENCHMARK ---
+def main():
+    clips = [speech_like(CLIP_SECONDS, seed=i) for i in range(NUM_CLIPS)]
+    rows = []
+
+    shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+    legacy_dir = ARCHIVE_DIR / "legacy"
+    legacy_dir.mkdir(parents=True)
+    times = time_saves(lambda audio, i: legacy_save(legacy_dir, audio, i), clips)
+    rows.append({"mode": "sync_wav", "save_p50_ms": statistics.median(times), "save_max_ms": max(times),
+                 "files": len(list(legacy_dir.iterdir())), "mb": directory_bytes(legacy_dir) / 1e6, "dropped": 0})
+
+    archive_dir = ARCHIVE_DIR / "archiver"
+    archive = AudioArchiver(archive_dir, "mic_clean", max_queue=16)
+    times = time_saves(lambda audio, i: archive.save(audio, SAMPLE_RATE), clips)
+    for audio in clips * (BURST // NUM_CLIPS):
+        archive.save(audio, SAMPLE_RATE)
+    archive.close()
+    rows.append({"mode": "archiver_flac", "save_p50_ms": statistics.median(times), "save_max_ms": max(times),
+                 "files": len(list(archive_dir.iterdir())), "mb": directory_bytes(archive_dir) / 1e6,
+                 "dropped": archive.dropped})
+
+    for row in rows:
+        for key in ("save_p50_ms", "save_max_ms", "mb"):
+            row[key] = round(row[key], 2)
+        print(
+            f"{row['mode']:>14}: save p50 {row['save_p50_ms']}ms (max {row['save_max_ms']}ms) | "
+            f"{row['files']} files, {row['mb']} MB | {row['dropped']} dropped"
+        )
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
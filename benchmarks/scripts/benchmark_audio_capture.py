@@ -0,0 +1,136 @@
+"""
+Headless comparison of per-utterance and persistent microphone capture.
+
+The WAVs in data/samples are played back to back, with short pauses, as a
+live fake microphone. Whisper is simulated with a fixed delay after every
+utterance. Per-utterance mode opens a new input stream for each utterance,
+like the transcriber used to, so anything said while transcribing is lost.
+Persistent mode keeps one AudioCapture open and catches up on that audio
+afterwards.
+"""
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from voice_assist.transacription.capture import ArrayInputStream, AudioCapture
+from voice_assist.transacription.config import TranscriberConfig
+from voice_assist.transacription.vad import Endpointer
+
+# --- CONFIG ---
+AUDIO_DIR = Path("data/samples")  # folder containing audio files to test
+SAMPLE_RATE = 16000
+GAP_SECONDS = 1.0  # pause between utterances
+TRANSCRIBE_SECONDS = 1.5  # simulated Whisper time per utterance
+SPEED = 1.0  # playback speed of the fake microphone
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "audio_capture_benchmark.csv"
+
+config = TranscriberConfig(sample_rate=SAMPLE_RATE, silence_duration=0.5, vad="energy")
+
+
+# --- HELPERS ---
+def build_session():
+    pieces, speech = [np.zeros(int(GAP_SECONDS * SAMPLE_RATE))], 0
+    for path in sorted(AUDIO_DIR.glob("*.wav")):
+        audio, rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = audio.mean(axis=1)
+        if rate != SAMPLE_RATE:
+            positions = np.arange(int(len(audio) * SAMPLE_RATE / rate)) * (rate / SAMPLE_RATE)
+            audio = np.interp(positions, np.arange(len(audio)), audio)
+        pieces += [audio, np.zeros(int(GAP_SECONDS * SAMPLE_RATE))]
+        speech += len(audio)
+    return np.concatenate(pieces).astype(np.float32), speech / SAMPLE_RATE
+
+
+def live_source(audio, origin):
+    """Fake device that, like a real one, starts at "now" whenever it is opened."""
+
+    def open_stream(**kwargs):
+        stream = ArrayInputStream(audio, speed=SPEED, **kwargs)
+        stream.position = int((time.perf_counter() - origin) * SAMPLE_RATE * SPEED)
+        return stream
+
+    return open_stream
+
+
+def listen(capture, endpointer, block_size, deadline):
+    """Read one utterance; return its length in seconds, or None at the end."""
+    endpointer.reset()
+    while time.perf_counter() < deadline:
+        if endpointer.read(capture, block_size) == "end":
+            return len(endpointer.audio()) / SAMPLE_RATE
+    return None
+
+
+def run(mode, audio):
+    block_size = int(SAMPLE_RATE * config.block_duration)
+    endpointer = Endpointer(config)
+    origin = time.perf_counter()
+    deadline = origin + (len(audio) / SAMPLE_RATE + 2 * TRANSCRIBE_SECONDS) / SPEED
+    source = live_source(audio, origin)
+    open_seconds = 0.0
+    utterances = []
+
+    capture = AudioCapture(SAMPLE_RATE, input_stream=source) if mode == "persistent" else None
+    while time.perf_counter() < deadline:
+        if mode == "per_utterance":
+            start = time.perf_counter()
+            capture = AudioCapture(SAMPLE_RATE, input_stream=source)
+            open_seconds += time.perf_counter() - start
+
+        seconds = listen(capture, endpointer, block_size, deadline)
+
+        if mode == "per_utterance":
+            start = time.perf_counter()
+            capture.close()
+            open_seconds += time.perf_counter() - start
+        if seconds is None:
+            break
+        utterances.append(seconds)
+        time.sleep(TRANSCRIBE_SECONDS / SPEED)  # Whisper
+
+    if mode == "persistent":
+        capture.close()
+    return utterances, open_seconds
+
+
+# --- RUN BENCHMARK ---
+def main():
+    audio_files = sorted(AUDIO_DIR.glob("*.wav"))
+    if not audio_files:
+        print(f"No audio files found in {AUDIO_DIR}")
+        return
+    audio, speech_seconds = build_session()
+
+    rows = []
+    for mode in ("per_utterance", "persistent"):
+        utterances, open_seconds = run(mode, audio)
+        row = {
+            "capture": mode,
+            "utterances": len(utterances),
+            "expected_utterances": len(audio_files),
+            "captured_speech_s": round(sum(utterances), 2),
+            "source_speech_s": round(speech_seconds, 2),
+            "device_open_close_ms": round(open_seconds * 1000, 2),
+        }
+        rows.append(row)
+        print(
+            f"{mode:>13}: {row['utterances']}/{row['expected_utterances']} utterances | "
+            f"captured {row['captured_speech_s']}s of {row['source_speech_s']}s speech | "
+            f"device open/close {row['device_open_close_ms']}ms"
+        )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import csv
+import pickle
+import statistics
+import time
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+from voice_assist.utils.shared_audio import SharedAudioRing
+
+# --- CONFIG ---
+SAMPLE_RATE = 24000
+SENTENCE_SECONDS = [1, 5, 15]  # lengths of synthesized sentences to send
+MESSAGES = 50  # buffers sent per run
+INTERVAL = 0.05  # pause between sends so latency excludes queueing
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "audio_transport_benchmark.csv"
+
+
+# --- CONSUMERS ---
+def manager_consumer(q, results):
+    latencies = []
+    for _ in range(MESSAGES):
+        samples, samplerate, timestamp = q.get()
+        latencies.append(time.monotonic() - timestamp)
+    results.put(latencies)
+
+
+def ring_consumer(ring, results):
+    latencies = []
+    for _ in range(MESSAGES):
+        frame = ring.get()
+        latencies.append(time.monotonic() - frame.timestamp)
+        ring.release(frame)
+    results.put(latencies)
+
+
+# --- TRANSPORTS ---
+def run_manager(samples):
+    with multiprocessing.Manager() as manager:
+        q = manager.Queue()
+        results = multiprocessing.Queue()
+        consumer = multiprocessing.Process(target=manager_consumer, args=(q, results))
+        consumer.start()
+        for _ in range(MESSAGES):
+            q.put((samples, SAMPLE_RATE, time.monotonic()))
+            time.sleep(INTERVAL)
+        latencies = results.get()
+        consumer.join()
+
+    # Pickled by the producer, unpickled by the manager, pickled again on get
+    # and unpickled by the consumer
+    payload = len(pickle.dumps(samples, protocol=pickle.HIGHEST_PROTOCOL))
+    return latencies, 4 * payload
+
+
+def run_ring(samples):
+    slot_bytes = samples.nbytes
+    ring = SharedAudioRing(n_slots=8, slot_bytes=slot_bytes)
+    results = multiprocessing.Queue()
+    consumer = multiprocessing.Process(target=ring_consumer, args=(ring, results))
+    consumer.start()
+    for _ in range(MESSAGES):
+        ring.put(samples, SAMPLE_RATE, time.monotonic())
+        time.sleep(INTERVAL)
+    latencies = results.get()
+    consumer.join()
+    copied = ring.bytes_copied // MESSAGES
+    ring.close()
+    return latencies, copied
+
+
+def summarize(name, seconds, latencies, bytes_copied):
+    ms = [l * 1000 for l in latencies]
+    return {
+        "transport": name,
+        "sentence_s": seconds,
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(statistics.quantiles(ms, n=20)[-1], 3),
+        "max_ms": round(max(ms), 3),
+        "bytes_copied_per_msg": bytes_copied,
+    }
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    for seconds in SENTENCE_SECONDS:
+        samples = np.random.default_rng(0).uniform(
+            -0.5, 0.5, SAMPLE_RATE * seconds
+        ).astype(np.float32)
+        print(f"\n=== {seconds}s sentence ({samples.nbytes / 1e6:.2f} MB) ===")
+
+        for name, run in (("manager_queue", run_manager), ("shared_ring", run_ring)):
+            latencies, copied = run(samples)
+            row = summarize(name, seconds, latencies, copied)
+            rows.append(row)
+            print(
+                f"{name:>14}: p50 {row['p50_ms']}ms | p95 {row['p95_ms']}ms | "
+                f"{copied / 1e6:.2f} MB copied per hop"
+            )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
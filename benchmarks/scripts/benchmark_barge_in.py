@@ -0,0 +1,207 @@
+"""
+Device-free barge-in harness for the multiprocess pipeline.
+
+Starts a reply with long sentences, then begins a new turn (as the
+transcriber does on detected speech), either while the first sentence is
+playing or while the LLM is still evaluating the prompt. Measures how long
+it takes to stop playback and to abort generation, and how many synthesis
+jobs still ran for the cancelled turn. Generation is the real
+sentence_streamer / AI_AGENT.stream_query path against the local stub
+Ollama server (mock_ollama.py); only synthesis and the sound device are
+stubbed. Uses the fork start method so the patched module globals reach
+the children.
+"""
+import csv
+import statistics
+import time
+import multiprocessing
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import voice_assist.pipelines.multiprocess_pipeline as pipeline
+from mock_ollama import MockOllamaServer
+from voice_assist.llm.ai_agent import AI_AGENT
+from voice_assist.utils.shared_audio import SharedAudioRing
+from voice_assist.utils.turns import TurnTracker
+from voice_assist.voice.playback import AudioOutput, NullOutputStream
+
+# --- CONFIG ---
+TRIALS = 10
+SENTENCES = 20  # sentences in each (interrupted) reply
+TOKENS_PER_SECOND = 20.0  # stub Ollama; three words per sentence
+FIRST_TOKEN_DELAY = 0.2  # stub Ollama, when barging in during playback
+PROMPT_EVAL_DELAY = 2.0  # stub Ollama, when barging in before the first token
+BARGE_DURING_PROMPT = 0.05  # seconds after the transcript is sent
+SYNTH_DELAY = 0.1  # seconds per synthesized sentence
+AUDIO_SECONDS = 3.0  # length of each synthesized sentence
+BARGE_AFTER = 0.5  # seconds of playback before the user speaks
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "barge_in_benchmark.csv"
+
+ctx = multiprocessing.get_context("fork")
+events = ctx.Queue()  # (event, time) from the stubs
+
+
+# --- STUBS ---
+REPLY = " ".join(f"Sentence number {i}." for i in range(SENTENCES))
+real_sentence_streamer = pipeline.sentence_streamer
+
+
+def timed_sentence_streamer(*args, **kwargs):
+    """The real streamer, reporting when it returns (finished or aborted)."""
+    real_sentence_streamer(*args, **kwargs)
+    events.put(("llm_done", time.time()))
+
+
+class StubVocalizer:
+    def __init__(self, engine="kokoro", cache=None, kokoro_threads=0):
+        self.engine = engine
+        self.cache = cache
+
+    def prewarm(self, phrases):
+        return 0
+
+    def create_audio(self, text):
+        events.put(("synth", time.time()))
+        time.sleep(SYNTH_DELAY)
+        return np.zeros(int(24000 * AUDIO_SECONDS), dtype=np.float32), 24000
+
+    def create_audio_stream(self, text):
+        yield self.create_audio(text)
+
+
+class RecordingOutput(AudioOutput):
+    """AudioOutput on a NullOutputStream that reports play() and clear() calls."""
+
+    def play(self, samples, samplerate, **meta):
+        events.put(("play", time.time()))
+        return super().play(samples, samplerate, **meta)
+
+    def clear(self):
+        stopped = super().clear()
+        events.put(("stop", stopped))  # when the output falls silent
+        return stopped
+
+
+pipeline.sentence_streamer = timed_sentence_streamer
+pipeline.AI_AGENT = partial(AI_AGENT, context_file=str(OUTPUT_DIR / "barge_in_context.jsonl"))
+pipeline.Vocalizer = StubVocalizer
+pipeline.AudioOutput = RecordingOutput
+pipeline.OUTPUT_STREAM = NullOutputStream
+pipeline.PHRASE_CACHE_DIR = None  # memory only
+pipeline.OUTPUT_DIR = Path("benchmarks/results/barge_in_audio")
+pipeline.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+# --- HELPERS ---
+def drain():
+    while True:
+        try:
+            yield events.get(timeout=AUDIO_SECONDS)
+        except Exception:
+            return
+
+
+def interrupt_once(transcribe_queue, turns, during_playback):
+    transcribe_queue.put(("final", "tell me a long story", time.time(), turns.begin()))
+    if during_playback:
+        while events.get(timeout=30)[0] != "play":
+            pass
+        time.sleep(BARGE_AFTER)
+    else:
+        time.sleep(BARGE_DURING_PROMPT)
+
+    barge = time.time()
+    turns.begin()
+    stop = abort = None
+    late_synths = 0
+    for name, at in drain():
+        if name == "stop" and stop is None:
+            stop = at - barge
+        elif name == "llm_done" and abort is None and at > barge:
+            abort = at - barge
+        elif name == "synth" and at > barge:
+            late_synths += 1
+        elif name == "play" and at > barge:
+            raise RuntimeError("cancelled reply kept playing")
+    return stop, abort, late_synths
+
+
+def ms(values):
+    values = [v * 1000 for v in values if v is not None]
+    return (round(statistics.median(values), 1), round(max(values), 1)) if values else (None, None)
+
+
+# --- RUN BENCHMARK ---
+def main():
+    (OUTPUT_DIR / "barge_in_context.jsonl").unlink(missing_ok=True)
+    server = MockOllamaServer([REPLY], tokens_per_second=TOKENS_PER_SECOND).start()  # before forking: sets OLLAMA_HOST
+    running = ctx.Event()
+    running.set()
+    turns = TurnTracker()
+    transcribe_queue, llm_queue = ctx.Queue(), ctx.Queue()
+    audio_ring, playback_ring = SharedAudioRing(), SharedAudioRing(n_slots=8)
+    procs = [
+        ctx.Process(target=pipeline.llm_process, args=(transcribe_queue, llm_queue, running, turns)),
+        ctx.Process(target=pipeline.voice_synthesizer, args=(llm_queue, audio_ring, running, turns)),
+        ctx.Process(target=pipeline.audio_playback, args=(audio_ring, playback_ring, running, turns)),
+    ]
+    rows = []
+    try:
+        for p in procs:
+            p.start()
+        for scenario, first_token_delay, during_playback in (
+            ("during_playback", FIRST_TOKEN_DELAY, True),
+            ("during_prompt_eval", PROMPT_EVAL_DELAY, False),
+        ):
+            server.first_token_delay = first_token_delay
+            stops, aborts, synths = [], [], []
+            for _ in range(TRIALS):
+                stop, abort, late_synths = interrupt_once(transcribe_queue, turns, during_playback)
+                playback_ring.clear()
+                stops.append(stop)
+                aborts.append(abort)
+                synths.append(late_synths)
+            (stop_p50, stop_max), (abort_p50, abort_max) = ms(stops), ms(aborts)
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "playback_stop_p50_ms": stop_p50,
+                    "playback_stop_max_ms": stop_max,
+                    "llm_abort_p50_ms": abort_p50,
+                    "llm_abort_max_ms": abort_max,
+                    "synth_jobs_after_barge_in": round(statistics.mean(synths), 1),
+                }
+            )
+    finally:
+        for p in procs:
+            p.terminate()
+            p.join()
+        audio_ring.close()
+        playback_ring.close()
+        server.stop()
+
+    for row in rows:
+        print(
+            f"{row['scenario']:>18}: playback stopped "
+            + (
+                f"p50 {row['playback_stop_p50_ms']}ms (max {row['playback_stop_max_ms']}ms)"
+                if row["playback_stop_p50_ms"] is not None
+                else "n/a (nothing playing yet)"
+            )
+            + f" | generation aborted p50 {row['llm_abort_p50_ms']}ms "
+            f"(max {row['llm_abort_max_ms']}ms) | synthesis jobs after barge-in {row['synth_jobs_after_barge_in']}"
+        )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from voice_assist.utils.context_manager import ContextManager
+
+# --- CONFIG ---
+HISTORY_SIZES = [100, 1_000, 10_000, 100_000]  # messages already stored
+LEGACY_MAX_HISTORY = 10_000  # full-file rewrites get too slow to measure beyond this
+TURNS = 50  # measured turns: user message, history fetch, assistant message
+MESSAGE = "This is a typical sentence from a conversation with the assistant."
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "context_store_benchmark.csv"
+
+
+class LegacyContextManager:
+    """The previous ContextManager: rewrite the whole JSON file on every change."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._data = {}
+
+    def _save_file(self, data):
+        with open(self.file_path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def add_message(self, user_id, role, content):
+        self._data.setdefault(user_id, []).append({"role": role, "content": content})
+        self._save_file(self._data)
+
+    def get_history(self, user_id):
+        with open(self.file_path, "r") as f:
+            self._data = json.load(f)
+        return self._data.get(user_id, [])
+
+    def flush(self):
+        pass
+
+
+# --- HELPERS ---
+def prefill_legacy(manager, n):
+    for _ in range(n):
+        manager._data.setdefault("user", []).append({"role": "user", "content": MESSAGE})
+    manager._save_file(manager._data)
+
+
+def time_turns(manager):
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        manager.add_message("user", "user", MESSAGE)
+        manager.get_history("user")
+        manager.add_message("user", "assistant", MESSAGE)
+    manager.flush()  # include the deferred writes
+    return (time.perf_counter() - start) / (2 * TURNS)
+
+
+def run_legacy(workdir, n):
+    manager = LegacyContextManager(os.path.join(workdir, "legacy.json"))
+    prefill_legacy(manager, n)
+    return time_turns(manager)
+
+
+def run_journal(workdir, n):
+    path = os.path.join(workdir, "context.jsonl")
+    seed = ContextManager(path)
+    for _ in range(n):
+        seed.add_message("user", "user", MESSAGE)
+    seed.close()
+
+    manager = ContextManager(path)
+    per_message = time_turns(manager)
+    manager.close()
+    return per_message
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    for n in HISTORY_SIZES:
+        print(f"\n=== {n:,} messages of history ===")
+        for name, run in (("json_rewrite", run_legacy), ("jsonl_journal", run_journal)):
+            if name == "json_rewrite" and n > LEGACY_MAX_HISTORY:
+                continue
+            workdir = tempfile.mkdtemp()
+            try:
+                per_message = run(workdir, n)
+            finally:
+                shutil.rmtree(workdir)
+            rows.append({"store": name, "history": n, "per_message_ms": round(per_message * 1000, 4)})
+            print(f"{name:>14}: {per_message * 1000:.4f} ms per message")
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
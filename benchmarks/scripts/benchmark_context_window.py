@@ -0,0 +1,95 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from voice_assist.utils.context_manager import ContextManager, ContextWindow, message_tokens
+
+# --- CONFIG ---
+TURNS = 500
+CHECKPOINTS = [5, 50, 500]  # turns at which the stub LLM is actually called
+NUM_CTX = 4096
+PROMPT_EVAL_S_PER_TOKEN = 0.00002  # stub prompt evaluation cost (50k tokens/s)
+USER_MESSAGE = "Can you remind me what we said about the project deadline and the budget for next week?"
+ASSISTANT_MESSAGE = (
+    "Sure. We agreed the deadline moves to Friday, the budget stays the same, "
+    "and you wanted a reminder to email the team on Thursday morning."
+)
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "context_window_benchmark.csv"
+
+
+# --- STUB LLM ---
+def stub_chat(messages):
+    """Latency grows with the prompt like CPU prompt evaluation does."""
+    prompt_tokens = sum(message_tokens(m) for m in messages)
+    time.sleep(prompt_tokens * PROMPT_EVAL_S_PER_TOKEN)
+    return prompt_tokens
+
+
+def stub_summarizer(summary, messages):
+    text = summary + " " + " ".join(m["content"] for m in messages)
+    return text[-400:]  # a bounded-length "summary"
+
+
+# --- HELPERS ---
+def run(mode, workdir):
+    manager = ContextManager(os.path.join(workdir, f"{mode}.jsonl"))
+    manager.add_message("user", "system", "You are a helpful desktop voice assistant.")
+    window = ContextWindow(manager, max_tokens=NUM_CTX, summarizer=stub_summarizer)
+
+    rows = []
+    previous = []
+    prefix_kept = 0  # turns whose prompt starts with the previous prompt, so Ollama reuses its cache
+    for turn in range(1, TURNS + 1):
+        manager.add_message("user", "user", f"{USER_MESSAGE} ({turn})")  # numbered so no two prompts look alike
+        messages = window.build("user") if mode == "windowed" else list(manager.get_history("user"))
+        prefix_kept += messages[:len(previous)] == previous
+        previous = messages
+        if turn in CHECKPOINTS:
+            start = time.perf_counter()
+            prompt_tokens = stub_chat(messages)
+            latency = time.perf_counter() - start
+            rows.append({
+                "mode": mode,
+                "turn": turn,
+                "prompt_tokens": prompt_tokens,
+                "turn_latency_ms": round(latency * 1000, 2),
+                "prefix_kept_pct": round(100 * prefix_kept / turn, 1),
+            })
+            print(
+                f"{mode:>12} turn {turn:>3}: {prompt_tokens:>6} prompt tokens | {latency * 1000:8.2f} ms"
+                f" | prefix kept on {100 * prefix_kept / turn:5.1f}% of turns"
+            )
+        manager.add_message("user", "assistant", f"{ASSISTANT_MESSAGE} ({turn})")
+        if mode == "windowed":
+            window.schedule_summary("user")
+            time.sleep(0.001)  # let the background summary land between turns
+
+    manager.close()
+    return rows
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    for mode in ("full_history", "windowed"):
+        workdir = tempfile.mkdtemp()
+        try:
+            rows.extend(run(mode, workdir))
+        finally:
+            shutil.rmtree(workdir)
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Offline evaluation of the echo canceller on synthetic mixed signals.
+
+The WAVs in data/samples play as the assistant's reply through a simulated
+speaker: 24 kHz playback, output latency, a decaying room response, and
+background hiss at the microphone. Partway through the reply the user
+barges in, and they speak again once it has finished. The microphone is
+fed through AudioCapture in 10 ms device callbacks. The reply is published
+to a playback ring the way the playback stage does it. The Endpointer then
+reads 100 ms blocks through EchoCancelledInput, as the transcriber does.
+
+For each condition it reports:
+- echo reduction (ERLE), early on and once converged
+- how clean the user's speech comes out during double talk, and after
+- how often the VAD starts an utterance on the assistant's own voice, and
+  how soon it notices the user barging in
+- CPU time per 100 ms read
+The lead times place the reference earlier than the real playback start,
+as unaccounted device latency would, to show how much the filter tail absorbs.
+"""
+import csv
+import queue
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from voice_assist.transacription.capture import AudioCapture
+from voice_assist.transacription.config import TranscriberConfig
+from voice_assist.transacription.echo import EchoCancelledInput
+from voice_assist.transacription.resample import Resampler, load_audio, resample
+from voice_assist.transacription.vad import Endpointer
+from voice_assist.utils.shared_audio import AudioFrame
+
+# --- CONFIG ---
+AUDIO_DIR = Path("data/samples")  # folder containing audio files to test
+DEVICE_RATE = 24000  # microphone and speaker rate
+PLAYBACK_START = 1.0  # seconds into the session the reply starts
+DOUBLE_TALK_AT = 0.7  # fraction of the reply after which the user barges in
+NEAR_END_GAP = 3.0  # pause between the end of the reply and the user speaking again
+OUTPUT_LATENCY = 0.06  # speaker buffering before sound leaves the device
+ROOM_DECAY = 0.03  # reverberation time constant (seconds)
+ECHO_GAIN = 0.5  # speaker-to-microphone level
+NEAR_GAIN = 0.5  # user's level at the microphone, relative to the samples
+LEADS = [0.0, 0.1, 0.2]  # extra, unmodelled latency (seconds); the tail covers 0.3
+SEED = 0
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "echo_cancellation_benchmark.csv"
+
+config = TranscriberConfig(sample_rate=DEVICE_RATE)
+
+
+# --- HELPERS ---
+class IdleStream:
+    """Input stream that never calls back; the benchmark drives the callback."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ListRing:
+    """In-process stand-in for the playback SharedAudioRing."""
+
+    def __init__(self):
+        self.frames = queue.Queue()
+
+    def put(self, samples, samplerate, timestamp, **meta):
+        self.frames.put(AudioFrame(samples, samplerate, timestamp, meta=meta))
+
+    def get_nowait(self):
+        return self.frames.get_nowait()
+
+    def release(self, frame):
+        pass
+
+
+class Tap:
+    """Records everything read through an input, for whole-session metrics."""
+
+    def __init__(self, source):
+        self.source = source
+        self.output = []
+        self.read_seconds = []
+
+    def read_into(self, out):
+        start = time.process_time()
+        overflowed = self.source.read_into(out)
+        self.read_seconds.append(time.process_time() - start)
+        self.output.append(out.copy())
+        return overflowed
+
+
+def build_session():
+    rng = np.random.default_rng(SEED)
+    files = sorted(AUDIO_DIR.glob("*.wav"))
+    reply = np.concatenate([load_audio(f, DEVICE_RATE) for f in files[1:]])
+    near = load_audio(files[0], DEVICE_RATE) * NEAR_GAIN
+
+    n = int(DEVICE_RATE * ROOM_DECAY * 5)
+    room = rng.normal(size=n) * np.exp(-np.arange(n) / (ROOM_DECAY * DEVICE_RATE))
+    room *= ECHO_GAIN / np.sqrt(np.sum(room**2))
+    path = np.concatenate([np.zeros(int(OUTPUT_LATENCY * DEVICE_RATE)), room])
+
+    play_at = int(PLAYBACK_START * DEVICE_RATE)
+    talk_at = play_at + int(DOUBLE_TALK_AT * len(reply))
+    again_at = play_at + len(reply) + int(NEAR_END_GAP * DEVICE_RATE)
+    total = again_at + len(near) + 2 * DEVICE_RATE
+
+    echo = np.zeros(total)
+    echo[play_at : play_at + len(reply) + len(path) - 1] = np.convolve(reply, path)
+    user = np.zeros(total)
+    user[talk_at : talk_at + len(near)] += near
+    user[again_at : again_at + len(near)] += near
+    mic = echo + user + rng.normal(0, 0.001, total)
+
+    regions = {
+        "echo": (play_at, talk_at),
+        "double_talk": (talk_at, min(talk_at + len(near), play_at + len(reply))),
+        "near_end": (again_at, again_at + len(near)),
+    }
+    return mic.astype(np.float32), echo, user, reply.astype(np.float32), play_at, regions
+
+
+def run(mic, reply, play_at, lead, cancel):
+    capture = AudioCapture(DEVICE_RATE, seconds=5, input_stream=IdleStream, rate=config.model_rate)
+    ring = ListRing()
+    tap = Tap(EchoCancelledInput(capture, ring, tail=config.echo_tail, step=config.echo_step) if cancel else capture)
+    endpointer = Endpointer(config)
+    chunk = DEVICE_RATE // 100
+    block_size = int(config.model_rate * config.block_duration)
+    starts = []
+
+    for i in range(0, len(mic) - chunk + 1, chunk):
+        capture._callback(mic[i : i + chunk, None], chunk, None, None)
+        if i + chunk == play_at:
+            # Playback starts right after this callback
+            ring.put(reply, DEVICE_RATE, 0.0, started=capture._clock[0] - lead)
+        while capture.available >= block_size:
+            event = endpointer.read(tap, block_size)
+            if event == "start":
+                starts.append(capture.position / config.model_rate)
+            elif event == "end":
+                endpointer.reset()
+    capture.close()
+    return np.concatenate(tap.output), starts, tap.read_seconds, getattr(tap.source, "canceller", None)
+
+
+def db(a, b):
+    return float(10 * np.log10(np.sum(a**2) / max(np.sum(b**2), 1e-20)))
+
+
+# --- RUN BENCHMARK ---
+def main():
+    if len(list(AUDIO_DIR.glob("*.wav"))) < 2:
+        print(f"Need at least two audio files in {AUDIO_DIR}")
+        return
+    mic, echo, user, reply, play_at, regions = build_session()
+    rate = config.model_rate
+    to_model = lambda x: resample(x, DEVICE_RATE, rate)
+    mic16, echo16, user16 = to_model(mic), to_model(echo), to_model(user)
+    span = lambda name: slice(*(int(t * rate / DEVICE_RATE) for t in regions[name]))
+
+    conditions = [("off", 0.0)] + [("aec", lead) for lead in LEADS]
+    rows = []
+    for mode, lead in conditions:
+        out, starts, reads, canceller = run(mic, reply, play_at, lead, cancel=mode == "aec")
+        out = out[int(round(Resampler(DEVICE_RATE, rate).delay)) :]  # capture resampler delay
+        n = min(len(out), len(mic16))
+        out, m, e, u = out[:n], mic16[:n], echo16[:n], user16[:n]
+
+        # The echo region has no user speech, so all of it counts as residual echo
+        echo_span = span("echo")
+        first = slice(echo_span.start, echo_span.start + 3 * rate)
+        last = slice(echo_span.stop - 5 * rate, echo_span.stop)
+        user_spans = [span("double_talk"), span("near_end")]
+        in_user = lambda t: any(s.start / rate - 0.5 <= t <= s.stop / rate for s in user_spans)
+
+        dt, ne = span("double_talk"), span("near_end")
+        barge_in = [t for t in starts if dt.start / rate <= t <= dt.stop / rate]
+        row = {
+            "aec": mode,
+            "reference_lead_ms": round(lead * 1000),
+            "erle_first_3s_db": round(db(m[first], out[first]), 1),
+            "erle_converged_db": round(db(m[last], out[last]), 1),
+            "double_talk_user_snr_db": round(db(u[dt], out[dt] - u[dt]), 1),
+            "near_end_user_snr_db": round(db(u[ne], out[ne] - u[ne]), 1),
+            "false_starts": sum(not in_user(t) for t in starts),
+            "user_starts": sum(in_user(t) for t in starts),
+            "barge_in_detected_after_s": round(barge_in[0] - dt.start / rate, 2) if barge_in else None,
+            "read_ms_mean": round(statistics.mean(reads) * 1000, 3),
+            "read_ms_p95": round(np.percentile(reads, 95) * 1000, 3),
+            "read_ms_max": round(max(reads) * 1000, 3),  # includes resampling a newly played buffer
+        }
+        rows.append(row)
+        print(
+            f"{mode:>3} lead {row['reference_lead_ms']:>3}ms: ERLE {row['erle_first_3s_db']}dB first 3s, "
+            f"{row['erle_converged_db']}dB converged | user SNR {row['double_talk_user_snr_db']}dB double talk, "
+            f"{row['near_end_user_snr_db']}dB alone | VAD starts on echo {row['false_starts']}, "
+            f"on user {row['user_starts']}, barge-in after {row['barge_in_detected_after_s']}s | "
+            f"{row['read_ms_mean']}ms (p95 {row['read_ms_p95']}ms) per 100ms read"
+        )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
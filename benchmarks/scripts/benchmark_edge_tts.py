@@ -0,0 +1,111 @@
+"""
+Edge TTS first-audio latency against a local mock of the service.
+
+Compares the previous Edge path (asyncio.run() per sentence, MP3 written
+to a temporary file, read back with soundfile) with the Vocalizer's event
+loop thread, which decodes MP3 in memory as it streams in. The mock server
+(mock_edge_tts.py) waits FIRST_AUDIO_DELAY before streaming audio at
+SPEED times real time, so the remaining difference is client overhead plus
+how early audio can start playing.
+"""
+import asyncio
+import csv
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import soundfile as sf
+from edge_tts import Communicate
+
+from mock_edge_tts import MockEdgeServer
+from voice_assist.voice.voice_synth import Vocalizer
+
+# --- CONFIG ---
+SENTENCES = [
+    "Sure, I can help with that.",
+    "Opening Spotify now.",
+    "Let me know if you want anything else.",
+    "Black holes are regions of space-time where the gravitational force is so strong that even light cannot escape.",
+]
+NUM_RUNS = 5
+FIRST_AUDIO_DELAY = 0.15  # service time before the first audio message
+SPEED = 5.0  # how much faster than real time the service streams
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "edge_tts_benchmark.csv"
+
+
+# --- PREVIOUS IMPLEMENTATION (for comparison) ---
+async def legacy_edge_tts_to_file(text, filename, voice):
+    communicate = Communicate(text, voice)
+    with open(filename, "wb") as out:
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                out.write(chunk["data"])
+
+
+def legacy_edge_tts_to_buffer(text, voice):
+    tmpfile = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    tmpfile.close()
+    asyncio.run(legacy_edge_tts_to_file(text, tmpfile.name, voice))
+    data, sample_rate = sf.read(tmpfile.name, dtype="int16")
+    os.remove(tmpfile.name)
+    return data, sample_rate
+
+
+# --- HELPERS ---
+def run_legacy(vocalizer, text):
+    start = time.perf_counter()
+    samples, rate = legacy_edge_tts_to_buffer(text, vocalizer.edge_voice)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(samples) / rate
+
+
+def run_streamed(vocalizer, text):
+    start = time.perf_counter()
+    first, frames = None, 0
+    for samples, rate in vocalizer.create_audio_stream(text):
+        first = first or time.perf_counter() - start
+        frames += len(samples)
+    return first, time.perf_counter() - start, frames / rate
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    with MockEdgeServer(first_audio_delay=FIRST_AUDIO_DELAY, speed=SPEED) as server:
+        vocalizer = Vocalizer(engine="edge")
+        for mode, run in (("legacy", run_legacy), ("streamed", run_streamed)):
+            for text in SENTENCES:
+                results = [run(vocalizer, text) for _ in range(NUM_RUNS)]
+                first, total, audio = (statistics.median(r[i] for r in results) for i in range(3))
+                row = {
+                    "mode": mode,
+                    "sentence": text,
+                    "audio_s": round(audio, 2),
+                    "first_audio_s": round(first, 3),
+                    "total_s": round(total, 3),
+                }
+                rows.append(row)
+                print(
+                    f"{mode:>8}: first audio {row['first_audio_s']}s, done {row['total_s']}s "
+                    f"for {row['audio_s']}s of audio | {text[:40]}"
+                )
+        vocalizer.close()
+        print(f"\nMock service handled {len(server.requests)} requests")
+
+    for mode in ("legacy", "streamed"):
+        firsts = [r["first_audio_s"] for r in rows if r["mode"] == mode]
+        print(f"{mode:>8}: median first audio {statistics.median(firsts)}s")
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import csv
+import statistics
+import time
+from pathlib import Path
+
+from ollama import Client
+
+# --- CONFIG ---
+MODEL = "llama3.1:8b"
+HOST = None  # default Ollama host, or e.g. a local stub server
+NUM_CTX = 4096
+TRIALS = 3
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful desktop voice assistant. Keep answers short."},
+    {"role": "user", "content": "What's a good way to start my morning?"},
+]
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "llm_warmup_benchmark.csv"
+
+
+# --- HELPERS ---
+def unload(client):
+    """Evict the model so the next request pays the full load time."""
+    client.generate(model=MODEL, prompt="", keep_alive=0)
+    time.sleep(1)
+
+
+def first_token_latency(client, keep_alive=-1):
+    """Seconds until the first streamed token, plus Ollama's reported load time."""
+    start = time.perf_counter()
+    ttft, load = None, 0.0
+    for part in client.chat(
+        model=MODEL,
+        messages=MESSAGES,
+        stream=True,
+        options={"num_ctx": NUM_CTX, "temperature": 0},
+        keep_alive=keep_alive,
+    ):
+        if ttft is None and part["message"]["content"]:
+            ttft = time.perf_counter() - start
+        if part.get("done"):
+            load = (part.get("load_duration") or 0) / 1e9
+    return ttft, load
+
+
+# --- RUN BENCHMARK ---
+def main():
+    pooled = Client(host=HOST)
+
+    def cold():
+        # Previous behaviour: the first turn loads the model
+        unload(pooled)
+        return first_token_latency(pooled)
+
+    def warm_new_client():
+        # Model already resident, fresh client (new connection) per request
+        return first_token_latency(Client(host=HOST))
+
+    def warm_pooled_client():
+        # Long-lived agent: pinned model, reused connection
+        return first_token_latency(pooled)
+
+    scenarios = {
+        "cold": cold,
+        "warm_new_client": warm_new_client,
+        "warm_pooled_client": warm_pooled_client,
+    }
+
+    rows = []
+    for name, run in scenarios.items():
+        ttfts, loads = [], []
+        for _ in range(TRIALS):
+            ttft, load = run()
+            ttfts.append(ttft)
+            loads.append(load)
+        row = {
+            "scenario": name,
+            "ttft_mean_s": round(statistics.mean(ttfts), 3),
+            "ttft_min_s": round(min(ttfts), 3),
+            "load_mean_s": round(statistics.mean(loads), 3),
+        }
+        rows.append(row)
+        print(
+            f"{name:>18}: first token {row['ttft_mean_s']}s (min {row['ttft_min_s']}s) | "
+            f"model load {row['load_mean_s']}s"
+        )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Compare Ollama models for the assistant's LLM stage.
+
+Every request is streamed like AI_AGENT.chat_stream, with the assistant's
+system prompt and tool schemas and a scripted conversation history, and
+records:
+
+- time to first token (first content or tool call), seen by the client;
+- Ollama's own load_duration, prompt_eval_* and eval_* fields, so load
+  time, prompt processing and generation speed are kept apart (eval
+  tokens per second is eval_count / eval_duration);
+- whether the request was cold (the model had just been unloaded) or warm.
+
+For each model, BASE is varied one setting at a time across SWEEPS: prompt
+length (history turns), num_ctx, num_thread and parallel requests. Each
+setting starts with one cold request, then runs TRIALS warm rounds of
+`parallel` concurrent requests. How many Ollama serves at once depends on
+its OLLAMA_NUM_PARALLEL setting. Warm requests share the system prompt
+and history, so Ollama reuses their cached prefix, as it does for the
+assistant.
+
+Every request goes to model_benchmarks_requests.csv, per-setting summaries
+to model_benchmarks.csv, and those plus the system info and a ranking of
+the models at BASE to model_benchmarks.json. STUB = True runs against
+mock_ollama.MockOllamaServer instead, to check the benchmark without
+Ollama or any model.
+"""
+import csv
+import json
+import platform
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import psutil
+from ollama import Client
+
+from mock_ollama import MockOllamaServer
+from voice_assist.llm.ai_agent import PROMPT
+from voice_assist.tools.tools import TOOLS
+from voice_assist.utils.context_manager import ContextWindow
+
+# --- CONFIG ---
+STUB = False  # True: local stub server instead of Ollama
+HOST = None  # None: OLLAMA_HOST, else the local Ollama
+
+# List of base models (without specifying quant tag)
+MODELS = [
+    "mistral-nemo:12b",
+    "llama3",
+    "llama3.1:8b",
+    "qwen3:0.6b",
+    "qwen2.5:1.5b-instruct",
+    "gemma2:2b",
+    "tinyllama",
+    "llama3.2:1b",
+    "llama3.2:3b",
+    "phi3:mini",
+    "phi4-mini:3.8b",
+]
+
+QUESTIONS = [
+    "Open Spotify and play something relaxing.",
+    "What could I cook tonight with rice, eggs and spinach?",
+    "Remind me what we decided for Wednesday?",
+]
+HISTORY = [  # (user, assistant) turns, repeated for longer prompts
+    ("Hey, can you open Chrome?", "Opening Chrome now."),
+    (
+        "What's the weather usually like in Lisbon in May?",
+        "Lisbon in May is usually sunny and mild, around twenty to twenty five degrees, with little rain.",
+    ),
+    (
+        "Nice. We're thinking of going for a week with the kids.",
+        "That sounds lovely. A week gives you time for the old town, the waterfront at Belem "
+        "and a day trip to Sintra, which kids usually enjoy.",
+    ),
+    (
+        "Is Sintra far?",
+        "About forty minutes by train from Rossio station. Trains run often, so there's no need to book.",
+    ),
+    ("Okay, let's plan that for the Wednesday.", "Got it, Sintra on Wednesday. Anything else for the trip?"),
+    ("Play some music while I pack.", "Playing music on Spotify."),
+]
+SUMMARY = "The user is planning a week in Lisbon in May with their kids, with a day trip to Sintra on Wednesday."
+PROMPTS = {"short": 0, "medium": 6, "long": 24}  # history turns before the question; beyond HISTORY, a summary too
+TOOL_SCHEMAS = list(TOOLS.values())  # the client builds the schemas from the functions
+
+BASE = {"prompt": "medium", "num_ctx": 4096, "num_thread": None, "parallel": 1}  # as the pipeline runs
+SWEEPS = {
+    "prompt": ["short", "medium", "long"],
+    "num_ctx": [2048, 4096, 8192],
+    "num_thread": [None, 4, 8],  # None: Ollama's default
+    "parallel": [1, 2, 4],
+}
+TRIALS = 3  # warm rounds per setting
+NUM_PREDICT = 128  # spoken replies are short
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "model_benchmarks.csv"
+REQUESTS_CSV = OUTPUT_DIR / "model_benchmarks_requests.csv"
+JSON_FILE = OUTPUT_DIR / "model_benchmarks.json"
+
+
+def get_system_info():
+    return {
+        "platform": platform.system(),
+        "platform_release": platform.release(),
+        "platform_version": platform.version(),
+        "architecture": platform.machine(),
+        "python_version": platform.python_version(),
+        "cpu": platform.processor(),
+        "cpu_cores": psutil.cpu_count(logical=False),
+        "cpu_threads": psutil.cpu_count(logical=True),
+        "ram_gb": round(psutil.virtual_memory().total / (1024**3), 2),
+    }
+
+
+def is_model_installed(client, model_name):
+    """
+    Checks if a given model is installed in Ollama.
+
+    Args:
+        client (Client): Ollama client.
+        model_name (str): The name of the model to check (e.g., "llama3").
+
+    Returns:
+        bool: True if the model is installed, False otherwise.
+    """
+    try:
+        models = client.list()
+        for model_info in models["models"]:
+            if model_info["model"] == model_name:
+                return True
+        return False
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+
+
+def ensure_model(client, model_name: str):
+    """Pull model if not present locally."""
+    if not is_model_installed(client, model_name):
+        print(f"Model '{model_name}' not found locally. Pulling...")
+        client.pull(model_name)
+        print(f"Model '{model_name}' pulled successfully.")
+
+    return model_name
+
+
+# --- HELPERS ---
+def build_messages(history_turns, question):
+    """The prompt AI_AGENT would send after `history_turns` turns."""
+    messages = [{"role": "system", "content": PROMPT}]
+    if history_turns > len(HISTORY):  # older turns would have been summarized
+        messages.append({"role": "system", "content": ContextWindow.SUMMARY_PREFIX + SUMMARY})
+    for i in range(history_turns):
+        user, assistant = HISTORY[i % len(HISTORY)]
+        messages += [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+    messages.append({"role": "user", "content": question})
+    return messages
+
+
+def options_for(setting):
+    options = {"num_ctx": setting["num_ctx"], "num_predict": NUM_PREDICT, "temperature": 0}
+    if setting["num_thread"]:
+        options["num_thread"] = setting["num_thread"]
+    return options
+
+
+def settings():
+    """BASE, then BASE with one setting changed at a time."""
+    result = [dict(BASE)]
+    for key, values in SWEEPS.items():
+        for value in values:
+            setting = dict(BASE, **{key: value})
+            if setting not in result:
+                result.append(setting)
+    return result
+
+
+def seconds(ns):
+    return (ns or 0) / 1e9
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def timed_chat(client, model, messages, options):
+    """Stream one reply; returns the client-side timings and Ollama's timing fields."""
+    start = time.perf_counter()
+    first = None
+    content = []
+    tool_call = False
+    final = None
+    for part in client.chat(model=model, messages=messages, tools=TOOL_SCHEMAS, stream=True, options=options):
+        message = part.message
+        if first is None and (message.content or message.tool_calls):
+            first = time.perf_counter()
+        content.append(message.content or "")
+        tool_call = tool_call or bool(message.tool_calls)
+        if part.done:
+            final = part
+    wall = time.perf_counter() - start
+
+    prompt_s, eval_s = seconds(final.prompt_eval_duration), seconds(final.eval_duration)
+    prompt_tokens, eval_tokens = final.prompt_eval_count or 0, final.eval_count or 0
+    text = "".join(content)
+    return {
+        "ttft_s": None if first is None else first - start,
+        "wall_s": wall,
+        "load_s": seconds(final.load_duration),
+        "prompt_tokens": prompt_tokens,  # not counting a prefix Ollama had cached
+        "prompt_eval_s": prompt_s,
+        "prompt_tps": prompt_tokens / prompt_s if prompt_s else None,
+        "eval_tokens": eval_tokens,
+        "eval_s": eval_s,
+        "eval_tps": eval_tokens / eval_s if eval_s else None,
+        "tool_call": tool_call,
+        "output_preview": text[:80] + ("..." if len(text) > 80 else ""),
+    }
+
+
+def benchmark_setting(client, model, setting):
+    """One cold request, then TRIALS warm rounds of setting["parallel"] concurrent requests."""
+    prompts = [build_messages(PROMPTS[setting["prompt"]], q) for q in QUESTIONS]
+    options = options_for(setting)
+    client.generate(model=model, keep_alive=0)  # unload, so the next request loads it
+    rows = [dict(phase="cold", round=0, round_s=None, **timed_chat(client, model, prompts[0], options))]
+    parallel = setting["parallel"]
+    with ThreadPoolExecutor(parallel) as pool:
+        for trial in range(TRIALS):
+            started = time.perf_counter()
+            batch = list(
+                pool.map(
+                    lambda i: timed_chat(client, model, prompts[(trial * parallel + i) % len(prompts)], options),
+                    range(parallel),
+                )
+            )
+            round_s = time.perf_counter() - started
+            rows += [dict(phase="warm", round=trial + 1, round_s=round_s, **row) for row in batch]
+    return [dict(model=model, **setting, **row) for row in rows]
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.mean(values), 3) if values else None
+
+
+def summarize(rows):
+    """One row per model, setting and phase."""
+    summary = []
+    for phase in ("cold", "warm"):
+        requests = [r for r in rows if r["phase"] == phase]
+        if not requests:
+            continue
+        ttft = [r["ttft_s"] for r in requests if r["ttft_s"] is not None]
+        rounds = {r["round"]: r["round_s"] or r["wall_s"] for r in requests}
+        summary.append(
+            {
+                **{key: requests[0][key] for key in ("model", *BASE)},
+                "phase": phase,
+                "requests": len(requests),
+                "ttft_p50_s": round(statistics.median(ttft), 3) if ttft else None,
+                "ttft_p95_s": round(percentile(ttft, 0.95), 3) if ttft else None,
+                "load_s": mean(r["load_s"] for r in requests),
+                "prompt_tokens": mean(r["prompt_tokens"] for r in requests),
+                "prompt_tps": mean(r["prompt_tps"] for r in requests),
+                "eval_tps": mean(r["eval_tps"] for r in requests),
+                # All requests' generated tokens over the time the rounds took
+                "throughput_tps": round(sum(r["eval_tokens"] for r in requests) / sum(rounds.values()), 2),
+                "tool_calls": sum(r["tool_call"] for r in requests),
+            }
+        )
+    return summary
+
+
+def ranking(summary):
+    """Models by warm time to first token at BASE, for model selection."""
+    at_base = {r["model"]: r for r in summary if all(r[k] == v for k, v in BASE.items())}
+    ranked = []
+    for model, warm in sorted(
+        ((m, r) for m, r in at_base.items() if r["phase"] == "warm"), key=lambda item: item[1]["ttft_p50_s"] or float("inf")
+    ):
+        cold = next(r for r in summary if r["model"] == model and r["phase"] == "cold" and all(r[k] == v for k, v in BASE.items()))
+        ranked.append(
+            {
+                "model": model,
+                "ttft_p50_s": warm["ttft_p50_s"],
+                "ttft_p95_s": warm["ttft_p95_s"],
+                "eval_tps": warm["eval_tps"],
+                "cold_ttft_s": cold["ttft_p50_s"],
+                "load_s": cold["load_s"],
+            }
+        )
+    return ranked
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_results(requests, summary, sys_info):
+    write_csv(REQUESTS_CSV, requests)
+    write_csv(CSV_FILE, summary)
+    write_csv(CSV_FILE.with_name("system_info.csv"), [sys_info])
+    with open(JSON_FILE, "w") as f:
+        json.dump(
+            {"system_info": sys_info, "base": BASE, "ranking": ranking(summary), "benchmarks": summary}, f, indent=2
+        )
+
+
+# --- RUN BENCHMARK ---
+def main():
+    sys_info = get_system_info()
+    print("=== System Info ===")
+    for k, v in sys_info.items():
+        print(f"{k}: {v}")
+
+    stub = MockOllamaServer(["Sure, opening Spotify now.", "Rice, eggs and spinach make a good fried rice."],
+                            first_token_delay=0.1, tokens_per_second=40, load_delay=1.0) if STUB else None
+    if stub:
+        stub.start()
+    try:
+        client = Client(host=stub.host if stub else HOST)
+        models = ["stub"] if stub else [ensure_model(client, m) for m in MODELS]
+        requests, summary = [], []
+        for model in models:
+            print(f"\n=== Benchmarking {model} ===")
+            for setting in settings():
+                rows = benchmark_setting(client, model, setting)
+                requests += rows
+                for row in summarize(rows):
+                    summary.append(row)
+                    print(
+                        f"prompt {row['prompt']:>6} | ctx {row['num_ctx']} | threads {row['num_thread'] or 'auto'} | "
+                        f"x{row['parallel']} | {row['phase']}: TTFT p50 {row['ttft_p50_s']}s p95 {row['ttft_p95_s']}s | "
+                        f"load {row['load_s']}s | prompt {row['prompt_tokens']} tok at {row['prompt_tps']} tok/s | "
+                        f"eval {row['eval_tps']} tok/s | total {row['throughput_tps']} tok/s"
+                    )
+            client.generate(model=model, keep_alive=0)
+    finally:
+        if stub:
+            stub.stop()
+
+    save_results(requests, summary, sys_info)
+    print(f"\n=== Summary saved to {OUTPUT_DIR}/ ===")
+    for r in ranking(summary):
+        print(
+            f"{r['model']}: warm TTFT {r['ttft_p50_s']}s (p95 {r['ttft_p95_s']}s), {r['eval_tps']} tok/s | "
+            f"cold TTFT {r['cold_ttft_s']}s ({r['load_s']}s load)"
+        )
+
+
+if __name__ == "__main__":
+    main()
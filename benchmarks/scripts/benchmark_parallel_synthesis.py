@@ -0,0 +1,112 @@
+"""
+Gaps between sentences of a long Kokoro reply, sequential vs parallel synthesis.
+
+The whole reply is available up front, so every gap is synthesis's, and
+it is played back in real time (simulated). "sequential" is a single
+Vocalizer synthesizing the next sentence only once the current one has
+been handed to playback; the other modes use SynthesisScheduler with
+WORKERS Kokoro sessions, each with its share of the cores. A gap is
+silence at a sentence boundary that synthesis caused (see GapMeter).
+Needs the Kokoro model files in src/voice_assist/voice/kokoro.
+"""
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+
+from voice_assist.voice.synth_scheduler import GapMeter, SynthesisJob, SynthesisScheduler
+from voice_assist.voice.voice_synth import Vocalizer
+
+# --- CONFIG ---
+REPLY = [
+    "Black holes are regions of space-time where the gravitational force is so strong that even light cannot escape from them.",
+    "In other words, they are areas where the mass of a star is so large that it bends everything around it.",
+    "They can form when a massive star collapses under its own gravity.",
+    "Sure.",
+    "The gravity of a black hole is so strong that anything passing into it is pulled inwards towards its core.",
+    "Black holes are also thought to play a role in the formation of new stars and galaxies.",
+    "Many theories have been proposed to explain how black holes form and interact with matter.",
+    "Our understanding continues to evolve as new discoveries are made.",
+]
+WORKERS = [1, 2, 3]
+LOOKAHEAD = 3
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "parallel_synthesis_benchmark.csv"
+
+
+# --- HELPERS ---
+def play(job, meter):
+    """Hand the job's chunks to a simulated real-time player; return when the last is handed on."""
+    for samples, rate in job:
+        meter.audio(job, samples, rate)
+
+
+def run_sequential(vocalizer):
+    meter = GapMeter()
+    start = time.perf_counter()
+    arrived = time.monotonic()  # the whole reply is available up front
+    for seq, text in enumerate(REPLY):
+        job = SynthesisJob(seq, text, {"turn": 0, "arrived": arrived})
+        for samples, rate in vocalizer.create_audio_stream(text):
+            meter.audio(job, samples, rate)
+    return meter, time.perf_counter() - start
+
+
+def run_parallel(vocalizers):
+    meter = GapMeter()
+    start = time.perf_counter()
+    arrived = time.monotonic()
+    scheduler = SynthesisScheduler(vocalizers, lookahead=LOOKAHEAD)
+
+    def feed():
+        for text in REPLY:
+            scheduler.submit(text, turn=0, arrived=arrived)
+
+    threading.Thread(target=feed, daemon=True).start()
+    for _ in REPLY:
+        play(scheduler.next(), meter)
+    return meter, time.perf_counter() - start
+
+
+def wait_for_playback(meter):
+    """Let simulated playback of the previous run drain so runs don't overlap."""
+    time.sleep(max(0.0, (meter.playing_until or 0) - time.monotonic()))
+
+
+# --- RUN BENCHMARK ---
+def main():
+    cores = os.cpu_count() or 1
+    rows = []
+    vocalizer = Vocalizer(engine="kokoro")
+    vocalizer.create_audio("Warm up.")
+    meter, elapsed = run_sequential(vocalizer)
+    rows.append(dict(mode="sequential", workers=1, threads=0, synth_s=round(elapsed, 2), **meter.stats()))
+    wait_for_playback(meter)
+
+    for workers in WORKERS:
+        threads = max(1, cores // workers)
+        vocalizers = [Vocalizer(engine="kokoro", kokoro_threads=threads) for _ in range(workers)]
+        for v in vocalizers:
+            v.create_audio("Warm up.")
+        meter, elapsed = run_parallel(vocalizers)
+        rows.append(dict(mode="scheduled", workers=workers, threads=threads, synth_s=round(elapsed, 2), **meter.stats()))
+        wait_for_playback(meter)
+
+    for row in rows:
+        print(
+            f"{row['mode']:>10} x{row['workers']} ({row['threads']} threads): "
+            f"{row['gaps']}/{row['boundaries']} audible gaps, p50 {row['gap_p50_s']}s, "
+            f"p95 {row['gap_p95_s']}s, max {row['gap_max_s']}s | synthesis done after {row['synth_s']}s"
+        )
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Offline end-to-end benchmark of the full multiprocess pipeline.
+
+Runs the real transcriber / llm / synthesizer / playback stages, as
+run_pipeline() wires them, through a scripted multi-turn conversation:
+
+- the microphone is an ArrayInputStream that stays silent until the harness
+  cues the next recording from data/samples, one per turn, each once the
+  previous reply has finished playing;
+- the LLM is a local stub Ollama server (mock_ollama.py) that streams
+  scripted replies at TOKENS_PER_SECOND after FIRST_TOKEN_DELAY;
+- Edge TTS is the local mock server (mock_edge_tts.py), so no network is
+  needed (set ENGINE = "kokoro" to use the local model files instead);
+- the speaker is a NullOutputStream.
+
+Timings come from the pipeline's own trace, as offsets from the end of the
+user's speech: turn latency until the reply is audible, first-audio latency
+until its first chunk is synthesized, and until the reply has played out.
+Throughput is turns per minute over the conversation. CPU% and RSS of every
+stage process are sampled throughout. Results go to benchmarks/results
+(per turn, per process and a JSON summary) and are checked against
+THRESHOLDS; the script exits with status 1 if any is exceeded, so it can
+gate regressions. Uses the fork start method so the patched module globals
+reach the children.
+"""
+import csv
+import json
+import multiprocessing
+import queue
+import statistics
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import psutil
+import voice_assist.pipelines.multiprocess_pipeline as pipeline
+from mock_edge_tts import MockEdgeServer
+from mock_ollama import MockOllamaServer
+from voice_assist.llm.ai_agent import AI_AGENT
+from voice_assist.transacription.capture import ArrayInputStream
+from voice_assist.transacription.resample import load_audio
+from voice_assist.utils.shared_audio import SharedAudioRing
+from voice_assist.utils.tracing import TraceCollector
+from voice_assist.utils.turns import TurnTracker
+from voice_assist.voice.playback import NullOutputStream
+
+# --- CONFIG ---
+SAMPLES_DIR = Path("data/samples")  # one utterance per WAV, said in name order
+TURNS = 10  # the recordings are cycled
+REPLIES = [
+    "Sure, I can help with that. Opening Spotify now.",
+    "It is sunny and twenty two degrees right now. Tomorrow looks much the same.",
+    "Done.",
+    "Here is what I found. The meeting is at three, in the small conference room.",
+]
+FIRST_TOKEN_DELAY = 0.15  # seconds, stub Ollama
+TOKENS_PER_SECOND = 40.0
+ENGINE = "edge"  # mock Edge server; "kokoro" needs the model files
+WHISPER_COMPUTE_TYPE = "int8"  # fixed, so autotuning doesn't skew runs
+WARMUP_SECONDS = 3.0  # after the LLM warm-up, before the first turn
+PAUSE_SECONDS = 0.5  # between the end of a reply and the next utterance
+TURN_TIMEOUT = 30.0
+SAMPLE_INTERVAL = 0.5  # seconds between CPU/RSS samples
+
+# (metric in the summary, "max" or "min", limit). Latencies include the
+# endpointer's silence_duration (2 s in the pipeline config).
+THRESHOLDS = [
+    ("turns_completed", "min", TURNS),
+    ("turn_latency_p95_ms", "max", 4500),
+    ("first_audio_p95_ms", "max", 4000),
+    ("stage_cpu_mean_percent", "max", 150),  # busiest stage process
+    ("stage_rss_peak_mb", "max", 1500),  # largest stage process
+]
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+TURNS_CSV = OUTPUT_DIR / "pipeline_e2e_turns.csv"
+PROCESSES_CSV = OUTPUT_DIR / "pipeline_e2e_processes.csv"
+SUMMARY_JSON = OUTPUT_DIR / "pipeline_e2e_summary.json"
+TRACE_FILE = OUTPUT_DIR / "pipeline_e2e_trace.jsonl"
+WORK_DIR = OUTPUT_DIR / "pipeline_e2e"  # agent history, debug audio
+
+ctx = multiprocessing.get_context("fork")
+cues = ctx.Queue()  # index of the next recording to say
+SAMPLES = sorted(SAMPLES_DIR.glob("*.wav"))
+UTTERANCES = [load_audio(path, pipeline.transcriberConfig.sample_rate) for path in SAMPLES]
+
+
+class ScriptedMicrophone(ArrayInputStream):
+    """Idle microphone that says the next recording whenever the harness cues one."""
+
+    def __init__(self, samplerate, **kwargs):
+        super().__init__(np.zeros(1, dtype=np.float32), samplerate, **kwargs)  # one sample of silence
+
+    def _next_block(self):
+        if self.position >= len(self.audio):
+            try:
+                self.audio = UTTERANCES[cues.get_nowait()].reshape(-1, 1)
+                self.position = 0
+            except queue.Empty:
+                pass
+        return super()._next_block()
+
+
+WORK_DIR.mkdir(parents=True, exist_ok=True)
+(WORK_DIR / "context.jsonl").unlink(missing_ok=True)  # every run starts a fresh conversation
+pipeline.INPUT_STREAM = ScriptedMicrophone
+pipeline.OUTPUT_STREAM = NullOutputStream
+pipeline.AI_AGENT = partial(AI_AGENT, context_file=str(WORK_DIR / "context.jsonl"))
+pipeline.WHISPER_COMPUTE_TYPE = WHISPER_COMPUTE_TYPE
+pipeline.PHRASE_CACHE_DIR = None  # memory only, so runs don't warm each other
+pipeline.ARCHIVE_AUDIO = "off"
+pipeline.transcriberConfig.archive = "off"
+pipeline.transcriberConfig.output_dir = WORK_DIR
+pipeline.OUTPUT_DIR = WORK_DIR
+
+
+# --- HELPERS ---
+class ProcessSampler(threading.Thread):
+    """Samples CPU% and RSS of the named processes every `interval` seconds."""
+
+    def __init__(self, pids, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.handles = {name: psutil.Process(pid) for name, pid in pids.items()}
+        self.samples = {name: [] for name in pids}  # (cpu %, rss bytes)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        for handle in self.handles.values():
+            handle.cpu_percent(None)
+        while not self.stopped.wait(self.interval):
+            for name, handle in self.handles.items():
+                try:
+                    self.samples[name].append((handle.cpu_percent(None), handle.memory_info().rss))
+                except psutil.NoSuchProcess:
+                    pass
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def rows(self):
+        rows = []
+        for name, samples in self.samples.items():
+            cpu = [c for c, _ in samples] or [0.0]
+            rss = [r / 1e6 for _, r in samples] or [0.0]
+            rows.append(
+                {
+                    "process": name,
+                    "cpu_mean_percent": round(statistics.mean(cpu), 1),
+                    "cpu_peak_percent": round(max(cpu), 1),
+                    "rss_mean_mb": round(statistics.mean(rss), 1),
+                    "rss_peak_mb": round(max(rss), 1),
+                }
+            )
+        return rows
+
+
+def ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def wait_for(condition, timeout, interval=0.1):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("pipeline did not start")
+        time.sleep(interval)
+
+
+def converse(completed, procs):
+    """Say each scripted utterance once the previous reply has played; returns per-turn rows."""
+    rows = []
+    for i in range(TURNS):
+        dead = [p.name for p in procs if not p.is_alive()]
+        if dead:
+            print(f"Stopping: {', '.join(dead)} exited")
+            break
+        sample = i % len(UTTERANCES)
+        cues.put(sample)
+        row = {"turn": i, "sample": SAMPLES[sample].name}
+        deadline = time.monotonic() + TURN_TIMEOUT
+        while True:  # skip turns without speech (e.g. a pause command)
+            try:
+                turn, spans, milestones = completed.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                print(f"Turn {i}: no reply within {TURN_TIMEOUT}s")
+                row["completed"] = False
+                break
+            if any(s["name"] == "speech" for s in spans):
+                row["completed"] = "reply_done" in milestones
+                row["turn_latency_ms"] = ms(milestones.get("first_audible"))
+                row["first_audio_ms"] = ms(milestones.get("first_audio_ready"))
+                for name in ("endpoint", "transcript", "llm_first_token", "first_sentence", "reply_done"):
+                    row[f"{name}_ms"] = ms(milestones.get(name))
+                row["reply_audio_s"] = round(sum(s["end"] - s["start"] for s in spans if s["name"] == "playback"), 2)
+                print(
+                    f"Turn {i} ({row['sample']}): audible after {row['turn_latency_ms']}ms, "
+                    f"first audio {row['first_audio_ms']}ms, done {row['reply_done_ms']}ms"
+                )
+                break
+        rows.append(row)
+        time.sleep(PAUSE_SECONDS)
+    return rows
+
+
+def summarize(turn_rows, process_rows, seconds):
+    done = [r for r in turn_rows if r["completed"]]
+    summary = {"turns": TURNS, "turns_completed": len(done), "conversation_s": round(seconds, 1)}
+    summary["turns_per_minute"] = round(len(done) / seconds * 60, 2)
+    summary["reply_audio_per_second"] = round(sum(r["reply_audio_s"] for r in done) / seconds, 3)
+    for metric in ("turn_latency_ms", "first_audio_ms", "transcript_ms", "llm_first_token_ms", "reply_done_ms"):
+        values = [r[metric] for r in done if r.get(metric) is not None]
+        if values:
+            summary[metric.replace("_ms", "_p50_ms")] = round(statistics.median(values), 1)
+            summary[metric.replace("_ms", "_p95_ms")] = round(percentile(values, 0.95), 1)
+    stages = [r for r in process_rows if r["process"] != "main"]
+    summary["stage_cpu_mean_percent"] = max(r["cpu_mean_percent"] for r in stages)
+    summary["stage_rss_peak_mb"] = max(r["rss_peak_mb"] for r in stages)
+    return summary
+
+
+def check(summary):
+    failures = []
+    for metric, kind, limit in THRESHOLDS:
+        value = summary.get(metric)
+        ok = value is not None and (value <= limit if kind == "max" else value >= limit)
+        print(f"  {'PASS' if ok else 'FAIL'} {metric} = {value} ({kind} {limit})")
+        if not ok:
+            failures.append(metric)
+    return failures
+
+
+def write_csv(path, rows):
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# --- RUN BENCHMARK ---
+def main():
+    if not UTTERANCES:
+        sys.exit(f"No recordings in {SAMPLES_DIR}")
+    completed = queue.Queue()
+    TRACE_FILE.unlink(missing_ok=True)
+    collector = TraceCollector(
+        TRACE_FILE, waterfall=False, on_turn=lambda turn, spans, milestones: completed.put((turn, spans, milestones))
+    )
+    tracer = collector.tracer
+    edge = MockEdgeServer() if ENGINE == "edge" else None
+    ollama = MockOllamaServer(REPLIES, FIRST_TOKEN_DELAY, TOKENS_PER_SECOND)
+
+    running = ctx.Event()
+    running.set()
+    turns = TurnTracker()
+    transcribe_queue, llm_queue, command_queue = ctx.Queue(), ctx.Queue(), ctx.Queue()
+    audio_ring, playback_ring = SharedAudioRing(), SharedAudioRing(n_slots=8)
+    procs = [
+        ctx.Process(name="transcriber", target=pipeline.transcriber_process, args=(transcribe_queue, command_queue, playback_ring, turns, tracer)),
+        ctx.Process(name="llm", target=pipeline.llm_process, args=(transcribe_queue, llm_queue, running, turns, tracer)),
+        ctx.Process(name="synthesizer", target=pipeline.voice_synthesizer, args=(llm_queue, audio_ring, running, turns, ENGINE, tracer)),
+        ctx.Process(name="playback", target=pipeline.audio_playback, args=(audio_ring, playback_ring, running, turns), kwargs={"tracer": tracer}),
+    ]
+    try:
+        # Mock servers first: the children inherit OLLAMA_HOST and the patched Edge URL
+        if edge:
+            edge.start()
+        ollama.start()
+        for p in procs:
+            p.start()
+        wait_for(lambda: any(path == "/api/generate" for path, _ in ollama.requests), TURN_TIMEOUT)
+        time.sleep(WARMUP_SECONDS)
+
+        sampler = ProcessSampler({"main": multiprocessing.current_process().pid, **{p.name: p.pid for p in procs}})
+        sampler.start()
+        started = time.monotonic()
+        turn_rows = converse(completed, procs)
+        seconds = time.monotonic() - started
+        sampler.stop()
+    finally:
+        for p in procs:
+            p.terminate()
+            p.join()
+        audio_ring.close()
+        playback_ring.close()
+        ollama.stop()
+        if edge:
+            edge.stop()
+        collector.close()
+
+    process_rows = sampler.rows()
+    for row in process_rows:
+        print(
+            f"{row['process']:>12}: CPU mean {row['cpu_mean_percent']}% (peak {row['cpu_peak_percent']}%) | "
+            f"RSS peak {row['rss_peak_mb']} MB"
+        )
+    summary = summarize(turn_rows, process_rows, seconds)
+    print(
+        f"\n{summary['turns_completed']}/{summary['turns']} turns in {summary['conversation_s']}s "
+        f"({summary['turns_per_minute']} per minute) | turn latency p50 {summary.get('turn_latency_p50_ms')}ms "
+        f"p95 {summary.get('turn_latency_p95_ms')}ms | first audio p50 {summary.get('first_audio_p50_ms')}ms "
+        f"p95 {summary.get('first_audio_p95_ms')}ms"
+    )
+    print("Thresholds:")
+    failures = check(summary)
+    summary["thresholds"] = [{"metric": m, "kind": k, "limit": l} for m, k, l in THRESHOLDS]
+    summary["failures"] = failures
+
+    write_csv(TURNS_CSV, turn_rows)
+    write_csv(PROCESSES_CSV, process_rows)
+    SUMMARY_JSON.write_text(json.dumps(summary, indent=2))
+    print(f"\nResults saved to {TURNS_CSV}, {PROCESSES_CSV} and {SUMMARY_JSON}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+CPU cost of the capture -> VAD -> Whisper front-end path at 24 kHz vs 16 kHz.
+
+before: audio stays at the 24 kHz capture rate all the way to Whisper
+after:  the capture callback resamples to 16 kHz once (polyphase, NumPy)
+
+A synthetic microphone signal is pushed through AudioCapture in 10 ms device
+callbacks, read into the Endpointer in 100 ms blocks (energy VAD), and the
+utterance is converted to Whisper's log-mel features. CPU time per second
+of audio is reported per stage, along with the samples buffered per second
+and how far the resampler attenuates tones above 8 kHz that would alias.
+"""
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+
+from voice_assist.transacription.capture import AudioCapture
+from voice_assist.transacription.config import TranscriberConfig
+from voice_assist.transacription.resample import resample
+from voice_assist.transacription.vad import Endpointer
+
+# --- CONFIG ---
+DEVICE_RATE = 24000
+SECONDS = 30
+CALLBACK_SECONDS = 0.01
+TRIALS = 5
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "resampling_benchmark.csv"
+
+
+# --- HELPERS ---
+class IdleStream:
+    """Input stream that never calls back; the benchmark drives the callback."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def microphone_signal():
+    rng = np.random.default_rng(0)
+    t = np.arange(SECONDS * DEVICE_RATE) / DEVICE_RATE
+    voiced = np.sin(2 * np.pi * 150 * t) * (np.sin(2 * np.pi * 2 * t) > 0)  # speech-like bursts
+    return (0.1 * voiced + rng.normal(0, 0.002, len(t))).astype(np.float32)[:, None]
+
+
+def whisper_features():
+    try:
+        from faster_whisper.feature_extractor import FeatureExtractor
+    except ImportError:
+        return None
+    return FeatureExtractor()
+
+
+def run(model_rate, signal, features):
+    config = TranscriberConfig(sample_rate=DEVICE_RATE, model_rate=model_rate)
+    capture = AudioCapture(DEVICE_RATE, seconds=SECONDS + 1, input_stream=IdleStream, rate=model_rate)
+    endpointer = Endpointer(config)
+    endpointer.recording = True  # keep everything, as during one long utterance
+    endpointer.silence_limit = endpointer.hangover = len(signal)
+    chunk = int(DEVICE_RATE * CALLBACK_SECONDS)
+    block_size = int(model_rate * config.block_duration)
+
+    start = time.process_time()
+    for i in range(0, len(signal), chunk):
+        capture._callback(signal[i : i + chunk], len(signal[i : i + chunk]), None, None)
+    capture_cpu = time.process_time() - start
+
+    start = time.process_time()
+    while capture.available >= block_size:
+        endpointer.read(capture, block_size)
+    vad_cpu = time.process_time() - start
+
+    start = time.process_time()
+    if features is not None:
+        features(endpointer.audio())
+    features_cpu = time.process_time() - start
+    capture.close()
+    return capture_cpu, vad_cpu, features_cpu, len(endpointer.audio())
+
+
+def alias_attenuation_db(freq):
+    t = np.arange(2 * DEVICE_RATE) / DEVICE_RATE
+    y = resample(np.sin(2 * np.pi * freq * t), DEVICE_RATE, 16000)[500:-500]
+    return 20 * np.log10(np.sqrt(np.mean(y**2)) / np.sqrt(0.5))
+
+
+# --- RUN BENCHMARK ---
+def main():
+    signal = microphone_signal()
+    features = whisper_features()
+    if features is None:
+        print("faster-whisper not installed, skipping the feature extraction stage")
+
+    rows = []
+    for name, model_rate in (("before_24k", DEVICE_RATE), ("after_16k", 16000)):
+        results = [run(model_rate, signal, features) for _ in range(TRIALS)]
+        capture_cpu, vad_cpu, features_cpu, samples = (min(r[i] for r in results) for i in range(4))
+        row = {
+            "path": name,
+            "capture_ms_per_audio_s": round(capture_cpu * 1000 / SECONDS, 3),
+            "vad_ms_per_audio_s": round(vad_cpu * 1000 / SECONDS, 3),
+            "whisper_features_ms_per_audio_s": round(features_cpu * 1000 / SECONDS, 3),
+            "total_ms_per_audio_s": round((capture_cpu + vad_cpu + features_cpu) * 1000 / SECONDS, 3),
+            "samples_buffered_per_audio_s": samples // SECONDS,
+        }
+        rows.append(row)
+        print(
+            f"{name:>10}: capture {row['capture_ms_per_audio_s']} + VAD {row['vad_ms_per_audio_s']} + "
+            f"features {row['whisper_features_ms_per_audio_s']} = {row['total_ms_per_audio_s']} ms "
+            f"CPU per audio second | {row['samples_buffered_per_audio_s']} samples/s buffered"
+        )
+
+    for freq in (1000, 7000, 9000, 11000):
+        print(f"{freq:>5} Hz tone after 24k -> 16k: {alias_attenuation_db(freq):.1f} dB")
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
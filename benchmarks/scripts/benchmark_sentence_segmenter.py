@@ -0,0 +1,87 @@
+import csv
+import re
+import time
+from pathlib import Path
+
+from voice_assist.llm.sentence_segmenter import SentenceSegmenter
+
+# --- CONFIG ---
+STREAM_TOKENS = [1000, 5000, 20000]  # tokens per simulated reply
+UNPUNCTUATED_TOKEN = "word "
+PROSE_TOKENS = ["The ", "model ", "costs ", "3.5 ", "dollars, ", "e.g. ", "on ", "Dr. ", "Smith's ", "plan. "]
+REPLY_TOKENS = [  # a typical assistant reply, one word per token
+    word + " "
+    for word in (
+        "Sure! The weather today is sunny with a high of 24 degrees, and a light breeze from "
+        "the west later in the afternoon. Would you like the forecast for tomorrow as well?"
+    ).split()
+]
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "sentence_segmenter_benchmark.csv"
+
+
+# --- SEGMENTERS ---
+def legacy_segment(tokens):
+    """The previous stream_query loop: re-split the whole buffer on every token."""
+    chunks, buffer = [], ""
+    for token in tokens:
+        buffer += token
+        sentences = re.split(r"([.!?])", buffer)
+        while len(sentences) > 2:
+            chunks.append((sentences[0] + sentences[1]).strip())
+            sentences = sentences[2:]
+        buffer = "".join(sentences)
+    if buffer.strip():
+        chunks.append(buffer.strip())
+    return chunks
+
+
+def incremental_segment(tokens):
+    segmenter = SentenceSegmenter()
+    chunks = []
+    for token in tokens:
+        chunks.extend(segmenter.feed(token))
+    chunks.extend(segmenter.flush())
+    return chunks
+
+
+# --- HELPERS ---
+def measure(segment, tokens):
+    start = time.perf_counter()
+    chunks = segment(tokens)
+    elapsed = time.perf_counter() - start
+    return len(tokens) / elapsed, chunks
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    for stream_name, stream in (("unpunctuated", [UNPUNCTUATED_TOKEN]), ("prose", PROSE_TOKENS), ("reply", REPLY_TOKENS)):
+        for n in STREAM_TOKENS:
+            tokens = (stream * (n // len(stream) + 1))[:n]
+
+            print(f"\n=== {stream_name}, {n} tokens ===")
+            for name, segment in (("re.split", legacy_segment), ("incremental", incremental_segment)):
+                tokens_per_s, chunks = measure(segment, tokens)
+                shortest = min(len(c) for c in chunks)
+                rows.append({
+                    "stream": stream_name,
+                    "tokens": n,
+                    "segmenter": name,
+                    "tokens_per_s": round(tokens_per_s),
+                    "chunks": len(chunks),
+                    "shortest_chunk": shortest,
+                })
+                print(f"{name:>12}: {tokens_per_s:,.0f} tokens/s | {len(chunks)} chunks | shortest {shortest} chars")
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compares batch and streaming transcription on the WAVs in data/samples.
+
+Each sample is played in real time through an array-backed stand-in for
+sd.InputStream, followed by silence so the endpointer closes the utterance.
+Batch mode decodes everything after the silence timeout; streaming mode
+decodes while the sample plays and only finishes the tail at the end.
+Reported: time from end of speech detection to the final transcript, and
+for streaming the per-partial latency and how much audio was re-decoded.
+"""
+import csv
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from voice_assist.transacription.config import TranscriberConfig
+from voice_assist.transacription.transcriber import Transcriber
+
+# --- CONFIG ---
+AUDIO_DIR = Path("data/samples")  # folder containing audio files to test
+MODEL = "distil-small.en"
+SAMPLE_RATE = 16000
+TAIL_SECONDS = 3.0  # silence after each sample
+REAL_TIME = True  # pace reads like a microphone would
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "streaming_transcription_benchmark.csv"
+
+
+# --- HELPERS ---
+class ArrayStream:
+    """Serves audio like sd.InputStream.read(), optionally at real-time pace."""
+
+    def __init__(self, audio, samplerate):
+        self.audio = audio.astype(np.float32)
+        self.samplerate = samplerate
+        self.position = 0
+        self.started = time.perf_counter()
+        self.last_read = None
+
+    def read(self, frames):
+        if REAL_TIME:
+            due = self.started + (self.position + frames) / self.samplerate
+            time.sleep(max(0.0, due - time.perf_counter()))
+        block = self.audio[self.position : self.position + frames]
+        block = np.pad(block, (0, frames - len(block)))  # silence once the sample ends
+        self.position += frames
+        self.last_read = time.perf_counter()
+        return block[:, None], False
+
+
+def load_sample(path):
+    audio, rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(int(len(audio) * SAMPLE_RATE / rate)) * (rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio)
+    return np.concatenate([audio, np.zeros(int(TAIL_SECONDS * SAMPLE_RATE))])
+
+
+def run_batch(transcriber, audio, block_size):
+    stream = ArrayStream(audio, SAMPLE_RATE)
+    text = transcriber._transcribe_audio_stream(block_size, stream)
+    return text, time.perf_counter() - stream.last_read
+
+
+def run_streaming(transcriber, audio, block_size):
+    stream = ArrayStream(audio, SAMPLE_RATE)
+    updates = list(transcriber._stream_audio_stream(block_size, stream))
+    return updates, time.perf_counter() - stream.last_read
+
+
+# --- RUN BENCHMARK ---
+def main():
+    audio_files = sorted(AUDIO_DIR.glob("*.wav"))
+    if not audio_files:
+        print(f"No audio files found in {AUDIO_DIR}")
+        return
+
+    config = TranscriberConfig(sample_rate=SAMPLE_RATE, output_dir=Path("benchmarks/results/streaming_audio"))
+    transcriber = Transcriber(config=config, model_name=MODEL)
+    block_size = int(SAMPLE_RATE * config.block_duration)
+
+    rows = []
+    for path in audio_files:
+        audio = load_sample(path)
+        batch_text, batch_final = run_batch(transcriber, audio, block_size)
+        updates, stream_final = run_streaming(transcriber, audio, block_size)
+        partials = [u for u in updates if not u.final]
+        final = updates[-1]
+
+        row = {
+            "file_name": path.name,
+            "audio_s": round(final.audio_seconds, 2),
+            "batch_final_latency_s": round(batch_final, 3),
+            "streaming_final_latency_s": round(stream_final, 3),
+            "partials": len(partials),
+            "partial_latency_p50_s": round(statistics.median(u.latency for u in partials), 3) if partials else None,
+            "first_commit_audio_s": next((round(u.audio_seconds, 2) for u in partials if u.committed), None),
+            "redecoded_audio_s": round(sum(u.decoded_seconds for u in updates), 2),
+            "final_tail_s": round(final.decoded_seconds, 2),
+            "same_text": batch_text.strip().lower() == final.text.strip().lower(),
+        }
+        rows.append(row)
+        print(
+            f"{path.name}: final after {row['batch_final_latency_s']}s batch vs "
+            f"{row['streaming_final_latency_s']}s streaming | {row['partials']} partials, "
+            f"p50 latency {row['partial_latency_p50_s']}s | tail {row['final_tail_s']}s of {row['audio_s']}s"
+        )
+        for update in partials:
+            print(f"    [{update.latency:.3f}s] {update.committed} | {update.tentative}")
+        print(f"    batch:     {batch_text}\n    streaming: {final.text}")
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
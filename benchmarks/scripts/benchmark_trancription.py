@@ -1,7 +1,19 @@
+"""
+Transcription speed of each Whisper model size over the WAVs in data/samples.
+
+Every model is loaded once through the shared model registry; constructing
+a second Transcriber for it is timed to show the cached load. Each model
+then transcribes the whole directory twice:
+- sequentially, one transcribe_wav_file() call per file
+- batched, with transcribe_many()
+The real-time factor (RTF) is processing time divided by audio duration;
+below 1 is faster than real time.
+"""
+import csv
 import time
 from pathlib import Path
-import csv
-import soundfile as sf
+
+from voice_assist.transacription.models import registry
 from voice_assist.transacription.transcriber import Transcriber
 
 # --- CONFIG ---
@@ -19,39 +31,35 @@ MODEL_SIZES = [
 
 AUDIO_DIR = Path("data/samples")  # folder containing audio files to test
 OUTPUT_DIR = Path("benchmarks/results")  # folder to save CSV
-AUDIO_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
+BATCH_SIZE = 8  # files (or 30 s chunks) decoded together by transcribe_many
+DEVICE = "cpu"
+COMPUTE_TYPE = "float32"  # the Transcriber default
 
 NUM_RUNS = 1  # average over multiple runs
 MAKE_CSV = True  # whether to save results to CSV
 
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+registry.capacity = 1  # only the model being measured stays loaded
 
 
-# --- HELPER FUNCTION ---
-def benchmark_audio(transcriber: Transcriber, file_path: Path) -> float:
-    start = time.time()
-    segments = transcriber.file_transcribe(file_path)
-    end = time.time()
-    duration = end - start
-    return duration, segments
+# --- HELPER FUNCTIONS ---
+def run_sequential(transcriber: Transcriber, audio_files):
+    start = time.perf_counter()
+    texts = [transcriber.transcribe_wav_file(f) for f in audio_files]
+    return time.perf_counter() - start, texts
 
 
-# --- HELPER FUNCTIONS ---
-def get_wav_duration(file_path: Path) -> float:
-    """Return duration of a WAV file in seconds using soundfile."""
-    with sf.SoundFile(file_path) as f:
-        frames = len(f)
-        rate = f.samplerate
-        duration = frames / rate
-    return duration
+def run_batched(transcriber: Transcriber, audio_files):
+    start = time.perf_counter()
+    results = list(transcriber.transcribe_many(audio_files, batch_size=BATCH_SIZE))
+    return time.perf_counter() - start, results
 
 
 # --- RUN BENCHMARK ---
 def main():
     benchmark_start = time.time()
-    audio_files = list(AUDIO_DIR.glob("*.wav"))
+    audio_files = sorted(AUDIO_DIR.glob("*.wav"))
     if not audio_files:
         print(f"No audio files found in {AUDIO_DIR}")
         return
@@ -59,27 +67,46 @@ def main():
     print(f"Found {len(audio_files)} audio files in {AUDIO_DIR}")
 
     all_results = []
-
-    for audio_file in audio_files:
-        print(f"\n=== Benchmarking file: {audio_file.name} ===")
-        wav_duration = get_wav_duration(audio_file)
-
-        for model_size in MODEL_SIZES:
-            transcriber = Transcriber(model_name=model_size)
-            times = []
-            for _ in range(NUM_RUNS):
-                duration, text = benchmark_audio(transcriber, audio_file)
-                times.append(duration)
-            avg_time = sum(times) / NUM_RUNS
-            print(f"{model_size}: {avg_time:.2f}s (WAV duration: {wav_duration:.2f}s)")
-            all_results.append((audio_file.name, model_size, avg_time))
+    for model_size in MODEL_SIZES:
+        start = time.perf_counter()
+        transcriber = Transcriber(model_name=model_size, device=DEVICE, compute_type=COMPUTE_TYPE)
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        Transcriber(model_name=model_size, device=DEVICE, compute_type=COMPUTE_TYPE)
+        cached_load_s = time.perf_counter() - start
+
+        sequential, batched = [], []
+        for _ in range(NUM_RUNS):
+            sequential.append(run_sequential(transcriber, audio_files)[0])
+            seconds, results = run_batched(transcriber, audio_files)
+            batched.append(seconds)
+        audio_s = sum(r.audio_seconds for r in results)
+        sequential_s = sum(sequential) / NUM_RUNS
+        batched_s = sum(batched) / NUM_RUNS
+
+        row = {
+            "model_size": model_size,
+            "load_s": round(load_s, 2),
+            "cached_load_ms": round(cached_load_s * 1000, 2),
+            "audio_s": round(audio_s, 2),
+            "sequential_s": round(sequential_s, 2),
+            "batched_s": round(batched_s, 2),
+            "rtf_sequential": round(sequential_s / audio_s, 4),
+            "rtf_batched": round(batched_s / audio_s, 4),
+        }
+        all_results.append(row)
+        print(
+            f"{model_size}: load {row['load_s']}s (cached {row['cached_load_ms']}ms) | "
+            f"RTF {row['rtf_sequential']} sequential, {row['rtf_batched']} batched "
+            f"over {row['audio_s']}s of audio"
+        )
 
     # Save results to CSV
     csv_file = OUTPUT_DIR / "transcription_benchmark.csv"
     if MAKE_CSV:
         with open(csv_file, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["file_name", "model_size", "avg_time_s"])
+            writer = csv.DictWriter(f, fieldnames=all_results[0].keys())
+            writer.writeheader()
             writer.writerows(all_results)
 
     print(f"\nBenchmarking complete! Results saved to {csv_file}")
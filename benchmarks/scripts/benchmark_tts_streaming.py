@@ -0,0 +1,94 @@
+"""
+First-audio latency of whole-sentence and streamed Kokoro synthesis.
+
+Each sentence is synthesized twice: with create_audio(), where playback can
+only start once the whole sentence exists, and with create_audio_stream(),
+where it starts on the first phoneme batch. For the streamed run, playback
+is simulated from the first chunk on. A gap is counted whenever a chunk
+arrives after the audio before it has finished playing.
+Needs the Kokoro model files in src/voice_assist/voice/kokoro.
+"""
+import csv
+import statistics
+import time
+from pathlib import Path
+
+from voice_assist.voice.voice_synth import Vocalizer
+
+# --- CONFIG ---
+SENTENCES = [
+    "Sure, I can help with that.",
+    "Opening Spotify now.",
+    "Black holes are regions of space-time where the gravitational force is so strong that even light cannot escape from them.",
+    "In other words, they are areas where the mass of a star or object is so large that it bends everything around it, including time itself.",
+    "Many theories and models have been proposed to explain how black holes form and interact with matter, and our understanding continues to evolve as new discoveries are made.",
+]
+NUM_RUNS = 3  # the fastest run of each sentence is kept
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "tts_streaming_benchmark.csv"
+
+
+# --- HELPERS ---
+def run_whole(vocalizer, text):
+    start = time.perf_counter()
+    samples, rate = vocalizer.create_audio(text)
+    return time.perf_counter() - start, len(samples) / rate
+
+
+def run_streamed(vocalizer, text):
+    """Return first-chunk latency, total time, chunks and playback gap seconds."""
+    start = time.perf_counter()
+    playing_until = None  # when the audio received so far finishes playing
+    gaps = 0.0
+    chunks = 0
+    for samples, rate in vocalizer.create_audio_stream(text):
+        now = time.perf_counter()
+        if playing_until is None:
+            first = now - start
+            playing_until = now
+        gaps += max(0.0, now - playing_until)
+        playing_until = max(playing_until, now) + len(samples) / rate
+        chunks += 1
+    return first, time.perf_counter() - start, chunks, gaps
+
+
+# --- RUN BENCHMARK ---
+def main():
+    vocalizer = Vocalizer(engine="kokoro")
+    vocalizer.create_audio("Warm up.")
+
+    rows = []
+    for text in SENTENCES:
+        whole = min(run_whole(vocalizer, text) for _ in range(NUM_RUNS))
+        streamed = min(run_streamed(vocalizer, text) for _ in range(NUM_RUNS))
+        row = {
+            "sentence": text,
+            "audio_s": round(whole[1], 2),
+            "whole_first_audio_s": round(whole[0], 3),
+            "streamed_first_audio_s": round(streamed[0], 3),
+            "streamed_total_s": round(streamed[1], 3),
+            "chunks": streamed[2],
+            "playback_gap_s": round(streamed[3], 3),
+        }
+        rows.append(row)
+        print(
+            f"{row['audio_s']:>5}s of audio: first audio {row['whole_first_audio_s']}s whole, "
+            f"{row['streamed_first_audio_s']}s streamed ({row['chunks']} chunks, "
+            f"{row['playback_gap_s']}s of gaps) | {text[:40]}"
+        )
+
+    print(
+        f"\nMedian first audio: {statistics.median(r['whole_first_audio_s'] for r in rows)}s whole, "
+        f"{statistics.median(r['streamed_first_audio_s'] for r in rows)}s streamed"
+    )
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
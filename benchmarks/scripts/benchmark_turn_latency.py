@@ -0,0 +1,266 @@
+"""
+Device-free first-audio latency harness for the multiprocess pipeline.
+
+Runs the real llm_process / voice_synthesizer / audio_playback stages with the
+LLM, TTS engine and sound device swapped for scripted stubs, and compares them
+against the previous sleep-polling stage loops driven by the same stubs.
+Uses the fork start method so the patched module globals reach the children.
+"""
+import csv
+import statistics
+import time
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import psutil
+import voice_assist.pipelines.multiprocess_pipeline as pipeline
+from voice_assist.utils.shared_audio import SharedAudioRing
+from voice_assist.utils.turns import TurnTracker
+from voice_assist.voice.playback import AudioOutput, NullOutputStream
+
+# --- CONFIG ---
+TURNS = 20
+REPLY = [
+    "Sure, I can help with that.",
+    "Opening Spotify now.",
+    "Let me know if you want anything else.",
+]
+TOKEN_DELAY = 0.02  # seconds per streamed word
+SYNTH_DELAY = 0.05  # seconds per synthesized sentence
+AUDIO_SECONDS = 0.2  # length of each synthesized sentence
+IDLE_SECONDS = 5  # idle window for the CPU measurement
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "turn_latency_benchmark.csv"
+
+ctx = multiprocessing.get_context("fork")
+events = ctx.Queue()  # ("play", time) from the null sound device
+
+
+# --- STUBS ---
+def stub_sentence_streamer(model, user_id, text, llm_queue, agent=None, tokens=None, cancel=None, summarize=True):
+    for sentence in REPLY:
+        time.sleep(TOKEN_DELAY * len(sentence.split()))
+        llm_queue.put((sentence, time.time()))
+    llm_queue.put(None)
+
+
+class StubContextWindow:
+    def schedule_summary(self, user_id):
+        pass
+
+
+class StubAgent:
+    def __init__(self, user_id="user", model=None):
+        self.model = model
+        self.context_window = StubContextWindow()
+        self.last_ttft = None
+
+    def warmup(self):
+        pass
+
+
+class StubVocalizer:
+    def __init__(self, engine="kokoro", cache=None, kokoro_threads=0):
+        self.engine = engine
+        self.cache = cache
+
+    def prewarm(self, phrases):
+        return 0
+
+    def create_audio(self, text):
+        time.sleep(SYNTH_DELAY)
+        return np.zeros(int(24000 * AUDIO_SECONDS), dtype=np.float32), 24000
+
+    def create_audio_stream(self, text):
+        yield self.create_audio(text)
+
+
+class RecordingOutput(AudioOutput):
+    """AudioOutput on a NullOutputStream that records when queued audio becomes audible."""
+
+    def play(self, samples, samplerate, **meta):
+        playback = super().play(samples, samplerate, **meta)
+        events.put(("play", self.time_at(playback.start)))
+        return playback
+
+
+class NullSoundDevice:
+    """Stands in for sounddevice in the legacy stages: records play() calls and waits out the audio."""
+
+    def __init__(self):
+        self._until = 0.0
+
+    def play(self, samples, samplerate):
+        events.put(("play", time.time()))
+        self._until = time.time() + len(samples) / samplerate
+
+    def wait(self):
+        time.sleep(max(0.0, self._until - time.time()))
+
+    def stop(self):
+        self._until = 0.0
+
+
+pipeline.sentence_streamer = stub_sentence_streamer
+pipeline.AI_AGENT = StubAgent
+pipeline.Vocalizer = StubVocalizer
+pipeline.AudioOutput = RecordingOutput
+pipeline.OUTPUT_STREAM = NullOutputStream
+pipeline.PHRASE_CACHE_DIR = None  # memory only
+pipeline.OUTPUT_DIR = Path("benchmarks/results/turn_latency_audio")
+pipeline.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+# --- PREVIOUS POLLING STAGES (for comparison) ---
+def legacy_llm_process(transcribe_queue, llm_queue, llm_running):
+    while True:
+        if not llm_running["value"]:
+            time.sleep(0.1)
+            continue
+        if not transcribe_queue.empty():
+            try:
+                text, timestamp = transcribe_queue.get_nowait()
+                stub_sentence_streamer(None, "user", text, llm_queue)
+            except:
+                continue
+        else:
+            time.sleep(0.01)
+
+
+def legacy_voice_synthesizer(llm_queue, audio_queue, llm_running):
+    vocalizer = StubVocalizer()
+    while True:
+        if not llm_running["value"]:
+            time.sleep(0.1)
+            continue
+        try:
+            response, timestamp = llm_queue.get()
+        except:
+            time.sleep(0.01)
+            continue
+        samples, samplerate = vocalizer.create_audio(response)
+        audio_queue.put((samples, samplerate, timestamp))
+
+
+def legacy_audio_playback(audio_queue, llm_running):
+    sd = NullSoundDevice()
+    while True:
+        if not llm_running["value"]:
+            time.sleep(0.1)
+            continue
+        if not audio_queue.empty():
+            try:
+                samples, samplerate, timestamp = audio_queue.get_nowait()
+            except:
+                continue
+        else:
+            time.sleep(0.01)
+            continue
+        sd.play(samples, samplerate)
+        sd.wait()
+
+
+# --- HELPERS ---
+def drive_turns(transcribe_queue, message):
+    """Send scripted transcripts and time the first play() of each reply."""
+    latencies = []
+    for turn in range(TURNS):
+        sent = time.time()
+        transcribe_queue.put(message(f"scripted turn {turn}", sent))
+        first_play = None
+        for _ in REPLY:
+            _, played = events.get(timeout=30)
+            first_play = first_play or played
+        latencies.append(first_play - sent)
+        time.sleep(AUDIO_SECONDS + 0.1)  # let the last sentence finish playing
+    return latencies
+
+
+def idle_cpu(procs):
+    """CPU seconds burned by the stage processes while nothing is happening."""
+    handles = [psutil.Process(p.pid) for p in procs]
+    before = sum(sum(h.cpu_times()[:2]) for h in handles)
+    time.sleep(IDLE_SECONDS)
+    return sum(sum(h.cpu_times()[:2]) for h in handles) - before
+
+
+def run_legacy():
+    manager = ctx.Manager()
+    llm_running = manager.dict(value=True)
+    transcribe_queue, llm_queue, audio_queue = manager.Queue(), manager.Queue(), manager.Queue()
+    procs = [
+        ctx.Process(target=legacy_llm_process, args=(transcribe_queue, llm_queue, llm_running)),
+        ctx.Process(target=legacy_voice_synthesizer, args=(llm_queue, audio_queue, llm_running)),
+        ctx.Process(target=legacy_audio_playback, args=(audio_queue, llm_running)),
+    ]
+    try:
+        for p in procs:
+            p.start()
+        cpu = idle_cpu(procs)
+        return drive_turns(transcribe_queue, message=lambda text, sent: (text, sent)), cpu
+    finally:
+        for p in procs:
+            p.terminate()
+            p.join()
+        manager.shutdown()
+
+
+def run_event_driven():
+    running = ctx.Event()
+    running.set()
+    turns = TurnTracker()
+    transcribe_queue, llm_queue = ctx.Queue(), ctx.Queue()
+    audio_ring, playback_ring = SharedAudioRing(), SharedAudioRing(n_slots=8)
+    procs = [
+        ctx.Process(target=pipeline.llm_process, args=(transcribe_queue, llm_queue, running, turns)),
+        ctx.Process(target=pipeline.voice_synthesizer, args=(llm_queue, audio_ring, running, turns)),
+        ctx.Process(target=pipeline.audio_playback, args=(audio_ring, playback_ring, running, turns)),
+    ]
+    try:
+        for p in procs:
+            p.start()
+        cpu = idle_cpu(procs)
+        latencies = drive_turns(
+            transcribe_queue, message=lambda text, sent: ("final", text, sent, turns.begin())
+        )
+        playback_ring.clear()
+        return latencies, cpu
+    finally:
+        for p in procs:
+            p.terminate()
+            p.join()
+        audio_ring.close()
+        playback_ring.close()
+
+
+# --- RUN BENCHMARK ---
+def main():
+    rows = []
+    for name, run in (("polling", run_legacy), ("event_driven", run_event_driven)):
+        latencies, cpu = run()
+        ms = [l * 1000 for l in latencies]
+        row = {
+            "stages": name,
+            "first_audio_p50_ms": round(statistics.median(ms), 1),
+            "first_audio_max_ms": round(max(ms), 1),
+            "idle_cpu_s": round(cpu, 3),
+        }
+        rows.append(row)
+        print(
+            f"{name:>12}: first audio p50 {row['first_audio_p50_ms']}ms "
+            f"(max {row['first_audio_max_ms']}ms) | idle CPU {row['idle_cpu_s']}s "
+            f"over {IDLE_SECONDS}s"
+        )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
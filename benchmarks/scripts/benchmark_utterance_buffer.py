@@ -0,0 +1,127 @@
+"""
+Micro-benchmark: collecting an utterance from the capture ring.
+
+legacy:   stream.read() copy, block.flatten(), block.copy() into a list and
+          np.concatenate() whenever the audio is needed (every streaming
+          interval and at the end)
+buffer:   AudioCapture.read_into() straight into an UtteranceBuffer, views
+          handed to Whisper
+
+Reports array allocations and bytes copied per second of audio, plus the
+time spent per second of audio.
+"""
+import csv
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from voice_assist.transacription.capture import AudioCapture
+from voice_assist.transacription.utterance_buffer import UtteranceBuffer
+
+# --- CONFIG ---
+SAMPLE_RATE = 24000
+BLOCK_SECONDS = 0.1
+UTTERANCE_SECONDS = [5, 30, 120]
+SNAPSHOT_SECONDS = 0.5  # how often streaming mode asks for the audio so far
+TRIALS = 5
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "utterance_buffer_benchmark.csv"
+
+
+# --- HELPERS ---
+class IdleStream:
+    """Input stream that never calls back; the benchmark feeds the ring itself."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def filled_capture(seconds):
+    capture = AudioCapture(SAMPLE_RATE, seconds=seconds + 1, input_stream=IdleStream)
+    frames = int(seconds * SAMPLE_RATE)
+    capture._callback(np.random.default_rng(0).normal(0, 0.1, (frames, 1)).astype(np.float32), frames, None, None)
+    return capture
+
+
+def legacy(capture, blocks, block_size, snapshot_every):
+    allocations = copied = 0
+    audio_buffer = []
+    for i in range(1, blocks + 1):
+        block, _ = capture.read(block_size)
+        block = block.flatten()
+        audio_buffer.append(block.copy())
+        allocations += 3
+        copied += 3 * block.nbytes
+        if i % snapshot_every == 0 or i == blocks:
+            audio = np.concatenate(audio_buffer)
+            allocations += 1
+            copied += audio.nbytes
+    return allocations, copied
+
+
+def buffered(capture, blocks, block_size, snapshot_every):
+    buffer = UtteranceBuffer(capacity=SAMPLE_RATE * 10)
+    for i in range(1, blocks + 1):
+        capture.read_into(buffer.reserve(block_size))
+        if i % snapshot_every == 0 or i == blocks:
+            audio = buffer.view()
+    return buffer.allocations, buffer.bytes_copied + blocks * block_size * 4
+
+
+# --- RUN BENCHMARK ---
+def main():
+    block_size = int(SAMPLE_RATE * BLOCK_SECONDS)
+    snapshot_every = int(round(SNAPSHOT_SECONDS / BLOCK_SECONDS))
+
+    rows = []
+    for seconds in UTTERANCE_SECONDS:
+        blocks = int(seconds / BLOCK_SECONDS)
+        for name, collect in (("legacy", legacy), ("buffer", buffered)):
+            elapsed, peak = [], 0
+            for _ in range(TRIALS):
+                capture = filled_capture(seconds)
+                tracemalloc.start()
+                start = time.perf_counter()
+                allocations, copied = collect(capture, blocks, block_size, snapshot_every)
+                elapsed.append(time.perf_counter() - start)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                capture.close()
+
+            row = {
+                "method": name,
+                "utterance_s": seconds,
+                "allocations_per_audio_s": round(allocations / seconds, 2),
+                "mb_copied_per_audio_s": round(copied / seconds / 1e6, 3),
+                "ms_per_audio_s": round(min(elapsed) * 1000 / seconds, 4),
+                "peak_mb": round(peak / 1e6, 2),
+            }
+            rows.append(row)
+            print(
+                f"{name:>6} {seconds:>4}s: {row['allocations_per_audio_s']} allocations and "
+                f"{row['mb_copied_per_audio_s']} MB copied per audio second | "
+                f"{row['ms_per_audio_s']} ms per audio second | peak {row['peak_mb']} MB"
+            )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Offline evaluation of the transcriber's speech detectors.
+
+Every WAV in data/samples is padded with lead-in and trailing silence, mixed
+with synthetic background noise and streamed block by block through the
+Endpointer, exactly like the microphone loop does. For each detector it
+reports whether the utterance was found, how much of its onset was clipped,
+how long after the end of the sample the utterance was closed, and how many
+seconds of audio would be sent to Whisper. A noise-only clip per condition
+shows how much garbage each detector lets through.
+"""
+import csv
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from voice_assist.transacription.config import TranscriberConfig
+from voice_assist.transacription.resample import load_audio
+from voice_assist.transacription.vad import Endpointer
+
+# --- CONFIG ---
+AUDIO_DIR = Path("data/samples")  # folder containing audio files to test
+DETECTORS = ["threshold", "energy", "silero"]
+NOISES = ["quiet", "fan", "keyboard"]
+SAMPLE_RATE = 16000  # the rate the transcriber runs VAD at (config.model_rate)
+LEAD_SECONDS = 1.5  # background noise before the sample
+TAIL_SECONDS = 3.0  # background noise after the sample
+NOISE_ONLY_SECONDS = 20.0
+SPEECH_LEVEL = 0.1  # RMS the samples are normalized to
+SEED = 0
+
+OUTPUT_DIR = Path("benchmarks/results")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CSV_FILE = OUTPUT_DIR / "vad_benchmark.csv"
+
+
+# --- SYNTHETIC NOISE ---
+def background(kind, n, rng):
+    hiss = rng.normal(0, 0.001, n)
+    if kind == "quiet":
+        return hiss
+    if kind == "fan":
+        # Low-frequency rumble with a motor hum, loud enough to beat the fixed threshold
+        spectrum = np.fft.rfft(rng.normal(0, 1, n))
+        freqs = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+        spectrum *= np.where(freqs > 20, 1 / np.maximum(freqs, 20), 0)  # 1/f above 20 Hz
+        rumble = np.fft.irfft(spectrum, n)
+        rumble *= 0.03 / (rumble.std() + 1e-12)
+        hum = 0.01 * np.sin(2 * np.pi * 120 * np.arange(n) / SAMPLE_RATE)
+        return hiss + rumble + hum
+    if kind == "keyboard":
+        clicks = np.zeros(n)
+        click = rng.normal(0, 1, 240) * np.exp(-np.arange(240) / 30)  # 10 ms decaying burst
+        for start in rng.integers(0, n - 240, size=int(n / SAMPLE_RATE * 6)):  # ~6 keys/s
+            clicks[start : start + 240] += 0.3 * rng.uniform(0.5, 1.0) * click
+        return hiss + clicks
+    raise ValueError(kind)
+
+
+# --- HELPERS ---
+def load_sample(path):
+    audio = load_audio(path, SAMPLE_RATE)  # band-limited, like the transcriber's own input
+    return audio * (SPEECH_LEVEL / (np.sqrt(np.mean(audio**2)) + 1e-12))
+
+
+def run_endpointer(config, signal):
+    """Feed signal block by block; return (start block, end block, samples kept, CPU seconds)."""
+    endpointer = Endpointer(config)
+    block_size = int(config.model_rate * config.block_duration)
+    start = end = None
+    kept = 0
+    cpu = time.process_time()
+    for i in range(len(signal) // block_size):
+        event = endpointer.feed(signal[i * block_size : (i + 1) * block_size].astype(np.float32))
+        if event == "start" and start is None:
+            start = i + 1 - len(endpointer.buffer) // block_size  # first block handed to Whisper
+        elif event == "end":
+            kept += len(endpointer.audio())
+            end = end if end is not None else i + 1
+            endpointer.reset()
+    if endpointer.recording:
+        kept += len(endpointer.audio())
+    return start, end, kept, time.process_time() - cpu
+
+
+def evaluate(detector, noise, sample, rng):
+    config = TranscriberConfig(sample_rate=SAMPLE_RATE, vad=detector, silence_threshold=0.02)
+    block = config.block_duration
+    lead, tail = int(LEAD_SECONDS * SAMPLE_RATE), int(TAIL_SECONDS * SAMPLE_RATE)
+    signal = np.concatenate([np.zeros(lead), sample, np.zeros(tail)])
+    signal = signal + background(noise, len(signal), rng)
+
+    start, end, kept, cpu = run_endpointer(config, signal)
+    onset = lead / SAMPLE_RATE
+    offset = (lead + len(sample)) / SAMPLE_RATE
+    return {
+        "detected": start is not None,
+        "onset_clipped_ms": None if start is None else max(0.0, (start * block - onset) * 1000),
+        "endpoint_latency_s": None if end is None else end * block - offset,
+        "whisper_audio_s": kept / SAMPLE_RATE,
+        "cpu_ms_per_s": cpu * 1000 / (len(signal) / SAMPLE_RATE),
+    }
+
+
+def noise_only(detector, noise, rng):
+    config = TranscriberConfig(sample_rate=SAMPLE_RATE, vad=detector, silence_threshold=0.02)
+    signal = background(noise, int(NOISE_ONLY_SECONDS * SAMPLE_RATE), rng)
+    _, _, kept, _ = run_endpointer(config, signal)
+    return kept / SAMPLE_RATE
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.mean(values), 3) if values else None
+
+
+# --- RUN BENCHMARK ---
+def main():
+    audio_files = sorted(AUDIO_DIR.glob("*.wav"))
+    if not audio_files:
+        print(f"No audio files found in {AUDIO_DIR}")
+        return
+    print(f"Found {len(audio_files)} audio files in {AUDIO_DIR}")
+    samples = [load_sample(path) for path in audio_files]
+    speech_seconds = sum(len(s) for s in samples) / SAMPLE_RATE
+
+    rows = []
+    for detector in DETECTORS:
+        for noise in NOISES:
+            rng = np.random.default_rng(SEED)
+            try:
+                results = [evaluate(detector, noise, sample, rng) for sample in samples]
+            except RuntimeError as e:  # e.g. onnxruntime missing for silero
+                print(f"{detector:>9}: skipped ({e})")
+                break
+            row = {
+                "detector": detector,
+                "noise": noise,
+                "detected": f"{sum(r['detected'] for r in results)}/{len(results)}",
+                "onset_clipped_ms": mean(r["onset_clipped_ms"] for r in results),
+                "endpoint_latency_s": mean(r["endpoint_latency_s"] for r in results),
+                "whisper_audio_s": round(sum(r["whisper_audio_s"] for r in results), 2),
+                "speech_audio_s": round(speech_seconds, 2),
+                "noise_only_audio_s": round(noise_only(detector, noise, np.random.default_rng(SEED)), 2),
+                "cpu_ms_per_audio_s": mean(r["cpu_ms_per_s"] for r in results),
+            }
+            rows.append(row)
+            print(
+                f"{detector:>9} / {noise:<8}: detected {row['detected']} | onset clipped "
+                f"{row['onset_clipped_ms']}ms | endpoint +{row['endpoint_latency_s']}s | "
+                f"to Whisper {row['whisper_audio_s']}s of {row['speech_audio_s']}s speech | "
+                f"noise-only {row['noise_only_audio_s']}s of {NOISE_ONLY_SECONDS}s | "
+                f"CPU {row['cpu_ms_per_audio_s']}ms per audio s"
+            )
+
+    with open(CSV_FILE, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Local stand-in for the Edge TTS websocket service, for offline runs.
+
+MockEdgeServer speaks enough of the protocol edge_tts uses: it reads the
+speech.config and SSML requests, waits `first_audio_delay`, then streams
+24 kHz mono 48 kbps MP3 (a synthetic voice-like tone, `seconds_per_char`
+long per character of text) `speed` times faster than real time, and ends
+the turn. start() points edge_tts at it by patching
+edge_tts.communicate.WSS_URL; stop() restores it.
+
+    with MockEdgeServer():
+        Vocalizer(engine="edge").create_audio("Hello.")
+"""
+import asyncio
+import re
+import socket
+import threading
+import uuid
+
+import av
+import edge_tts.communicate
+import numpy as np
+from aiohttp import WSMsgType, web
+
+SAMPLE_RATE = 24000
+BIT_RATE = 48000
+
+
+def encode_mp3(samples, rate=SAMPLE_RATE):
+    """Encode mono float samples as raw MP3 frames."""
+    codec = av.CodecContext.create("libmp3lame", "w")
+    codec.sample_rate = rate
+    codec.layout = "mono"
+    codec.format = "fltp"
+    codec.bit_rate = BIT_RATE
+    out = bytearray()
+    size = codec.frame_size or 1152
+    for i in range(0, len(samples), size):
+        block = np.zeros((1, size), dtype=np.float32)
+        block[0, : len(samples[i : i + size])] = samples[i : i + size]
+        frame = av.AudioFrame.from_ndarray(block, format="fltp", layout="mono")
+        frame.sample_rate = rate
+        for packet in codec.encode(frame):
+            out += bytes(packet)
+    for packet in codec.encode(None):
+        out += bytes(packet)
+    return bytes(out)
+
+
+def synthetic_voice(seconds, rate=SAMPLE_RATE):
+    """Harmonic tone with a syllable-rate envelope."""
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 180 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    tone = sum(np.sin(k * phase) / k for k in range(1, 6))
+    return (0.2 * tone * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2)).astype(np.float32)
+
+
+def _text_message(request_id, path, body=""):
+    return f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+
+def _audio_message(request_id, data):
+    header = f"X-RequestId:{request_id}\r\nX-StreamId:{uuid.uuid4().hex}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode()
+    return len(header).to_bytes(2, "big") + header + data
+
+
+class MockEdgeServer:
+    def __init__(self, first_audio_delay=0.2, speed=5.0, seconds_per_char=0.06, message_seconds=0.1):
+        self.first_audio_delay = first_audio_delay
+        self.speed = speed
+        self.seconds_per_char = seconds_per_char
+        self.message_seconds = message_seconds  # audio per websocket message
+        self.connections = 0
+        self.requests = []  # texts received
+        self._loop = None
+        self._runner = None
+        self._original_url = None
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        async for message in ws:
+            if message.type != WSMsgType.TEXT or "Path:ssml" not in message.data:
+                continue
+            request_id = re.search(r"X-RequestId:(\w+)", message.data).group(1)
+            text = re.sub(r"<[^>]+>", "", message.data.split("\r\n\r\n", 1)[1])
+            self.requests.append(text)
+            mp3 = encode_mp3(synthetic_voice(max(0.3, len(text) * self.seconds_per_char)))
+
+            await ws.send_str(_text_message(request_id, "turn.start", "{}"))
+            await asyncio.sleep(self.first_audio_delay)
+            step = int(BIT_RATE / 8 * self.message_seconds)
+            try:
+                for i in range(0, len(mp3), step):
+                    await ws.send_bytes(_audio_message(request_id, mp3[i : i + step]))
+                    await asyncio.sleep(self.message_seconds / self.speed)
+                await ws.send_str(_text_message(request_id, "turn.end", "{}"))
+            except ConnectionResetError:  # the client gave up on the sentence
+                break
+        return ws
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get("/{tail:.*}", self._handle)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            await web.SockSite(self._runner, sock).start()
+
+        asyncio.run_coroutine_threadsafe(serve(), self._loop).result()
+        self._original_url = edge_tts.communicate.WSS_URL
+        edge_tts.communicate.WSS_URL = f"ws://127.0.0.1:{port}/edge/v1?TrustedClientToken=mock"
+        return self
+
+    def stop(self):
+        edge_tts.communicate.WSS_URL = self._original_url
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,162 @@
+"""
+Local stand-in for the Ollama HTTP API, for offline runs.
+
+MockOllamaServer answers the endpoints AI_AGENT and the benchmarks use:
+/api/generate (warm-up, or unload with keep_alive=0), /api/chat, streamed
+or not, and /api/tags. Each chat reply is the next entry of `replies`
+(cycled), or `replies(messages)` when it is a function. It is streamed
+word by word as NDJSON, the first token after `first_token_delay` and the
+rest at `tokens_per_second`, so runs are repeatable. The first request for
+a model (or for new num_ctx / num_thread options, which make Ollama
+reload it) also waits `load_delay`. The final chunk carries Ollama's
+timing fields (load, prompt eval and eval counts and durations, with a
+word counted as a token). A client that disconnects mid-reply (barge-in)
+simply ends the stream. start() sets OLLAMA_HOST, which ollama.Client()
+reads when no host is given; stop() restores it.
+
+    with MockOllamaServer(["Sure."]):
+        AI_AGENT().chat_stream([{"role": "user", "content": "Hi"}])
+"""
+import asyncio
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MockOllamaServer:
+    def __init__(self, replies, first_token_delay=0.15, tokens_per_second=40.0, load_delay=0.0):
+        self.replies = replies
+        self.first_token_delay = first_token_delay
+        self.tokens_per_second = tokens_per_second
+        self.load_delay = load_delay
+        self._loaded = set()  # (model, num_ctx, num_thread) in "memory"
+        self.requests = []  # (path, body) received
+        self._cycle = itertools.cycle(replies) if not callable(replies) else None
+        self._loop = None
+        self._runner = None
+        self._original_host = None
+        self.host = None
+
+    def _reply(self, messages):
+        return self.replies(messages) if self._cycle is None else next(self._cycle)
+
+    async def _load(self, body):
+        """Seconds spent "loading" the model for this request."""
+        options = body.get("options") or {}
+        key = (body.get("model"), options.get("num_ctx"), options.get("num_thread"))
+        if key in self._loaded:
+            return 0.0
+        self._loaded = {k for k in self._loaded if k[0] != key[0]} | {key}
+        await asyncio.sleep(self.load_delay)
+        return self.load_delay
+
+    async def _generate(self, request):
+        body = await request.json()
+        self.requests.append(("/api/generate", body))
+        if body.get("keep_alive") == 0:
+            self._loaded = {k for k in self._loaded if k[0] != body.get("model")}
+            load = 0.0
+        else:
+            load = await self._load(body)
+        return web.json_response(
+            {"model": body.get("model"), "created_at": _now(), "response": "", "done": True, "load_duration": int(load * 1e9)}
+        )
+
+    async def _tags(self, request):
+        return web.json_response({"models": [{"model": k[0], "name": k[0]} for k in self._loaded]})
+
+    async def _chat(self, request):
+        body = await request.json()
+        self.requests.append(("/api/chat", body))
+        model = body.get("model")
+        reply = self._reply(body.get("messages", []))
+        words = reply.split(" ")
+        started = time.perf_counter()
+        load = await self._load(body)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+
+        def done(eval_started):
+            finished = time.perf_counter()
+            return {
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((finished - started) * 1e9),
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(self.first_token_delay * 1e9),
+                "eval_count": len(words),
+                "eval_duration": int((finished - eval_started) * 1e9),
+            }
+
+        if not body.get("stream", True):
+            await asyncio.sleep(self.first_token_delay)
+            eval_started = time.perf_counter()
+            await asyncio.sleep(len(words) / self.tokens_per_second)
+            final = done(eval_started)
+            final["message"]["content"] = reply
+            return web.json_response(final)
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        eval_started = time.perf_counter() + self.first_token_delay
+        try:
+            for i, word in enumerate(words):
+                due = eval_started + i / self.tokens_per_second
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                token = word if i == 0 else " " + word
+                chunk = {"model": model, "created_at": _now(), "message": {"role": "assistant", "content": token}, "done": False}
+                await response.write((json.dumps(chunk) + "\n").encode())
+            await response.write((json.dumps(done(eval_started)) + "\n").encode())
+            await response.write_eof()
+        except ConnectionResetError:  # the client gave up on the reply
+            pass
+        return response
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+        async def serve():
+            app = web.Application()
+            app.router.add_post("/api/generate", self._generate)
+            app.router.add_post("/api/chat", self._chat)
+            app.router.add_get("/api/tags", self._tags)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            await web.SockSite(self._runner, sock).start()
+
+        asyncio.run_coroutine_threadsafe(serve(), self._loop).result()
+        self.host = f"http://127.0.0.1:{port}"
+        self._original_host = os.environ.get("OLLAMA_HOST")
+        os.environ["OLLAMA_HOST"] = self.host
+        return self
+
+    def stop(self):
+        if self._original_host is None:
+            os.environ.pop("OLLAMA_HOST", None)
+        else:
+            os.environ["OLLAMA_HOST"] = self._original_host
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,20 +1,48 @@
+import socket
+import threading
 import time
+import weakref
+import httpx
 import ollama
 import re
-from voice_assist.utils.context_manager import ContextManager
+from voice_assist.utils.context_manager import ContextManager, ContextWindow
+from voice_assist.llm.sentence_segmenter import SentenceSegmenter
 from voice_assist.tools.tools import extract_tool_call
 from ollama._types import ChatResponse
 import multiprocessing as mp
 from colorama import Fore
 
 PROMPT = ""
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few sentences for your own memory. "
+    "Keep names, facts, decisions and open requests; drop small talk."
+)
 
 class AI_AGENT:
     def __init__(
-        self, user_id="user", model="tinyllama", context_file="data/context.json"
+        self,
+        user_id="user",
+        model="tinyllama",
+        context_file="data/context.jsonl",
+        num_ctx=4096,
+        host=None,
+        keep_alive=-1,
     ):
         self.context_manager = ContextManager(context_file)
         self.model = model
+        self.num_ctx = num_ctx
+        # One client per agent so the HTTP connection to Ollama is reused, and
+        # keep_alive=-1 pins the model in memory between turns
+        self.host = host
+        self._clients = weakref.WeakKeyDictionary()  # client -> (its network streams, on_abort)
+        self._abort_warned = False
+        self.client = self.new_client()
+        self.keep_alive = keep_alive
+        self.last_ttft = None
+        # Keeps each prompt within num_ctx no matter how long the conversation gets
+        self.context_window = ContextWindow(
+            self.context_manager, max_tokens=num_ctx, summarizer=self._summarize_history
+        )
 
         if self.context_manager.is_user(user_id):
             pass
@@ -23,54 +51,181 @@ class AI_AGENT:
                 user_id=user_id, role="system", content=PROMPT
             )
 
+    def warmup(self):
+        """
+        Load the model into Ollama before the first turn so it doesn't pay the
+        load time. Uses the same num_ctx as real requests, since a different
+        context size would make Ollama reload the model.
+        """
+        start = time.perf_counter()
+        response = self.client.generate(
+            model=self.model,
+            prompt="",
+            options={"num_ctx": self.num_ctx},
+            keep_alive=self.keep_alive,
+        )
+        elapsed = time.perf_counter() - start
+        load = (response.load_duration or 0) / 1e9
+        print(Fore.YELLOW + f"[AI Agent] Warmed up {self.model} in {elapsed:.2f}s (model load {load:.2f}s)")
+        return elapsed
+
     def tool_query(
         self, output_queue: mp.Queue, input: str, user_id="user", tools=None
     ):
         self.context_manager.add_message(user_id, "user", input)
 
-        reesponse = ollama.chat(
+        reesponse = self.client.chat(
             model=self.model,
-            messages=self.context_manager.get_history(user_id),
+            messages=self.context_window.build(user_id),
             tools=tools,
+            options={"num_ctx": self.num_ctx},
+            keep_alive=self.keep_alive,
         )
         print(reesponse)
 
         extract_tool_call(reesponse.message)
 
+    def new_client(self, on_abort=None):
+        """
+        An Ollama client whose connections abort_requests() can shut down.
+        They are found through httpx's "trace" extension, which reports every
+        connection the client opens. `on_abort` is called before they are.
+        """
+        streams = weakref.WeakSet()
+
+        def trace(event, info):
+            if event == "connection.connect_tcp.complete":
+                streams.add(info["return_value"])
+
+        def trace_request(request):
+            request.extensions["trace"] = trace
+
+        client = ollama.Client(host=self.host, event_hooks={"request": [trace_request]})
+        self._clients[client] = (streams, on_abort)
+        return client
+
+    def chat_stream(self, messages, tools=None, options=None, client=None):
+        """
+        Yield content tokens from a streamed chat. Closing the generator closes
+        the HTTP response, which makes Ollama stop generating.
+        """
+        stream = (client or self.client).chat(
+            model=self.model,
+            messages=messages,
+            tools=tools,
+            stream=True,
+            options={"num_ctx": self.num_ctx, **(options or {})},
+            keep_alive=self.keep_alive,
+        )
+        try:
+            for part in stream:
+                yield part["message"]["content"]
+        finally:
+            stream.close()
+
+    def prefill(self, messages):
+        """Have Ollama evaluate (and cache) a prompt while generating one token."""
+        self.client.chat(
+            model=self.model,
+            messages=messages,
+            options={"num_ctx": self.num_ctx, "num_predict": 1},
+            keep_alive=self.keep_alive,
+        )
+
     def stream_query(
-        self, output_queue, input: str, user_id="user", tools=None
+        self,
+        output_queue,
+        input: str,
+        user_id="user",
+        tools=None,
+        segmenter=None,
+        tokens=None,
+        cancel=None,
     ):
+        """
+        Stream a reply to `input`, putting (chunk, timestamp) on output_queue.
+        `tokens` may supply an already running generation (see speculative.py).
+        Once `cancel.cancelled` is true, a watcher thread notices within
+        about 20 ms and shuts down the request's connection, so generation
+        stops even while Ollama is still evaluating the prompt and no token
+        has arrived; the partial reply is returned.
+        """
         self.context_manager.add_message(user_id, "user", input)
         print(f"[AI Agent] User input: {input}")
 
         full_content_response = ""
-        buffer = ""
+        segmenter = segmenter or SentenceSegmenter()
+        start = time.perf_counter()
+        self.last_ttft = None
 
-        for part in ollama.chat(
-            model=self.model,
-            messages=self.context_manager.get_history(user_id),
-            tools=tools,
-            stream=True,
-        ):
-            token = part["message"]["content"]
-            buffer += token
-            full_content_response += token
-            print(token, end="", flush=True)  # still print tokens in real-time
+        if tokens is None:
+            tokens = self.chat_stream(self.context_window.build(user_id), tools=tools)
+
+        finished = threading.Event()
+        if cancel is not None:
+            threading.Thread(target=self._abort_on_cancel, args=(cancel, finished), daemon=True).start()
+        try:
+            for token in tokens:
+                if cancel is not None and cancel.cancelled:
+                    break
+
+                if self.last_ttft is None and token:
+                    self.last_ttft = time.perf_counter() - start
+                    print(Fore.YELLOW + f"[AI Agent] First token after {self.last_ttft:.3f}s")
+                full_content_response += token
+                print(token, end="", flush=True)  # still print tokens in real-time
 
-            # Check if a sentence has ended
-            sentences = re.split(r"([.!?])", buffer)  # keep punctuation
-            while len(sentences) > 2:  # means we have at least one full sentence
-                sentence = sentences[0] + sentences[1]
-                output_queue.put((sentence.strip(), time.time()))
-                sentences = sentences[2:]
+                # Only the new characters are scanned for sentence ends
+                for sentence in segmenter.feed(token):
+                    output_queue.put((sentence, time.time()))
+        except httpx.TransportError:
+            if cancel is None or not cancel.cancelled:
+                raise
+        finally:
+            finished.set()
 
-            buffer = "".join(sentences)
+        if cancel is not None and cancel.cancelled:
+            tokens.close()  # drops the HTTP stream so Ollama stops generating
+            print(Fore.RED + "\n[AI Agent] Reply interrupted.")
+            return full_content_response.strip()
 
-        if buffer.strip():
-            output_queue.put(buffer.strip())
+        for sentence in segmenter.flush():
+            output_queue.put((sentence, time.time()))
 
         return full_content_response.strip()
 
+    def _abort_on_cancel(self, cancel, finished, interval=0.02):
+        while not finished.wait(interval):
+            if cancel.cancelled:
+                self.abort_requests()
+                return
+
+    def abort_requests(self, client=None):
+        """
+        Shut down the sockets of `client`'s connections, or of every client
+        this agent made, so a read blocked on Ollama fails at once and Ollama
+        sees the disconnect (closing the client would not wake the read).
+        Aborting every client also drops a concurrent speculative prefill or
+        provisional reply; they belonged to the turn being cancelled. Idle
+        keep-alive connections are simply reopened.
+        """
+        clients = [client] if client is not None else list(self._clients)
+        sockets = []
+        for c in clients:
+            streams, on_abort = self._clients[c]
+            if on_abort is not None:
+                on_abort()
+            sockets += [stream.get_extra_info("socket") for stream in list(streams)]
+        sockets = [sock for sock in sockets if sock is not None]
+        if client is None and not sockets and not self._abort_warned:
+            self._abort_warned = True
+            print(Fore.RED + "[AI Agent] No Ollama connection seen to abort; cancelling waits for the next token")
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:  # already closed
+                pass
+
     def query_agent(self, sender="user", incoming_text="Hello World!"):
         print(f"AI agent model: {self.model} is generating reply for {sender} \n")
 
@@ -81,9 +236,12 @@ class AI_AGENT:
         # ===== GENERATE REPLY WITH OLLAMA =====
 
     def _generate_reply(self, sender):
-        # Query Ollama with full history
-        response: ChatResponse = ollama.chat(
-            model=self.model, messages=self.context_manager.get_history(sender)
+        # Query Ollama with the recent history that fits in the context window
+        response: ChatResponse = self.client.chat(
+            model=self.model,
+            messages=self.context_window.build(sender),
+            options={"num_ctx": self.num_ctx},
+            keep_alive=self.keep_alive,
         )
 
         print(f"OLLAMA response: {response.message.content}\n")
@@ -92,9 +250,27 @@ class AI_AGENT:
 
         # Save assistant's reply to conversation
         self.context_manager.add_message(sender, "assistant", reply_text)
+        self.context_window.schedule_summary(sender)
 
         return self._parse_model_output(reply_text)
 
+    def _summarize_history(self, summary, messages):
+        """Fold messages that left the context window into the running summary."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if summary:
+            transcript = f"Earlier summary: {summary}\n\n{transcript}"
+
+        response: ChatResponse = self.client.chat(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript},
+            ],
+            options={"num_ctx": self.num_ctx},
+            keep_alive=self.keep_alive,
+        )
+        return self._parse_model_output(response.message.content)
+
     def _parse_model_output(self, text, full_output=False):
         """
         Extracts text inside <think> tags and returns both
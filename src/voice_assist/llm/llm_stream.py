@@ -5,17 +5,28 @@ from voice_assist.llm.ai_agent import AI_AGENT
 
 
 def sentence_streamer(
-    model: str, user_id, input, text_queue, tools=None
+    model: str, user_id, input, text_queue, tools=None, agent=None, tokens=None, cancel=None,
+    summarize=True,
 ) -> None:
-    ai_agent = AI_AGENT(user_id=user_id, model=model)
     """
     Stream tokens from Ollama LLM and enqueue complete sentences.
     Each sentence is pushed to the queue as soon as it's complete.
+    Pass a long-lived `agent` to reuse its history and Ollama connection,
+    `tokens` to continue an adopted speculative generation and `cancel` to
+    abort the reply when the user interrupts. With `summarize=False` the
+    caller schedules the history summary itself, e.g. once the reply has
+    been played.
     """
+    ai_agent = agent or AI_AGENT(user_id=user_id, model=model)
 
     try:
-        full_response = ai_agent.stream_query(text_queue, input, user_id=user_id, tools=tools)
-        ai_agent.context_manager.add_message("user", "assistant", full_response)
+        full_response = ai_agent.stream_query(
+            text_queue, input, user_id=user_id, tools=tools, tokens=tokens, cancel=cancel
+        )
+        ai_agent.context_manager.add_message(user_id, "assistant", full_response)
+        if summarize:
+            # Compact older turns now that the reply has been delivered
+            ai_agent.context_window.schedule_summary(user_id)
     finally:
         # Sentinel to tell the consumer that streaming is done
         text_queue.put(None)
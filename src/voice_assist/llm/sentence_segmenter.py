@@ -0,0 +1,146 @@
+import re
+
+TERMINATORS = ".!?"
+CLOSERS = "\"')]}”’"
+OPENERS = "\"'([{“‘"
+SOFT_BREAKS = ",;:"
+
+# Lowercase, without the trailing period
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "cf", "approx", "nos", "fig", "vol", "inc", "ltd",
+    "co", "corp", "dept", "est", "min", "max", "jan", "feb", "mar", "apr",
+    "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "a.m", "p.m",
+    "u.s", "u.k",
+}
+# Only abbreviations when a number follows ("No. 5"), otherwise ordinary words ("Say no.")
+NUMBER_ABBREVIATIONS = {"no"}
+
+# Whitespace that may end a sentence or clause, and the last whitespace of a text
+_BREAK = re.compile("\n|(?<=[" + re.escape(TERMINATORS + CLOSERS + SOFT_BREAKS) + "])\\s")
+_LAST_SPACE = re.compile(r".*\s", re.DOTALL)
+
+
+class SentenceSegmenter:
+    """
+    Incrementally splits streamed LLM tokens into chunks for speech synthesis.
+
+    Only text that arrives after the scan cursor is searched, and only
+    newlines and whitespace after punctuation are looked at in Python, so
+    each token costs O(len(token)) regardless of how long the pending text is.
+    A period only ends a sentence when it is followed by whitespace and is not
+    part of an abbreviation or initial, which keeps "3.5", "e.g." and URLs
+    intact.
+
+    The first chunk of a reply is emitted as soon as one sentence (at least
+    `first_min_chars` long) is complete. Later sentences are batched until a
+    chunk reaches `min_chars`, so synthesis overhead is paid less often.
+    Text that runs past the max length without a sentence end is broken at
+    the last clause or word boundary.
+    """
+
+    def __init__(self, first_min_chars=1, first_max_chars=100, min_chars=60, max_chars=250):
+        self.first_min_chars = first_min_chars
+        self.first_max_chars = first_max_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.reset()
+
+    def reset(self):
+        self._buffer = ""
+        self._cursor = 0  # next index of _buffer to scan
+        self._boundary = -1  # last sentence end in _buffer
+        self._soft = -1  # last clause break (after , ; :)
+        self._emitted = 0
+
+    def feed(self, text):
+        """Add streamed text and return any chunks that are ready."""
+        buffer = self._buffer = self._buffer + text
+        chunks = []
+        i = self._cursor
+        limit = self._max_length()
+
+        # Jump from one possible sentence or clause end to the next; plain
+        # spaces are only looked for when a chunk has to be broken
+        while True:
+            match = _BREAK.search(buffer, i, limit)
+            if match is None:
+                if len(buffer) < limit:
+                    break
+                space = _LAST_SPACE.match(buffer, 0, limit)
+                space = space.end() - 1 if space else 0
+                cut = max(self._boundary, 0) or max(self._soft, 0) or space or limit
+                self._cut(cut, chunks)
+                buffer, i, limit = self._buffer, limit - cut, self._max_length()
+                continue
+
+            i = match.start()
+            ends = buffer[i] == "\n" or self._ends_sentence(i)
+            if ends is None:  # decided by the next character
+                self._cursor = i
+                return chunks
+            if ends:
+                self._boundary = i
+                if i >= self._min_length():
+                    self._cut(i, chunks)
+                    buffer, i, limit = self._buffer, 0, self._max_length()
+                    continue
+            elif buffer[i - 1] in SOFT_BREAKS:
+                self._soft = i
+            i += 1
+
+        self._cursor = len(buffer)
+        return chunks
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        chunks = []
+        self._cut(len(self._buffer), chunks)
+        self.reset()
+        return chunks
+
+    def _min_length(self):
+        return self.first_min_chars if self._emitted == 0 else self.min_chars
+
+    def _max_length(self):
+        return self.first_max_chars if self._emitted == 0 else self.max_chars
+
+    def _cut(self, pos, chunks):
+        chunk = self._buffer[:pos].strip()
+        if chunk:
+            chunks.append(chunk)
+            self._emitted += 1
+        self._buffer = self._buffer[pos:]
+        self._boundary = self._boundary - pos if self._boundary > pos else -1
+        self._soft = self._soft - pos if self._soft > pos else -1
+
+    def _ends_sentence(self, i):
+        """
+        True if the whitespace at index i follows the end of a sentence, or
+        None if that depends on text that has not arrived yet.
+        """
+        buffer = self._buffer
+        j = i - 1
+        while j >= 0 and buffer[j] in CLOSERS:
+            j -= 1
+        if j < 0 or buffer[j] not in TERMINATORS:
+            return False
+        if buffer[j] != ".":
+            return True
+
+        start = j
+        while start > 0 and not buffer[start - 1].isspace():
+            start -= 1
+        word = buffer[start:j].lstrip(OPENERS).lower()
+
+        if not word or word.endswith("."):  # lone period or ellipsis
+            return True
+        if word in ABBREVIATIONS:
+            return False
+        if word in NUMBER_ABBREVIATIONS:
+            if i + 1 == len(buffer):
+                return None  # not streamed in yet
+            return not buffer[i + 1].isdigit()
+        if len(word) == 1 and word.isalpha():  # initials such as "J. R. R."
+            return False
+        return True
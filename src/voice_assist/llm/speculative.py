@@ -0,0 +1,186 @@
+import queue
+import re
+import threading
+
+from colorama import Fore
+
+
+def normalize(text):
+    """Compare transcripts without case, punctuation or extra spaces."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text or "").lower().split())
+
+
+class ProvisionalGeneration:
+    """
+    A reply generated in the background from a partial transcript.
+    Tokens are buffered until the generation is adopted or cancelled.
+    It runs on its own client, so cancelling it aborts only its request.
+    """
+
+    def __init__(self, agent, messages):
+        self.tokens_generated = 0  # includes any that arrive after cancel()
+        self._agent = agent
+        self._tokens = queue.Queue()
+        self._cancelled = threading.Event()
+        self._client = agent.new_client(on_abort=self._cancelled.set)
+        self._thread = threading.Thread(target=self._run, args=(messages,), daemon=True)
+        self._thread.start()
+
+    def _run(self, messages):
+        stream = self._agent.chat_stream(messages, client=self._client)
+        try:
+            for token in stream:
+                self.tokens_generated += 1
+                if self._cancelled.is_set():
+                    break
+                self._tokens.put(token)
+        except Exception as e:
+            if not self._cancelled.is_set():  # an abort is expected to break the stream
+                print(Fore.RED + f"[Speculative] Provisional generation failed: {e}")
+        finally:
+            stream.close()
+            self._client.close()
+            self._tokens.put(None)
+
+    def cancel(self):
+        """Stop generating now, even if Ollama is still evaluating the prompt."""
+        self._agent.abort_requests(self._client)
+
+    def join(self, timeout=None):
+        """Wait for the request to end; True once it has."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def tokens(self):
+        """Yield buffered tokens, then the rest as they are generated."""
+        while True:
+            token = self._tokens.get()
+            if token is None:
+                return
+            yield token
+
+
+class Speculator:
+    """
+    Opt-in speculative LLM work driven by partial transcripts.
+
+    Every new partial transcript sends a prefill request (history + partial
+    utterance, one generated token) so Ollama's KV cache is warm by the time
+    the final transcript arrives. With `generate=True` a provisional reply is
+    started instead; it is adopted if the final transcript matches the partial
+    and cancelled otherwise. Like prefills, only one runs at a time. Useful
+    and wasted work is counted in `stats`.
+    """
+
+    join_timeout = 0.1  # how long a new partial waits for the cancelled generation to stop
+
+    def __init__(self, agent, user_id="user", generate=False):
+        self.agent = agent
+        self.user_id = user_id
+        self.generate = generate
+        self.stats = {
+            "partials": 0,
+            "prefills": 0,
+            "prefill_hits": 0,  # final transcript extended the prefilled partial
+            "adopted": 0,
+            "cancelled": 0,
+            "useful_tokens": 0,
+            "wasted_tokens": 0,
+        }
+        self._partial = None
+        self._provisional = None
+        self._retired = []  # (generation, tokens used) not yet counted in stats
+        self._prefill_thread = None
+
+    def on_partial(self, text):
+        if normalize(text) == normalize(self._partial):
+            return
+        self._partial = text
+        self.stats["partials"] += 1
+        self._discard()
+
+        messages = self.agent.context_window.build(
+            self.user_id, extra=[{"role": "user", "content": text}]
+        )
+        if self.generate:
+            if self._settle(self.join_timeout):
+                self._provisional = ProvisionalGeneration(self.agent, messages)
+        elif self._prefill_thread is None or not self._prefill_thread.is_alive():
+            self.stats["prefills"] += 1
+            self._prefill_thread = threading.Thread(
+                target=self._prefill, args=(messages,), daemon=True
+            )
+            self._prefill_thread.start()
+
+    def _prefill(self, messages):
+        try:
+            self.agent.prefill(messages)
+        except Exception as e:
+            print(Fore.RED + f"[Speculative] Prefill failed: {e}")
+
+    def take(self, final_text):
+        """
+        Called with the final transcript. Returns the provisional token stream
+        if it was generated for the same utterance, otherwise None.
+        """
+        partial, self._partial = self._partial, None
+        if partial is None:
+            return None
+        if normalize(final_text).startswith(normalize(partial)):
+            self.stats["prefill_hits"] += 1
+
+        provisional, self._provisional = self._provisional, None
+        if provisional is None:
+            return None
+        if normalize(final_text) != normalize(partial):
+            self._cancel(provisional)
+            return None
+
+        self.stats["adopted"] += 1
+        return self._count_useful(provisional)
+
+    def _count_useful(self, provisional):
+        used = 0
+        try:
+            for token in provisional.tokens():
+                used += 1
+                self.stats["useful_tokens"] += 1
+                yield token
+        finally:
+            provisional.cancel()  # reply was interrupted; stop generating
+            self._retired.append((provisional, used))
+
+    def _discard(self):
+        if self._provisional is not None:
+            self._cancel(self._provisional)
+            self._provisional = None
+
+    def _cancel(self, provisional):
+        provisional.cancel()
+        self.stats["cancelled"] += 1
+        self._retired.append((provisional, 0))
+
+    def _settle(self, timeout=0.0):
+        """
+        Count the unused tokens of generations that have stopped as wasted.
+        Returns True once none is still running.
+        """
+        running = []
+        for provisional, used in self._retired:
+            if provisional.join(timeout):
+                self.stats["wasted_tokens"] += provisional.tokens_generated - used
+            else:
+                running.append((provisional, used))
+        self._retired = running
+        return not running
+
+    def report(self):
+        self._settle(self.join_timeout)
+        s = self.stats
+        print(
+            Fore.MAGENTA
+            + f"[Speculative] partials={s['partials']} prefills={s['prefills']} "
+            f"prefill_hits={s['prefill_hits']} adopted={s['adopted']} "
+            f"cancelled={s['cancelled']} tokens useful={s['useful_tokens']} "
+            f"wasted={s['wasted_tokens']}"
+        )
@@ -1,37 +1,103 @@
 import multiprocessing
+import os
+import queue
 import time
-import select, sys
+import sys
+import threading
 import sounddevice as sd
 import numpy as np
-import soundfile as sf 
 from pathlib import Path
-from datetime import datetime
 from colorama import Fore, init
+from voice_assist.llm.ai_agent import AI_AGENT
 from voice_assist.llm.llm_stream import sentence_streamer
+from voice_assist.llm.speculative import Speculator
 from voice_assist.transacription.transcriber import Transcriber
+from voice_assist.voice.phrase_cache import PhraseCache
+from voice_assist.voice.playback import AudioOutput
+from voice_assist.voice.synth_scheduler import GapMeter, SynthesisScheduler
 from voice_assist.voice.voice_synth import Vocalizer
+from voice_assist.utils.audio_archive import AudioArchiver
 from voice_assist.utils.context_manager import ContextManager
+from voice_assist.utils.shared_audio import SharedAudioRing
+from voice_assist.utils.tracing import MarkingQueue, TraceCollector, Tracer, monotonic_from_wall
+from voice_assist.utils.turns import TurnQueue, TurnTracker
 
 
 from voice_assist.transacription.transcriber import Transcriber
 from voice_assist.transacription.config import TranscriberConfig
 
+# Speculative mode feeds partial transcripts to the LLM while the user is still
+# talking. It costs extra Whisper and LLM work, so leave it off on weak CPUs.
+SPECULATIVE = False
+SPECULATIVE_GENERATION = False  # also start a provisional reply, not just a prefill
+
+# Barge-in: speaking over the assistant cancels its reply (generation, pending
+# synthesis and the sentence being played). Without echo cancellation the
+# assistant's own voice can trigger it, so use headphones or turn it off.
+# With it off, what the user says meanwhile is answered after the reply.
+BARGE_IN = True
+
+# Whisper weights precision. "auto" times the supported quantized types and
+# thread counts on a sample clip once per machine (cached in
+# data/whisper_autotune.json) and keeps the fastest that transcribes as well.
+WHISPER_COMPUTE_TYPE = "auto"
+
+# Short replies recur (acknowledgements, confirmations, errors). Their audio is
+# cached in memory and under PHRASE_CACHE_DIR; these are synthesized at startup
+# if they aren't cached yet.
+PHRASE_CACHE_DIR = Path("data/tts_cache")
+CACHED_PHRASES = [
+    "Sure.",
+    "Okay.",
+    "Done.",
+    "Sure, I can help with that.",
+    "Let me know if you want anything else.",
+    "Sorry, I didn't catch that.",
+    "Sorry, something went wrong.",
+]
+
+# Sentences are synthesized in parallel while earlier ones play. Each worker
+# has its own Kokoro session (sharing the cores between them), and at most
+# SYNTH_LOOKAHEAD sentences are synthesized ahead of the one playing.
+SYNTH_WORKERS = 2
+SYNTH_LOOKAHEAD = 3
+
+# Speaker output: one long-lived stream at OUTPUT_RATE (Kokoro's and Edge's
+# rate; anything else is resampled). Swap OUTPUT_STREAM for
+# voice_assist.voice.playback.NullOutputStream to run without a sound card.
+OUTPUT_RATE = 24000
+OUTPUT_STREAM = sd.OutputStream
+OUTPUT_QUEUE_SECONDS = 0.5  # audio queued on the stream ahead of the speaker
+
+# Microphone input; swap for a functools.partial of
+# voice_assist.transacription.capture.ArrayInputStream to feed recordings.
+INPUT_STREAM = sd.InputStream
+
+# Debug copies of what was heard and said, written as FLAC off the hot path
+# to data/audio_input: "all", "errors" (empty transcripts, failed synthesis)
+# or "off". The oldest files are deleted beyond the archiver's limits.
+ARCHIVE_AUDIO = "all"
+
+# Per-turn tracing: every stage records timing spans (speech end, endpoint,
+# Whisper, LLM first token, sentences, synthesis, playback) to a JSONL file
+# in TRACE_DIR, plus a Chrome trace on exit, and prints a waterfall per turn.
+TRACE = True
+TRACE_DIR = Path("data/traces")
+
 # Create a configuration object
 transcriberConfig = TranscriberConfig(
-    sample_rate=24000,
+    sample_rate=24000,  # microphone rate; resampled to model_rate (16 kHz) at capture
     channels=1,
     block_duration=0.1,
     silence_threshold=0.02,
     silence_duration=2.0,
-    output_dir=Path("data/audio_input")
+    output_dir=Path("data/audio_input"),
+    archive=ARCHIVE_AUDIO,
+    speculative=SPECULATIVE,
 )
 
-context_manager = ContextManager()
-context_manager.clear_user("user")
-
-SAMPLE_RATE = 16000
 OUTPUT_DIR = Path("data/audio_input")
-OUTPUT_DIR.mkdir(exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 LLM_MODEL = "llama3.1:8b"
 
 init(autoreset=True)
@@ -39,158 +105,313 @@ init(autoreset=True)
 # -------------------------------
 # Processes
 # -------------------------------
+# Every stage blocks on its input queue and wakes as soon as work arrives.
+# Pausing is signalled with the shared `running` Event: while it is cleared,
+# stages drop whatever they receive instead of polling for a resume.
+# Every message carries the turn it belongs to; once `turns` has moved on,
+# stages drop or abort stale work instead of flushing queues.
+
+def transcriber_process(transcribe_queue, command_queue, playback_ring, turns, tracer=Tracer()):
+    transcriber = Transcriber(config=transcriberConfig, compute_type=WHISPER_COMPUTE_TYPE, input_stream=INPUT_STREAM)
+
+    def on_partial(text):
+        transcribe_queue.put(("partial", text, time.time(), turns.current))
+
+    def on_speech_start():
+        turn_id = turns.begin()
+        print(Fore.RED + f"[Transcriber] Speech detected, starting turn {turn_id}")
 
-def transcriber_process(transcribe_queue, command_queue, playback_queue):
-    transcriber = Transcriber(config=transcriberConfig)
     while True:
-        text = transcriber.transcribe(agent_audio_buffer=playback_queue)
-        transcribe_queue.put((text, time.time()))
+        text = transcriber.transcribe(
+            agent_audio_buffer=playback_ring,
+            on_partial=on_partial,
+            on_speech_start=on_speech_start if BARGE_IN else None,
+        )
+        if not transcriberConfig.echo_cancellation:
+            # Nobody reads the reference; recycle its slots so playback never stalls
+            playback_ring.clear()
         print(f"[Transcriber] Produced: {text}")
 
         if text.lower().strip() in ("stop.", "start."):
             command_queue.put(text.lower().strip())
             print(f"[Transcriber] Detected voice command: {text}")
-
-        time.sleep(1)
-
-def llm_process(transcribe_queue, llm_queue, llm_running):
-    while True:
-        if not llm_running["value"]:
-            time.sleep(0.1)
             continue
 
-        if not transcribe_queue.empty():
-            try:
-                text, timestamp = transcribe_queue.get_nowait()
-                print(f"[LLM Process] Received: {text}")
-                sentence_streamer(LLM_MODEL, "user", text, llm_queue)
-            except:
-                continue
+        if BARGE_IN:
+            turn_id = turns.current  # begun when the user started speaking
         else:
-            time.sleep(0.01)
+            while turns.replying:  # let the assistant finish before answering
+                time.sleep(0.05)
+            turn_id = turns.begin_reply()
+        transcribe_queue.put(("final", text, time.time(), turn_id))
+        for name, start, end in transcriber.spans:
+            tracer.span(turn_id, name, start, end)
+
+def llm_process(transcribe_queue, llm_queue, running, turns, tracer=Tracer()):
+    # One agent for the life of the stage: history stays in memory, the Ollama
+    # connection is reused and the model is loaded before the first utterance
+    agent = AI_AGENT(user_id="user", model=LLM_MODEL)
+    try:
+        agent.warmup()
+    except Exception as e:  # Ollama not up yet; the first request loads the model instead
+        print(Fore.RED + f"[LLM Process] Warm-up failed: {e}")
+    speculator = Speculator(agent, generate=SPECULATIVE_GENERATION) if SPECULATIVE else None
+    summary_due = None  # turn whose reply must be heard before older history is summarized
+    while True:
+        if summary_due is not None and not turns.replying:
+            # Summarize once the reply has been heard, so the summary doesn't
+            # compete with generation and synthesis; if interrupted, after the next one
+            if not turns.is_stale(summary_due):
+                agent.context_window.schedule_summary("user")
+            summary_due = None
+        try:
+            kind, text, timestamp, turn_id = transcribe_queue.get(timeout=0.1 if summary_due is not None else None)
+        except queue.Empty:
+            continue
+        if not running.is_set() or turns.is_stale(turn_id):
+            turns.finish_reply(turn_id)  # nothing will be said for it
             continue
 
-def voice_synthesizer(llm_queue, audio_queue, llm_running, engine="kokoro"):
-    vocalizer = Vocalizer(engine=engine)
-    print(f"[Voice Synthesizer] Using engine: {engine}")
-    i = 0
-    while True:
-        if not llm_running["value"]:
-            time.sleep(0.1)
+        if kind == "partial":
+            if speculator:
+                print(f"[LLM Process] Partial: {text}")
+                speculator.on_partial(text)
             continue
 
+        print(f"[LLM Process] Received: {text}")
+        tokens = speculator.take(text) if speculator else None
+        started = time.monotonic()
+        turns.start_reply(turn_id)
         try:
-            response, timestamp = llm_queue.get()
-            print(f"[Voice Synthesizer] Received: {response}")
-        except:
-            time.sleep(0.01)
+            sentence_streamer(
+                LLM_MODEL,
+                "user",
+                text,
+                MarkingQueue(TurnQueue(llm_queue, turn_id), tracer, turn_id, "sentence"),
+                agent=agent,
+                tokens=tokens,
+                cancel=turns.token(turn_id),
+                summarize=False,
+            )
+            summary_due = turn_id
+        except Exception as e:  # e.g. Ollama down or the model missing; keep serving later turns
+            print(Fore.RED + f"[LLM Process] Reply failed: {e}")
             continue
+        finally:
+            # Marks the end of the reply; playback reports when it has been heard
+            llm_queue.put((None, time.time(), turn_id))
+        if tracer.enabled:
+            tracer.span(turn_id, "llm", started, time.monotonic())
+            if agent.last_ttft is not None:
+                tracer.mark(turn_id, "llm_first_token", started + agent.last_ttft)
+        if speculator:
+            speculator.report()
+
+def voice_synthesizer(llm_queue, audio_ring, running, turns, engine="kokoro", tracer=Tracer()):
+    cache = PhraseCache(PHRASE_CACHE_DIR)
+    threads = max(1, (os.cpu_count() or 1) // SYNTH_WORKERS)
+    vocalizers = [Vocalizer(engine=engine, cache=cache, kokoro_threads=threads) for _ in range(SYNTH_WORKERS)]
+    print(f"[Voice Synthesizer] Using engine: {engine} ({SYNTH_WORKERS} workers)")
+    warmed = vocalizers[0].prewarm(CACHED_PHRASES)
+    print(f"[Voice Synthesizer] Phrase cache: {warmed} phrases synthesized at startup")
+    scheduler = SynthesisScheduler(vocalizers, lookahead=SYNTH_LOOKAHEAD, stale=lambda job: turns.is_stale(job.meta["turn"]))
+    gaps = GapMeter()
+    archive = AudioArchiver(OUTPUT_DIR, "agent_output", mode=ARCHIVE_AUDIO)
+
+    def submit_sentences():
+        # Keeps reading while earlier sentences play, so the next ones are
+        # already being synthesized
+        while True:
+            item = llm_queue.get()
+            if item is None or not running.is_set():  # None: sentence_streamer's sentinel; the tagged end marker follows
+                continue
+            response, timestamp, turn_id = item
+            if turns.is_stale(turn_id):
+                continue
+            if response is not None:
+                print(f"[Voice Synthesizer] Received: {response} (Latency: {time.time() - timestamp:.3f}s)")
+            scheduler.submit(response, timestamp=timestamp, turn=turn_id, arrived=time.monotonic())
 
-        current_time = time.time()
-        latency = current_time - timestamp
-        print(f"[Voice Synthesizer] Synthesizing: {response} (Latency: {latency:.3f}s)")
-
-        samples, samplerate = vocalizer.create_audio(response)
-        audio_queue.put((samples, samplerate, timestamp))
+    threading.Thread(target=submit_sentences, daemon=True).start()
 
-        # Save to file for debugging
-        print(Fore.RED + f"[Voice Synthesizer] {samplerate}, {len(samples)}")
-        samples = samples.flatten()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        wav_filename = OUTPUT_DIR / f"agent_output_{timestamp}_{i}.wav"
-        sf.write(wav_filename, samples, samplerate)
-        print(Fore.CYAN + f"💾 Saved processed mic input: {wav_filename}")
-        i += 1
+    while True:
+        job = scheduler.next()
+        turn_id, timestamp = job.meta["turn"], job.meta["timestamp"]
+        if turns.is_stale(turn_id):
+            job.cancel()
+            continue
+        if job.text is None:  # end of the reply, passed on in order
+            audio_ring.put(np.zeros(0, dtype=np.float32), OUTPUT_RATE, timestamp, turn=turn_id, end=True)
+            continue
 
-def audio_playback(audio_queue, playback_queue, llm_running):
+        # Hand each chunk to playback as soon as it exists; the rest of the
+        # sentence is synthesized while the first chunk plays
+        chunks = []
+        error = None
+        try:
+            for samples, samplerate in job:
+                if turns.is_stale(turn_id):  # interrupted while synthesizing
+                    job.cancel()
+                    break
+                gaps.audio(job, samples, samplerate)
+                audio_ring.put(samples, samplerate, timestamp, turn=turn_id, first=not chunks)
+                chunks.append(samples.reshape(-1))
+        except Exception as e:
+            error = e
+            print(Fore.RED + f"[Voice Synthesizer] Synthesis failed for {job.text!r}: {e}")
+        if chunks:
+            # Saved for debugging by a background thread
+            archive.save(np.concatenate(chunks), samplerate, error=error is not None)
+        if chunks and samplerate != OUTPUT_RATE and not turns.is_stale(turn_id):
+            # Playback's resampler still holds the end of the sentence; have it played out
+            audio_ring.put(np.zeros(0, dtype=np.float32), samplerate, timestamp, turn=turn_id, sentence_end=True)
+        if not chunks or error or turns.is_stale(turn_id):
+            continue
+        tracer.span(turn_id, "synthesis_queued", job.submitted, job.started)
+        tracer.span(turn_id, "synthesis", job.started, job.finished, text=job.text[:60])
+        tracer.mark(turn_id, "synthesis_first_chunk", job.first_chunk)
+        stats = gaps.stats()
+        print(
+            Fore.RED + f"[Voice Synthesizer] {job.text[:40]}: first audio synthesized in "
+            f"{job.first_chunk - job.started:.3f}s after {job.started - job.submitted:.3f}s queued "
+            f"({len(chunks)} chunks, {samplerate}, {sum(len(c) for c in chunks)}) | "
+            f"gap between sentences p50 {stats['gap_p50_s']}s, p95 {stats['gap_p95_s']}s | "
+            f"cache hit rate {cache.hit_rate:.0%}, saved {cache.saved_seconds:.2f}s"
+        )
+
+def audio_playback(audio_ring, playback_ring, running, turns, poll_interval=0.01, tracer=Tracer()):
+    # One output stream for the life of the stage; sentences are queued on it
+    # back to back instead of opening a stream per buffer
+    output = AudioOutput(samplerate=OUTPUT_RATE, output_stream=OUTPUT_STREAM)
+    playing_turn = None  # turn of the audio queued on the output
+    reply_end = None  # (turn, output index) where the last reply ends
     while True:
-        if not llm_running["value"]:
-            time.sleep(0.1)
+        if reply_end is not None and (turns.is_stale(reply_end[0]) or output.position >= reply_end[1]):
+            turns.finish_reply(reply_end[0])
+            reply_end = None
+        if playing_turn is not None and turns.is_stale(playing_turn):
+            stopped = output.clear()
+            # Tell the echo canceller the reference stops here
+            playback_ring.put(np.zeros(0, dtype=np.float32), OUTPUT_RATE, time.time(), block=False, stopped=stopped)
+            print(Fore.RED + f"[Audio Playback] Interrupted (turn {playing_turn})")
+            tracer.mark(playing_turn, "playback_interrupted", monotonic_from_wall(stopped))
+            playing_turn = None
+        if output.pending > OUTPUT_QUEUE_SECONDS:
+            # Enough queued to play gaplessly; leave the rest in the ring so
+            # synthesis and the echo reference keep pace with playback
+            time.sleep(poll_interval)
             continue
 
-        if not audio_queue.empty():
-            try:
-                samples, samplerate, timestamp = audio_queue.get_nowait()
-            except:
-                continue
-        else:
-            time.sleep(0.01)
+        if playing_turn is not None and not output.pending:
+            playing_turn = None  # played out; nothing left to interrupt
+
+        try:
+            # While audio is queued, time out to notice barge-in; otherwise sleep until the next frame
+            frame = audio_ring.get(timeout=poll_interval if playing_turn is not None or reply_end else None)
+        except queue.Empty:
+            continue
+        turn_id = frame.meta.get("turn")
+        if not running.is_set() or turns.is_stale(turn_id):
+            audio_ring.release(frame)
+            continue
+        if frame.meta.get("end"):
+            audio_ring.release(frame)
+            reply_end = (turn_id, output.end)
             continue
 
-        # Send a copy to playback_queue for echo subtraction
-        playback_queue.put((samples, samplerate, timestamp))
+        if frame.meta.get("sentence_end"):
+            playback = output.finish(turn=turn_id)
+        else:
+            # play() converts (and copies) the samples, so the slot is free right away
+            playback = output.play(frame.samples, frame.samplerate, turn=turn_id)
+        audio_ring.release(frame)
+        if playback is None:
+            continue
+        playing_turn = turn_id
 
-        sd.play(samples, samplerate)
-        sd.wait()
-        print(f"[Audio Playback] Played audio (timestamp {timestamp:.3f})")
+        # Share the queued audio, and exactly when it will be audible, with the
+        # transcriber for echo cancellation, dropping it rather than stalling
+        # playback if the ring is full
+        started = output.time_at(playback.start)
+        playback_ring.put(playback.samples, OUTPUT_RATE, frame.timestamp, block=False, started=started)
+        tracer.span(turn_id, "playback", monotonic_from_wall(started), monotonic_from_wall(output.time_at(playback.end)))
+        if frame.meta.get("first"):
+            print(f"[Audio Playback] Sentence audible {started - frame.timestamp:.3f}s after it was generated")
 
 def flush_queue(q):
-    while not q.empty():
+    while True:
         try:
             q.get_nowait()
-        except:
+        except queue.Empty:
             break
 
+def read_stdin_commands(command_queue):
+    """Forward typed commands so the main loop only has one queue to block on."""
+    for line in sys.stdin:
+        command = line.strip().lower()
+        if command:
+            command_queue.put(command)
+
 # -------------------------------
 # Pipeline
 # -------------------------------
 def run_pipeline():
-    with multiprocessing.Manager() as manager:
-        llm_running = manager.dict()
-        llm_running["value"] = True
-
-        transcribe_queue = manager.Queue()
-        llm_queue = manager.Queue()
-        audio_queue = manager.Queue()
-        playback_queue = manager.Queue(maxsize=200)  # for sharing AI audio with transcriber
-        command_queue = manager.Queue()
-        # when launching processes
-
-        engine_choice = "edge"  # or "kokoro"
-
-        procs = [
-            multiprocessing.Process(target=transcriber_process, args=(transcribe_queue, command_queue, playback_queue), daemon=True),
-            multiprocessing.Process(target=llm_process, args=(transcribe_queue, llm_queue, llm_running)),
-            multiprocessing.Process(target=voice_synthesizer, args=(llm_queue, audio_queue, llm_running, engine_choice)),
-            multiprocessing.Process(target=audio_playback, args=(audio_queue, playback_queue, llm_running))
-        ]
-
+    context_manager = ContextManager()
+    context_manager.clear_user("user")
+
+    running = multiprocessing.Event()
+    running.set()
+
+    transcribe_queue = multiprocessing.Queue()
+    llm_queue = multiprocessing.Queue()
+    audio_ring = SharedAudioRing()
+    playback_ring = SharedAudioRing(n_slots=8)  # for sharing AI audio with transcriber
+    command_queue = multiprocessing.Queue()
+    turns = TurnTracker()
+    collector = TraceCollector(TRACE_DIR / time.strftime("trace_%Y%m%d_%H%M%S.jsonl")) if TRACE else None
+    tracer = collector.tracer if collector else Tracer()
+
+    engine_choice = "edge"  # or "kokoro"
+
+    procs = [
+        multiprocessing.Process(name="transcriber", target=transcriber_process, args=(transcribe_queue, command_queue, playback_ring, turns, tracer), daemon=True),
+        multiprocessing.Process(name="llm", target=llm_process, args=(transcribe_queue, llm_queue, running, turns, tracer)),
+        multiprocessing.Process(name="synthesizer", target=voice_synthesizer, args=(llm_queue, audio_ring, running, turns, engine_choice, tracer)),
+        multiprocessing.Process(name="playback", target=audio_playback, args=(audio_ring, playback_ring, running, turns), kwargs={"tracer": tracer})
+    ]
+
+    for p in procs:
+        p.start()
+
+    threading.Thread(target=read_stdin_commands, args=(command_queue,), daemon=True).start()
+
+    try:
+        while True:
+            command = command_queue.get()
+
+            if command == "stop.":
+                print("[Main] Stop command received.")
+                running.clear()
+                turns.begin()  # aborts the reply in flight
+                flush_queue(transcribe_queue)
+                flush_queue(llm_queue)
+                audio_ring.clear()
+                playback_ring.clear()
+                print("[Main] Paused and queues cleared.")
+            elif command == "start.":
+                running.set()
+                print("[Main] Resumed processing.")
+
+    except KeyboardInterrupt:
+        print("\n[Main] Exiting...")
         for p in procs:
-            p.start()
-
-        try:
-            while True:
-                command = None
-                if not command_queue.empty():
-                    try:
-                        command = command_queue.get_nowait()
-                    except:
-                        pass
-
-                rlist, _, _ = select.select([sys.stdin], [], [], 0.1)
-                if rlist:
-                    user_input = sys.stdin.readline().strip().lower()
-                    if user_input:
-                        command = user_input
-
-                if command == "stop.":
-                    print("[Main] Stop command received.")
-                    llm_running["value"] = False
-                    flush_queue(transcribe_queue)
-                    flush_queue(llm_queue)
-                    flush_queue(audio_queue)
-                    flush_queue(playback_queue)
-                    print("[Main] Paused and queues cleared.")
-                elif command == "start.":
-                    llm_running["value"] = True
-                    print("[Main] Resumed processing.")
-                time.sleep(0.1)
-
-        except KeyboardInterrupt:
-            print("\n[Main] Exiting...")
-            for p in procs:
-                p.terminate()
-                p.join()
+            p.terminate()
+            p.join()
+    finally:
+        audio_ring.close()
+        playback_ring.close()
+        if collector:
+            collector.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+import json
+import os
+import platform
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import ctranslate2
+from colorama import Fore
+from faster_whisper import WhisperModel
+
+from .resample import load_audio
+
+# Candidates; only those CTranslate2 supports on the device are probed
+COMPUTE_TYPES = ["int8", "int8_float32", "int8_bfloat16", "int8_float16", "int16", "bfloat16", "float16", "float32"]
+
+
+def _words(text):
+    return [w for w in (re.sub(r"[^\w']", "", w.lower()) for w in text.split()) if w]
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1] / max(len(ref), 1)
+
+
+def host_key(model_name, device, concurrency=1):
+    """Identifies a tuning result: the same model on the same machine and CTranslate2 build."""
+    return "|".join(
+        str(part)
+        for part in (
+            platform.node(),
+            platform.machine(),
+            platform.processor(),
+            os.cpu_count(),
+            ctranslate2.__version__,
+            model_name,
+            device,
+            concurrency,
+        )
+    )
+
+
+def _decode(model, audio):
+    segments, _ = model.transcribe(audio, chunk_length=30)  # as Transcriber.transcribe_wav_file
+    return " ".join(seg.text.strip() for seg in segments)
+
+
+def _probe(model_name, device, audio, settings, concurrency, repeats):
+    """Median wall time for `concurrency` overlapping decodes of the clip, and its transcript."""
+    model = WhisperModel(model_name, device=device, **settings)
+    text = _decode(model, audio)  # warm-up; also the transcript that is scored
+    times = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            list(pool.map(lambda _: _decode(model, audio), range(concurrency)))
+            times.append(time.perf_counter() - start)
+    return statistics.median(times), text
+
+
+def _thread_counts(cores):
+    counts = {cores}
+    n = 1
+    while n < cores:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def tune(model_name, clip, device="cpu", wer_tolerance=0.05, concurrency=1, repeats=3, reference=None):
+    """
+    Probe compute types and thread counts on `clip`; return (settings, probes).
+
+    First every compute type CTranslate2 supports on the device is timed
+    with the default threads; its transcript is scored against `reference`
+    (the float32 transcript when not given). The fastest type whose WER is
+    within `wer_tolerance` of float32's then has cpu_threads and
+    num_workers tuned. `concurrency` is how many decodes overlap in use
+    (2 when partials are decoded while the final transcript starts); extra
+    workers only help then, and threads * workers never exceed the cores.
+    """
+    audio = load_audio(clip, 16000)
+    supported = ctranslate2.get_supported_compute_types(device)
+    probes = []
+
+    def probe(**settings):
+        seconds, text = _probe(model_name, device, audio, settings, concurrency, repeats)
+        row = dict(settings, seconds=seconds, text=text)
+        probes.append(row)
+        print(Fore.YELLOW + f"[Autotune] {settings}: {seconds:.3f}s")
+        return row
+
+    baseline = probe(compute_type="float32")
+    reference = reference or baseline["text"]
+    limit = word_error_rate(reference, baseline["text"]) + wer_tolerance
+    for compute_type in COMPUTE_TYPES:
+        if compute_type in supported and compute_type != "float32":
+            probe(compute_type=compute_type)
+    for row in probes:
+        row["wer"] = word_error_rate(reference, row["text"])
+    accurate = [row for row in probes if row["wer"] <= limit]
+    compute_type = min(accurate, key=lambda row: row["seconds"])["compute_type"]
+
+    best = {"compute_type": compute_type, "cpu_threads": 0, "num_workers": 1}  # CTranslate2 defaults
+    best_seconds = min(row["seconds"] for row in probes if row["compute_type"] == compute_type)
+    if device == "cpu":
+        cores = os.cpu_count() or 1
+        workers = sorted({1, concurrency})
+        for num_workers in workers:
+            for cpu_threads in _thread_counts(cores):
+                if cpu_threads * num_workers > cores:
+                    continue
+                settings = dict(compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers)
+                row = probe(**settings)
+                row["wer"] = word_error_rate(reference, row["text"])
+                if row["seconds"] < best_seconds and row["wer"] <= limit:
+                    best, best_seconds = settings, row["seconds"]
+    return best, probes
+
+
+def autotune(model_name, clip=None, device="cpu", wer_tolerance=0.05, concurrency=1, cache_path=None):
+    """
+    WhisperModel settings (compute_type, cpu_threads, num_workers) for this
+    host. Results are cached in the JSON file `cache_path` per host, model
+    and CTranslate2 version, so only the first startup pays for the probe;
+    a corrupt cache is re-tuned. `clip` defaults to the first WAV in
+    data/samples; a .txt file next to it is used as the reference
+    transcript. Without a clip the float32 defaults are kept.
+    """
+    key = host_key(model_name, device, concurrency)
+    cache = _load_cache(cache_path) if cache_path is not None else {}
+    if isinstance(cache.get(key), dict) and "settings" in cache[key]:
+        return cache[key]["settings"]
+
+    if clip is None:
+        clip = next(iter(sorted(Path("data/samples").glob("*.wav"))), None)
+    if clip is None or not Path(clip).exists():
+        print(Fore.RED + "[Autotune] No calibration clip found; using float32")
+        return {"compute_type": "float32"}
+
+    print(Fore.YELLOW + f"[Autotune] Probing {model_name} on {device} with {clip}...")
+    transcript = Path(clip).with_suffix(".txt")
+    reference = transcript.read_text().strip() if transcript.exists() else None
+    settings, probes = tune(model_name, clip, device, wer_tolerance, concurrency, reference=reference)
+    print(Fore.YELLOW + f"[Autotune] Selected {settings}")
+
+    if cache_path is not None:
+        cache[key] = {
+            "settings": settings,
+            "clip": str(clip),
+            "tuned_at": datetime.now().isoformat(timespec="seconds"),
+            "probes": [{k: v for k, v in row.items() if k != "text"} for row in probes],
+        }
+        try:
+            _save_cache(cache_path, cache)
+        except OSError as e:
+            print(Fore.RED + f"[Autotune] Could not save {cache_path}: {e}")
+    return settings
+
+
+def _load_cache(path):
+    """The cached results, or {} if the file is missing, unreadable or corrupt (it is then re-tuned)."""
+    try:
+        cache = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(Fore.RED + f"[Autotune] Ignoring unreadable cache {path}: {e}")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(path, cache):
+    """Write to a temporary file and rename it, so a crash never leaves a half-written cache."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2))
+    os.replace(tmp_path, path)
@@ -0,0 +1,215 @@
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+
+from .resample import Resampler, load_audio
+
+
+class AudioCapture:
+    """
+    Microphone capture that stays open for the life of the transcriber.
+
+    The PortAudio callback mixes every buffer to mono, resamples it from the
+    device rate to `rate` (16 kHz for Whisper) and writes it into a
+    preallocated ring; the VAD/transcription loop consumes it with read(),
+    which has the same shape as sd.InputStream.read(), or read_into(). Audio
+    keeps arriving while Whisper runs, so nothing said between utterances is
+    lost. If the reader falls more than `seconds` behind, the oldest audio is
+    overwritten and the next read reports an overflow. index_at() maps a
+    wall-clock time to a position in the captured stream, which is how the
+    echo canceller lines played audio up with the microphone.
+
+    `input_stream` is any factory with sd.InputStream's keyword arguments,
+    e.g. functools.partial(ArrayInputStream, audio) for headless runs.
+    If no audio arrives for `stall_timeout` seconds longer than a read
+    needs (the device was unplugged, or PortAudio stopped calling back),
+    the stream is reopened once; if it still delivers nothing, the read
+    raises RuntimeError instead of blocking forever.
+    """
+
+    def __init__(
+        self, samplerate, channels=1, seconds=30.0, input_stream=sd.InputStream, rate=None, stall_timeout=2.0
+    ):
+        self.samplerate = samplerate  # device rate
+        self.rate = rate or samplerate  # rate of the audio handed to readers
+        self.channels = channels
+        self.input_stream = input_stream
+        self.stall_timeout = stall_timeout
+        self.capacity = int(seconds * self.rate)
+        self._resampler = Resampler(samplerate, self.rate)
+        self._ring = np.zeros(self.capacity, dtype=np.float32)
+        self._written = 0  # total frames written by the callback
+        self._read = 0  # total frames consumed by read()
+        self._overflowed = False
+        self._clock = (time.time(), 0)  # (wall time, frames written) at the last callback
+        self._ready = threading.Condition()
+        self._stream = self._open()
+
+    def _open(self):
+        stream = self.input_stream(
+            samplerate=self.samplerate, channels=self.channels, dtype="float32", callback=self._callback
+        )
+        stream.start()
+        return stream
+
+    def _reopen(self):
+        try:
+            self._stream.stop()
+            self._stream.close()
+        except Exception as e:  # the device may already be gone
+            print(f"[AudioCapture] Closing the stalled stream failed: {e}")
+        self._resampler = Resampler(self.samplerate, self.rate)  # its history belongs to the old stream
+        self._stream = self._open()
+
+    def _callback(self, indata, frames, time_info, status):
+        mono = indata[:frames, 0] if self.channels == 1 else indata[:frames].mean(axis=1)
+        n = self._resampler.output_length(frames)
+        start = self._written % self.capacity
+        if start + n <= self.capacity:
+            self._resampler.process(mono, out=self._ring[start : start + n])
+        else:
+            samples = self._resampler.process(mono)
+            first = self.capacity - start
+            self._ring[start:] = samples[:first]
+            self._ring[: n - first] = samples[first:]
+
+        with self._ready:
+            self._written += n
+            self._clock = (time.time(), self._written)
+            if self._written - self._read > self.capacity:
+                self._read = self._written - self.capacity
+                self._overflowed = True
+            self._ready.notify()
+
+    @property
+    def available(self):
+        """Frames captured but not read yet."""
+        return self._written - self._read
+
+    @property
+    def position(self):
+        """Frames consumed so far; the next read starts at this stream index."""
+        return self._read
+
+    def index_at(self, wall_time):
+        """Stream index of the audio captured at `wall_time` (time.time())."""
+        clock, written = self._clock
+        return written + int(round((wall_time - clock) * self.rate))
+
+    def _wait(self, frames):
+        """Wait until `frames` are available; False if the stream stalled first."""
+        with self._ready:
+            return self._ready.wait_for(
+                lambda: self._written - self._read >= frames, timeout=frames / self.rate + self.stall_timeout
+            )
+
+    def _take(self, frames):
+        # Reopened outside the lock: stopping the stream waits for a callback that takes it
+        if not self._wait(frames):
+            print(f"[AudioCapture] No audio for {self.stall_timeout:.1f}s, reopening the input stream")
+            self._reopen()
+            if not self._wait(frames):
+                raise RuntimeError(f"No audio from the input device for {self.stall_timeout:.1f}s after reopening it")
+        with self._ready:
+            start = self._read % self.capacity
+            overflowed, self._overflowed = self._overflowed, False
+            self._read += frames
+        first = min(frames, self.capacity - start)
+        return self._ring[start : start + first], self._ring[: frames - first], overflowed
+
+    def read(self, frames):
+        """Block until `frames` mono frames are captured; return (data, overflowed)."""
+        head, tail, overflowed = self._take(frames)
+        return np.concatenate([head, tail])[:, None], overflowed
+
+    def read_into(self, out):
+        """Like read(), but write the len(out) frames straight into `out`."""
+        head, tail, overflowed = self._take(len(out))
+        out[: len(head)] = head
+        out[len(head) :] = tail
+        return overflowed
+
+    def discard(self):
+        """Skip everything captured so far, e.g. the assistant's own voice."""
+        with self._ready:
+            self._read = self._written
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArrayInputStream:
+    """
+    Stand-in for sd.InputStream that plays an array (or WAV file) into the
+    callback in real time from a background thread, then keeps delivering
+    silence like an idle microphone. speed > 1 plays faster than real time.
+    """
+
+    def __init__(
+        self,
+        audio,
+        samplerate,
+        channels=1,
+        dtype="float32",
+        callback=None,
+        blocksize=None,
+        speed=1.0,
+        loop=False,
+    ):
+        audio = np.asarray(audio, dtype=dtype)
+        self.audio = audio.reshape(len(audio), -1)[:, :channels]
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or samplerate // 100  # 10 ms, like a typical device
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self._running = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_file(cls, path, samplerate, **kwargs):
+        return cls(load_audio(path, samplerate), samplerate, **kwargs)
+
+    def _next_block(self):
+        block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        if self.loop and len(self.audio):
+            indices = (self.position + np.arange(self.blocksize)) % len(self.audio)
+            block[:] = self.audio[indices]
+        else:
+            chunk = self.audio[self.position : self.position + self.blocksize]
+            block[: len(chunk)] = chunk
+        self.position += self.blocksize
+        return block
+
+    def _run(self):
+        started = time.perf_counter()
+        delivered = 0
+        while self._running.is_set():
+            due = started + (delivered + self.blocksize) / (self.samplerate * self.speed)
+            time.sleep(max(0.0, due - time.perf_counter()))
+            self.callback(self._next_block(), self.blocksize, None, None)
+            delivered += self.blocksize
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
@@ -1,13 +1,37 @@
-from pydantic import BaseModel, Field, PositiveFloat, PositiveInt
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, NonNegativeFloat, PositiveFloat, PositiveInt
 from pathlib import Path
 
 class TranscriberConfig(BaseModel):
-    sample_rate: PositiveInt = Field(24000, description="Audio sample rate (Hz)")
+    sample_rate: PositiveInt = Field(24000, description="Microphone sample rate (Hz)")
+    model_rate: PositiveInt = Field(16000, description="Rate audio is resampled to once at capture; VAD and Whisper run at this rate (Hz)")
     channels: PositiveInt = Field(1, description="Number of audio channels")
     block_duration: PositiveFloat = Field(0.1, description="Duration of each audio block (seconds)")
     silence_threshold: float = Field(0.01, ge=0, le=1, description="Threshold for detecting silence")
     silence_duration: PositiveFloat = Field(2.0, description="Duration of silence to stop recording (seconds)")
     output_dir: Path = Field(Path("data/audio_input"), description="Directory to save audio and transcripts")
+    archive: Literal["off", "errors", "all"] = Field("all", description="Utterances saved to output_dir as FLAC in the background: none, those that transcribed to nothing, or all")
+    archive_max_files: PositiveInt = Field(500, description="Saved utterances kept before the oldest are deleted")
+    archive_max_mb: PositiveFloat = Field(200.0, description="Disk space saved utterances may use before the oldest are deleted (MB)")
+    speculative: bool = Field(False, description="Emit partial transcripts at short pauses so the LLM can start early (turn off on weak CPUs)")
+    speculative_pause: PositiveFloat = Field(0.4, description="Pause length that triggers a partial transcript (seconds)")
+    streaming: bool = Field(False, description="Decode while the user is speaking so the final transcript is ready right after they stop")
+    streaming_interval: PositiveFloat = Field(0.5, description="Speech between incremental decodes in streaming mode (seconds)")
+    streaming_window: PositiveFloat = Field(15.0, description="Longest uncommitted audio re-decoded in streaming mode (seconds)")
+    vad: Literal["threshold", "energy", "silero"] = Field("energy", description="Speech detector: 'threshold' (mean amplitude), 'energy' (energy + spectral, adaptive noise floor) or 'silero' (energy-gated Silero ONNX model)")
+    vad_preroll: NonNegativeFloat = Field(0.3, description="Audio kept from before speech onset (seconds)")
+    vad_hangover: NonNegativeFloat = Field(0.3, description="Audio kept after the last speech block (seconds)")
+    vad_min_speech: PositiveFloat = Field(0.2, description="Speech needed before an utterance starts, rejects clicks (seconds)")
+    vad_margin_db: float = Field(9.0, description="Level above the noise floor counted as speech (dB)")
+    vad_max_flatness: float = Field(0.35, gt=0, le=1, description="Highest spectral flatness (after noise whitening) counted as speech")
+    vad_noise_adapt_time: PositiveFloat = Field(2.0, description="Time constant for the noise floor to follow rising noise (seconds)")
+    vad_speech_threshold: float = Field(0.5, ge=0, le=1, description="Silero speech probability threshold")
+    echo_cancellation: bool = Field(True, description="Subtract the assistant's own playback from the microphone when a playback reference is given")
+    echo_tail: PositiveFloat = Field(0.3, description="Longest echo path the canceller models, including device latency (seconds)")
+    echo_step: float = Field(1.0, gt=0, lt=2, description="Normalised adaptation step of the echo canceller")
+    autotune_clip: Optional[Path] = Field(None, description="Calibration clip for compute_type='auto' (default: first WAV in data/samples)")
+    autotune_wer_tolerance: NonNegativeFloat = Field(0.05, description="Extra word error rate, relative to float32, a faster compute type may add")
+    autotune_cache: Optional[Path] = Field(Path("data/whisper_autotune.json"), description="Per-host cache of compute_type='auto' results; None probes every startup")
 
     class Config:
         validate_assignment = True  # Automatically validate on assignment
@@ -0,0 +1,221 @@
+import math
+import queue
+
+import numpy as np
+
+from .resample import resample
+
+
+class EchoCanceller:
+    """
+    Acoustic echo canceller: a partitioned-block frequency-domain adaptive
+    filter (PBFDAF) with a normalised, constrained NLMS update, followed by
+    residual echo suppression.
+
+    The speaker-to-microphone path is modelled as `partitions` sub-filters
+    of `block` taps each (a tail of block * partitions samples), applied by
+    overlap-save with a 2 * block FFT. process() subtracts the echo predicted
+    from the reference (what the speaker played) from the microphone signal.
+
+    The filter also tracks how much echo it leaves behind relative to the
+    echo it predicts (the leakage). A block whose residual is more than
+    `double_talk_db` above that estimate, and not quieter than the recent
+    echo, contains the user's voice: it passes through and the filter does
+    not adapt on it. Every other block while the reference plays is only
+    the assistant's leftover voice. It is attenuated by `suppression_db`
+    (to well under the room's noise floor, if that is lower) and filled
+    with room noise recorded while nothing played, so a VAD downstream does
+    not take it for speech. The leakage drifts up during double talk, so a
+    changed echo path, which looks the same, is relearned after a few
+    seconds. Until the filter converges this behaves like a half-duplex
+    speakerphone.
+
+    Blocks whose residual is louder than the microphone pass through
+    unfiltered, and while the reference has been silent for a whole tail
+    blocks skip all of this.
+    """
+
+    def __init__(self, block=160, partitions=30, step=1.0, double_talk_db=10.0, suppression_db=40.0, smoothing=0.9):
+        self.block = block
+        self.partitions = partitions
+        self.step = step
+        self.double_talk = 10 ** (double_talk_db / 10)
+        self.suppression = 10 ** (-suppression_db / 20)
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        bins = self.block + 1
+        self._weights = np.zeros((self.partitions, bins), dtype=np.complex64)
+        self._spectra = np.zeros((self.partitions, bins), dtype=np.complex64)  # newest first
+        self._previous = np.zeros(self.block, dtype=np.float32)
+        self._level = 0.0  # running mean reference power per bin
+        self._leakage = 0.0  # residual echo power relative to the predicted echo
+        self._warmup = 0  # blocks of playback seen, up to one tail
+        self._noise = 1.0  # microphone noise floor, block power
+        self._comfort = np.zeros((32, self.block), dtype=np.float32)  # recent noise-only blocks
+        self._idle = self.partitions  # blocks since the reference was last non-silent
+        self._mic_power = self._error_power = 1e-10  # smoothed, for the ERLE
+        self.blocks = 0
+        self.double_talk_blocks = 0
+        self.suppressed_blocks = 0
+
+    @property
+    def erle_db(self):
+        """Smoothed echo return loss enhancement of the linear filter."""
+        return 10 * math.log10(self._mic_power / self._error_power)
+
+    def process(self, mic, reference, out=None):
+        """
+        Remove the echo of `reference` from `mic` (same length, a multiple of
+        `block`). `out` may be `mic` itself.
+        """
+        mic = np.asarray(mic, dtype=np.float32)
+        reference = np.asarray(reference, dtype=np.float32)
+        if len(mic) % self.block or len(reference) != len(mic):
+            raise ValueError(
+                f"Expected equal-length blocks of a multiple of {self.block} samples, "
+                f"got {len(mic)} and {len(reference)}"
+            )
+        if out is None:
+            out = np.empty_like(mic)
+        for i in range(0, len(mic), self.block):
+            out[i : i + self.block] = self._process_block(
+                mic[i : i + self.block], reference[i : i + self.block]
+            )
+        return out
+
+    def _process_block(self, mic, reference):
+        self.blocks += 1
+        mic_power = mic @ mic
+        # Microphone noise floor: follows dips quickly, rises about 0.4 dB/s
+        if mic_power < self._noise:
+            self._noise = 0.9 * self._noise + 0.1 * mic_power
+        else:
+            self._noise *= 1.001
+        x = np.concatenate([self._previous, reference])
+        self._previous = x[self.block :]
+        self._idle = 0 if reference.any() else self._idle + 1
+        if self._idle >= self.partitions:
+            if self._idle == self.partitions:
+                self._spectra[:] = 0  # nothing of the reference is left in the tail
+            if mic_power < 2 * self._noise:
+                self._comfort[self.blocks % len(self._comfort)] = mic  # room noise sample
+            return mic
+
+        self._spectra[1:] = self._spectra[:-1]
+        self._spectra[0] = np.fft.rfft(x)
+        echo = np.fft.irfft((self._spectra * self._weights).sum(axis=0))[self.block :]
+        error = mic - echo
+        error_power = error @ error + 1e-12
+        output = error if error_power <= mic_power else mic
+
+        # Residual relative to the echo the filter predicts; follows the reply's
+        # envelope, so it stays steady on echo-only blocks and jumps when the user talks
+        leakage = error_power / (echo @ echo + 1e-12)
+        s = self.smoothing
+        if self._warmup < self.partitions:
+            # The first tail of playback sets the estimate: assume the user isn't talking yet
+            self._warmup += 1
+            self._leakage = max(self._leakage, min(leakage, 1e4))
+        elif leakage > self.double_talk * self._leakage and mic_power > 0.5 * self._mic_power:
+            # The user adds to the echo; a quiet block with a poor fit is only a
+            # syllable the filter hasn't learned yet
+            self.double_talk_blocks += 1
+            self._leakage = 0.995 * self._leakage + 0.005 * leakage
+            return output
+        else:
+            # Falls quickly as the filter converges, rises slowly so the user can't drag it up
+            rate = s if leakage < self._leakage else 0.99
+            self._leakage = rate * self._leakage + (1 - rate) * leakage
+
+        self.suppressed_blocks += 1
+        self._mic_power = s * self._mic_power + (1 - s) * mic_power
+        self._error_power = s * self._error_power + (1 - s) * error_power
+        power = (self._spectra.real**2 + self._spectra.imag**2).sum(axis=0)
+        # Normalise by the reference power across the whole tail, not just the
+        # newest block, so the step stays small while the echo of a burst decays.
+        # Regularise with the reference's running level so bins it barely
+        # excites, and the quiet ends of bursts, don't amplify microphone noise
+        self._level = 0.99 * self._level + 0.01 * power.mean()
+        norm = power + max(power.mean(), self._level) + 1e-10
+        gradient_spectrum = np.fft.rfft(np.concatenate([np.zeros(self.block, np.float32), error]))
+        gradient = np.conj(self._spectra) * (self.step * gradient_spectrum / norm)
+        # Gradient constraint: keep each sub-filter to `block` taps
+        taps = np.fft.irfft(gradient, axis=1)[:, : self.block]
+        self._weights += np.fft.rfft(taps, n=2 * self.block, axis=1)
+        # Replace the leftover echo with recorded room noise (residual kept 20 dB
+        # under it), so a VAD sees the room it expects rather than faint speech
+        gain = min(self.suppression, 0.1 * math.sqrt(self._noise / error_power))
+        return output * gain + self._comfort[self.blocks % len(self._comfort)]
+
+
+class EchoCancelledInput:
+    """
+    Wraps an AudioCapture so reads return microphone audio with the
+    assistant's own voice removed.
+
+    The playback stage publishes every buffer it plays to `playback_ring`
+    with the wall-clock time playback started (meta["started"]). Those
+    buffers are resampled to the capture rate and placed on the capture
+    timeline with AudioCapture.index_at(), then fed to the EchoCanceller
+    alongside the microphone audio as it is read. Device and room latency
+    only delay the echo relative to that position, which the filter tail
+    absorbs. A frame with meta["stopped"] cuts the reference short where
+    playback was interrupted.
+    """
+
+    def __init__(self, capture, playback_ring, tail=0.3, step=1.0):
+        self.capture = capture
+        self.playback_ring = playback_ring
+        block = capture.rate // 100  # 10 ms
+        self.canceller = EchoCanceller(block, partitions=math.ceil(tail * capture.rate / block), step=step)
+        self._segments = []  # (start index on the capture timeline, samples)
+
+    @property
+    def available(self):
+        return self.capture.available
+
+    def _poll(self):
+        """Move newly played buffers from the ring onto the capture timeline."""
+        while True:
+            try:
+                frame = self.playback_ring.get_nowait()
+            except queue.Empty:
+                return
+            if "stopped" in frame.meta:
+                end = self.capture.index_at(frame.meta["stopped"])
+                self._segments = [(start, samples[: max(0, end - start)]) for start, samples in self._segments]
+            elif len(frame.samples):
+                samples = frame.samples.reshape(len(frame.samples), -1).mean(axis=1)  # copy, frees the slot
+                start = self.capture.index_at(frame.meta.get("started", frame.timestamp))
+                self._segments.append((start, resample(samples, frame.samplerate, self.capture.rate)))
+            self.playback_ring.release(frame)
+
+    def _reference(self, start, frames):
+        reference = np.zeros(frames, dtype=np.float32)
+        end = start + frames
+        self._segments = [(s, samples) for s, samples in self._segments if s + len(samples) > start]
+        for s, samples in self._segments:
+            lo, hi = max(s, start), min(s + len(samples), end)
+            if lo < hi:
+                reference[lo - start : hi - start] += samples[lo - s : hi - s]
+        return reference
+
+    def read_into(self, out):
+        overflowed = self.capture.read_into(out)
+        self._poll()
+        start = self.capture.position - len(out)
+        self.canceller.process(out, self._reference(start, len(out)), out=out)
+        return overflowed
+
+    def read(self, frames):
+        data, overflowed = self.capture.read(frames)
+        self._poll()
+        start = self.capture.position - frames
+        self.canceller.process(data[:, 0], self._reference(start, frames), out=data[:, 0])
+        return data, overflowed
+
+    def discard(self):
+        self.capture.discard()
+
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+from faster_whisper import WhisperModel
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded Whisper models.
+
+    Loading a WhisperModel reads (and on first use downloads and converts)
+    the CTranslate2 weights, which takes seconds and hundreds of MB. Models
+    are keyed by (model_name, device, compute_type) plus any other
+    WhisperModel keyword arguments, so every Transcriber, benchmark run or
+    worker asking for the same model shares one instance. At most `capacity`
+    models are kept; the least recently used one is dropped when another is
+    loaded, and its memory is freed once nothing else holds it.
+    """
+
+    def __init__(self, capacity=2):
+        self.capacity = capacity
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0  # models actually loaded, for benchmarks
+        self.hits = 0
+
+    def get(self, model_name, device="cpu", compute_type="float32", **kwargs):
+        key = (model_name, device, compute_type, tuple(sorted(kwargs.items())))
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+            # Evict first so two large models are never resident because of the cache
+            while self._models and len(self._models) >= self.capacity:
+                self._models.popitem(last=False)
+            model = WhisperModel(model_name, device=device, compute_type=compute_type, **kwargs)
+            self._models[key] = model
+            self.loads += 1
+            return model
+
+    def __len__(self):
+        return len(self._models)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+registry = ModelRegistry()
+
+
+def load_model(model_name, device="cpu", compute_type="float32", **kwargs):
+    """Shared WhisperModel for these settings, loaded on first use."""
+    return registry.get(model_name, device, compute_type, **kwargs)
@@ -0,0 +1,101 @@
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+
+
+class Resampler:
+    """
+    Streaming polyphase resampler (NumPy only).
+
+    Conversion is by up/down = out_rate/in_rate in lowest terms, with a
+    Kaiser-windowed sinc low-pass split into `up` phases of `taps` taps each.
+    Outputs that share a phase read input windows `down` samples apart, so
+    each phase is a single strided matrix-vector product over a sliding
+    window of the input; nothing is computed for the zeros upsampling would insert.
+    Blocks of any size can be fed; filter state carries over between them.
+    """
+
+    def __init__(self, in_rate, out_rate, taps=32, beta=6.0, rolloff=0.9):
+        g = gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        self.in_rate, self.out_rate = in_rate, out_rate
+        self.taps = taps
+
+        n = taps * self.up
+        cutoff = rolloff * 0.5 / max(self.up, self.down)  # cycles per upsampled sample
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, beta) * self.up
+        # phases[p, j] = h[p + (taps - 1 - j) * up], reversed to dot with input windows
+        self.phases = np.ascontiguousarray(h.reshape(taps, self.up).T[:, ::-1], dtype=np.float32)
+        self.delay = (n - 1) / 2 / self.down  # group delay in output samples
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0  # input samples seen
+        self._produced = 0  # output samples emitted
+
+    def output_length(self, frames):
+        """Outputs the next process() call will return for `frames` inputs."""
+        total = self._consumed + frames
+        return (total * self.up - 1) // self.down + 1 - self._produced if total else 0
+
+    def process(self, x, out=None):
+        """Resample the next block of mono samples; optionally write into `out`."""
+        x = np.asarray(x, dtype=np.float32)
+        if self.up == self.down == 1:
+            if out is None:
+                return x.copy()
+            out[:] = x
+            return out
+
+        buf = np.concatenate([self._history, x])
+        start = self._consumed - (self.taps - 1)  # input index of buf[0]
+        self._consumed += len(x)
+        end = (self._consumed * self.up - 1) // self.down + 1 if self._consumed else 0
+
+        if out is None:
+            out = np.empty(end - self._produced, dtype=np.float32)
+        for m in range(self._produced, min(end, self._produced + self.up)):
+            # Output m needs x[i - taps + 1 .. i], the taps samples from buf[first]
+            first = (m * self.down) // self.up - start - (self.taps - 1)
+            count = len(range(m, end, self.up))
+            # Strided view: row k is the window for output m + k * up (no copy)
+            rows = np.ndarray(
+                (count, self.taps), np.float32, buf, first * 4, (self.down * 4, 4)
+            )
+            np.matmul(rows, self.phases[(m * self.down) % self.up], out=out[m - self._produced :: self.up])
+
+        self._produced = end
+        self._history = buf[len(buf) - (self.taps - 1) :]
+        return out
+
+    def flush(self):
+        """Return the outputs the filter delay still holds back, then reset for a new signal."""
+        if self.up == self.down == 1 or not self._consumed:
+            self.reset()
+            return np.zeros(0, dtype=np.float32)
+        remaining = -(-self._consumed * self.up // self.down) + int(round(self.delay)) - self._produced
+        tail = self.process(np.zeros(-(-remaining * self.down // self.up) + 1, dtype=np.float32))[:remaining]
+        self.reset()
+        return tail
+
+
+def resample(audio, in_rate, out_rate):
+    """Resample a whole mono signal, compensating for the filter delay."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if in_rate == out_rate:
+        return audio
+    resampler = Resampler(in_rate, out_rate)
+    length = -(-len(audio) * out_rate // in_rate)
+    delay = int(round(resampler.delay))
+    pad = int(np.ceil((delay + 1) * in_rate / out_rate)) + resampler.taps
+    y = resampler.process(np.concatenate([audio, np.zeros(pad, dtype=np.float32)]))
+    return y[delay : delay + length]
+
+
+def load_audio(path, rate=16000):
+    """Read an audio file as mono float32 at `rate`."""
+    audio, file_rate = sf.read(path, dtype="float32", always_2d=True)
+    return resample(audio.mean(axis=1), file_rate, rate)
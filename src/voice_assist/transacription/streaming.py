@@ -0,0 +1,119 @@
+import re
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class TranscriptUpdate:
+    committed: str  # stable text, never revised by later updates
+    tentative: str  # current guess for the rest of the utterance
+    final: bool
+    audio_seconds: float  # utterance audio captured so far
+    decoded_seconds: float  # audio Whisper (re)decoded for this update
+    decode_seconds: float  # Whisper time spent on this update
+    latency: float  # seconds from capturing the newest audio in this update until it was ready
+
+    @property
+    def text(self):
+        return " ".join(part for part in (self.committed, self.tentative) if part)
+
+
+def _key(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class LocalAgreement:
+    """
+    Incremental Whisper decoding with LocalAgreement-2 commits.
+
+    Each update re-decodes only the audio after the last committed word,
+    prompted with the committed text. Words that two consecutive hypotheses
+    agree on are committed, and the buffer is trimmed past them right away,
+    so they are never decoded again. If the hypotheses keep disagreeing for
+    more than `window` seconds of audio, all but the last word of the latest
+    one are committed anyway, which bounds the audio re-decoded per update.
+    """
+
+    def __init__(self, model, sample_rate=16000, window=15.0, prompt_chars=200):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.window = window
+        self.prompt_chars = prompt_chars
+        self.reset()
+
+    def reset(self):
+        self.committed = []  # (start, end, word) in utterance time
+        self.previous = []  # uncommitted words of the last hypothesis
+        self.start = 0.0  # audio before this was fully committed
+
+    @property
+    def committed_end(self):
+        return self.committed[-1][1] if self.committed else 0.0
+
+    def _decode(self, audio):
+        offset = int(self.start * self.sample_rate)
+        prompt = " ".join(w for _, _, w in self.committed)[-self.prompt_chars :]
+        segments, _ = self.model.transcribe(
+            audio[offset:],
+            initial_prompt=prompt or None,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+        )
+        words = [
+            (w.start + self.start, w.end + self.start, w.word.strip())
+            for segment in segments
+            for w in segment.words
+        ]
+        # Drop words from before the commit point, then any leading words that
+        # just repeat the committed tail (they straddle the trim point)
+        words = [w for w in words if w[0] > self.committed_end - 0.1]
+        tail = [_key(w) for _, _, w in self.committed[-5:]]
+        for n in range(min(len(tail), len(words)), 0, -1):
+            if tail[-n:] == [_key(w) for _, _, w in words[:n]]:
+                return words[n:]
+        return words
+
+    def update(self, audio, captured_at=None):
+        """Decode the utterance so far; commit the prefix agreed with the last hypothesis."""
+        captured_at = captured_at or time.perf_counter()
+        start = time.perf_counter()
+        decoded_seconds = len(audio) / self.sample_rate - self.start
+        words = self._decode(audio)
+
+        agreed = 0
+        while (
+            agreed < min(len(words), len(self.previous))
+            and _key(words[agreed][2]) == _key(self.previous[agreed][2])
+        ):
+            agreed += 1
+        self.committed.extend(words[:agreed])
+        self.previous = words[agreed:]
+
+        audio_seconds = len(audio) / self.sample_rate
+        if audio_seconds - self.start > self.window and len(self.previous) > 1:
+            self.committed.extend(self.previous[:-1])
+            self.previous = self.previous[-1:]
+        self.start = max(self.start, self.committed_end)
+
+        return self._result(audio_seconds, decoded_seconds, start, captured_at, final=False)
+
+    def finish(self, audio, captured_at=None):
+        """Decode the remaining tail once and commit everything."""
+        captured_at = captured_at or time.perf_counter()
+        start = time.perf_counter()
+        decoded_seconds = len(audio) / self.sample_rate - self.start
+        self.committed.extend(self._decode(audio))
+        self.previous = []
+        return self._result(len(audio) / self.sample_rate, decoded_seconds, start, captured_at, final=True)
+
+    def _result(self, audio_seconds, decoded_seconds, start, captured_at, final):
+        now = time.perf_counter()
+        return TranscriptUpdate(
+            committed=" ".join(w for _, _, w in self.committed),
+            tentative=" ".join(w for _, _, w in self.previous),
+            final=final,
+            audio_seconds=audio_seconds,
+            decoded_seconds=decoded_seconds,
+            decode_seconds=now - start,
+            latency=now - captured_at,
+        )
@@ -1,69 +1,305 @@
 from multiprocessing.util import debug
-from faster_whisper import WhisperModel
+from concurrent.futures import ThreadPoolExecutor
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from faster_whisper import BatchedInferencePipeline
 import sounddevice as sd
 import numpy as np
-import soundfile as sf
 from colorama import Fore, init
-from datetime import datetime
+from .autotune import autotune
+from .capture import AudioCapture
 from .config import TranscriberConfig
+from .echo import EchoCancelledInput
+from .models import load_model
+from .resample import load_audio
+from .streaming import LocalAgreement
+from .vad import Endpointer
+from voice_assist.utils.audio_archive import AudioArchiver
 
 init(autoreset=True)  # so colors reset automatically
 
+
+@dataclass
+class FileTranscript:
+    path: Path
+    text: str
+    audio_seconds: float
+
+
 class Transcriber:
     def __init__(
-        self, config: TranscriberConfig, model_name="distil-small.en", device="cpu", compute_type="float32"
+        self,
+        config: TranscriberConfig = None,
+        model_name="distil-small.en",
+        device="cpu",
+        compute_type="float32",  # "auto" probes for the fastest accurate setting on this host
+        input_stream=sd.InputStream,
     ):
-        self.config = config
-        self.model = WhisperModel(model_name, device=device, compute_type=compute_type)
-        self.config.output_dir.mkdir(exist_ok=True)  # Ensure output directory exists
+        self.config = config = config or TranscriberConfig()
+        self.input_stream = input_stream  # e.g. partial(ArrayInputStream, audio) when headless
+        self.capture = None  # opened on first use, then kept open
+        self.echo = None  # echo-cancelled view of the capture, kept so the filter stays adapted
+        if compute_type == "auto":
+            settings = autotune(
+                model_name,
+                config.autotune_clip,
+                device,
+                config.autotune_wer_tolerance,
+                concurrency=2 if config.speculative or config.streaming else 1,  # partials overlap finals
+                cache_path=config.autotune_cache,
+            )
+        else:
+            settings = {"compute_type": compute_type}
+        self.model = load_model(model_name, device, **settings)  # shared with other transcribers
+        self.archive = AudioArchiver(  # saves utterances off the capture loop
+            config.output_dir,
+            "mic_clean",
+            mode=config.archive,
+            max_files=config.archive_max_files,
+            max_bytes=int(config.archive_max_mb * 1e6),
+        )
+        self.spans = []  # (name, start, end) in time.monotonic() for the last utterance
+        self._partial_worker = None  # decodes partial transcripts off the capture loop
+        self._partial_future = None
+        self.endpointer = Endpointer(config)  # keeps its noise estimate across utterances
+        self.agreement = LocalAgreement(
+            self.model, sample_rate=config.model_rate, window=config.streaming_window
+        )
 
     def transcribe_wav_file(self, data):  # Data can be wav file path or audio buffer
         """
-        Reads a single audio file and returns the transcript
+        Reads a single audio file and returns the transcript.
+        Buffers must already be mono float32 at config.model_rate.
         """
+        if not isinstance(data, np.ndarray):
+            data = load_audio(data, self.config.model_rate)
         segments, _ = self.model.transcribe(data, chunk_length=30)
         transcript = ""
         for seg in segments:
             transcript += seg.text + " "
         return transcript.strip()
-    
-    def transcribe(self, debug=False, agent_audio_buffer=None):
-        block_size = int(self.config.sample_rate * self.config.block_duration)
-        silence_limit = int(self.config.silence_duration / self.config.block_duration)
+
+    def transcribe_many(self, files, batch_size=8, **options):
+        """
+        Transcribe a directory of WAVs (or a list of audio files), yielding a
+        FileTranscript per file in input order. Extra options go to
+        BatchedInferencePipeline.transcribe().
+
+        Files that fit in one Whisper window are decoded batch_size at a
+        time: each gets its own window of a shared buffer, so a batch holds
+        at most batch_size windows of audio however many files there are.
+        Longer files are split at pauses by faster-whisper's VAD and their
+        chunks batched the same way.
+        """
+        if isinstance(files, (str, Path)) and Path(files).is_dir():
+            files = sorted(Path(files).glob("*.wav"))
+        pipeline = BatchedInferencePipeline(self.model)
+        rate = self.model.feature_extractor.sampling_rate
+        window = self.model.feature_extractor.chunk_length  # seconds
+        group = []
+
+        def flush():
+            audio = np.zeros(len(group) * window * rate, dtype=np.float32)
+            for i, (_, samples) in enumerate(group):
+                audio[i * window * rate : i * window * rate + len(samples)] = samples
+            # One clip per window; clips that fill a window are never merged
+            clips = [{"start": i * window, "end": (i + 1) * window} for i in range(len(group))]
+            segments, _ = pipeline.transcribe(
+                audio, clip_timestamps=clips, batch_size=batch_size, **options
+            )
+            texts = [[] for _ in group]
+            for seg in segments:
+                texts[min(int(seg.start // window), len(group) - 1)].append(seg.text.strip())
+            results = [
+                FileTranscript(Path(path), " ".join(t for t in text if t), len(samples) / rate)
+                for (path, samples), text in zip(group, texts)
+            ]
+            group.clear()
+            return results
+
+        for path in files:
+            samples = load_audio(path, rate)
+            if len(samples) <= window * rate:
+                group.append((path, samples))
+                if len(group) == batch_size:
+                    yield from flush()
+                continue
+            if group:
+                yield from flush()
+            segments, _ = pipeline.transcribe(samples, batch_size=batch_size, **options)
+            text = " ".join(seg.text.strip() for seg in segments)
+            yield FileTranscript(Path(path), text, len(samples) / rate)
+        if group:
+            yield from flush()
+
+    def transcribe(self, debug=False, agent_audio_buffer=None, on_partial=None, on_speech_start=None):
+        """
+        Record one utterance and return its transcript. With config.speculative,
+        on_partial(text) is called from a worker thread whenever the speaker
+        pauses for speculative_pause seconds before the utterance has ended.
+        With config.streaming, it is called with each update of the
+        incremental decoder instead. on_speech_start() is called as soon as
+        speech is first detected.
+        agent_audio_buffer is the SharedAudioRing the playback stage publishes
+        played audio to; with config.echo_cancellation it is removed from the
+        microphone signal.
+        """
+        block_size = int(self.config.model_rate * self.config.block_duration)
+        if not (self.config.speculative or self.config.streaming):
+            on_partial = None
+        if self.config.streaming:
+            for update in self.transcribe_stream(agent_audio_buffer, on_speech_start):
+                if on_partial and not update.final and update.text:
+                    on_partial(update.text)
+            return update.text
+        print(Fore.BLUE + f"Listening... speak into the microphone.")
+
+        return self._transcribe_audio_stream(
+            block_size, self._input(agent_audio_buffer), on_partial, on_speech_start
+        )
+
+    def transcribe_stream(self, agent_audio_buffer=None, on_speech_start=None):
+        """
+        Record one utterance, yielding TranscriptUpdate objects while the user
+        speaks. The committed part of each update is stable; the last update
+        has final=True and holds the complete transcript.
+        """
+        block_size = int(self.config.model_rate * self.config.block_duration)
         print(Fore.BLUE + f"Listening... speak into the microphone.")
 
-        with sd.InputStream(samplerate=self.config.sample_rate, channels=self.config.channels, dtype="float32") as stream:
-            return self._transcribe_audio_stream(block_size, silence_limit, stream)
+        yield from self._stream_audio_stream(block_size, self._input(agent_audio_buffer), on_speech_start)
+
+    def _capture(self):
+        if self.capture is None:
+            self.capture = AudioCapture(
+                self.config.sample_rate,
+                self.config.channels,
+                input_stream=self.input_stream,
+                rate=self.config.model_rate,  # resampled once, in the capture callback
+            )
+        return self.capture
+
+    def _input(self, agent_audio_buffer=None):
+        """The capture, wrapped in the echo canceller when a playback reference is given."""
+        capture = self._capture()
+        if agent_audio_buffer is None or not self.config.echo_cancellation:
+            return capture
+        if self.echo is None or self.echo.playback_ring is not agent_audio_buffer:
+            self.echo = EchoCancelledInput(
+                capture, agent_audio_buffer, tail=self.config.echo_tail, step=self.config.echo_step
+            )
+        return self.echo
+
+    def close(self):
+        """Release the microphone."""
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+            self.echo = None
+
+    def _time_speech(self, event):
+        """Record when speech started / ended, back-dated by the blocks the endpointer needed to decide."""
+        now = time.monotonic()
+        if event == "start":
+            self.spans = [("speech", now - self.endpointer.min_speech * self.config.block_duration, None)]
+        elif event == "end" and self.spans:
+            speech_end = now - self.endpointer.silence * self.config.block_duration
+            self.spans[0] = ("speech", self.spans[0][1], speech_end)
+            self.spans.append(("endpointing", speech_end, now))
+
+    def _stream_audio_stream(self, block_size, stream, on_speech_start=None):
+        interval = max(1, round(self.config.streaming_interval / self.config.block_duration))
+        self.endpointer.reset()
+        self.agreement.reset()
+        pending = None
+        decoded_frames = 0
 
-    def _transcribe_audio_stream(self, block_size, silence_limit, stream):
         while True:
-            audio_buffer = []
-            silence_counter = 0
-            recording = False
+            event = self.endpointer.read(stream, block_size)
+            self._time_speech(event)
+
+            if event == "start" and on_speech_start:
+                on_speech_start()
+            if pending is not None and pending.done():
+                yield pending.result()
+                pending = None
+            if event == "end":
+                break
+
+            # Decode off the capture loop; skip an interval if Whisper is still busy
+            new_frames = len(self.endpointer.buffer) - decoded_frames
+            if self.endpointer.recording and pending is None and new_frames >= interval * block_size:
+                decoded_frames = len(self.endpointer.buffer)
+                pending = self._worker().submit(
+                    self.agreement.update, self.endpointer.audio(), time.perf_counter()
+                )
 
-            # --- Combined loop for waiting and capturing speech ---
-            while True:
-                block, _ = stream.read(block_size)
-                block = block.flatten()  # Flatten the block to 1D array
+        ended_at = time.perf_counter()
+        if pending is not None:
+            yield pending.result()
+        audio_data = self.endpointer.audio()
+        decode_start = time.monotonic()
+        update = self.agreement.finish(audio_data, ended_at)
+        self.spans.append(("whisper_decode", decode_start, time.monotonic()))
+        print(
+            Fore.CYAN + f"📝 Final transcript {update.latency:.3f}s after end of speech "
+            f"({update.decoded_seconds:.1f}s of {update.audio_seconds:.1f}s re-decoded)"
+        )
 
-                volume = np.abs(block).mean()
+        # Save processed mic input for debugging
+        self.archive.save(audio_data, self.config.model_rate, error=not update.text)
+
+        yield update
+
+    def _worker(self):
+        if self._partial_worker is None:
+            self._partial_worker = ThreadPoolExecutor(max_workers=1)
+        return self._partial_worker
+
+    def _speculate(self, audio_data, on_partial):
+        """Transcribe the speech so far without blocking the capture loop."""
+
+        def run():
+            text = self.transcribe_wav_file(audio_data)
+            if text:
+                on_partial(text)
+            return text
+
+        self._partial_future = self._worker().submit(run)
+
+    def _transcribe_audio_stream(self, block_size, stream, on_partial=None, on_speech_start=None):
+        self.endpointer.reset()
+        partial_frames = 0
+
+        while True:
+            event = self.endpointer.read(stream, block_size)
+            self._time_speech(event)
 
-                if volume > self.config.silence_threshold:
-                    audio_buffer.append(block.copy())
-                    recording = True
-                    silence_counter = 0  # Reset silence counter when speech is detected
-                elif recording:
-                    silence_counter += 1
+            if event == "start" and on_speech_start:
+                on_speech_start()
+            elif event == "pause" and on_partial:
+                partial_frames = len(self.endpointer.buffer)
+                self._speculate(self.endpointer.audio(), on_partial)
+            elif event == "end":
+                # Partials must reach the consumer before the final transcript
+                partial_text = None
+                if self._partial_future is not None:
+                    wait_start = time.monotonic()
+                    partial_text = self._partial_future.result()
+                    self._partial_future = None
+                    self.spans.append(("partial_wait", wait_start, time.monotonic()))
 
-                if recording and silence_counter > silence_limit:
+                audio_data = self.endpointer.audio()
+                if partial_text and partial_frames == len(self.endpointer.buffer):
+                    output_text = partial_text  # nothing was said after the partial
+                else:
                     print(Fore.CYAN + "📝 Transcribing...")
-                    audio_data = np.concatenate(audio_buffer)
+                    decode_start = time.monotonic()
                     output_text = self.transcribe_wav_file(audio_data)
+                    self.spans.append(("whisper_decode", decode_start, time.monotonic()))
 
-                    # Save processed mic input for debugging
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    wav_filename = self.config.output_dir / f"mic_clean_{timestamp}.wav"
-                    sf.write(wav_filename, audio_data, self.config.sample_rate)
-                    print(Fore.CYAN + f"💾 Saved processed mic input: {wav_filename}")
+                # Save processed mic input for debugging
+                self.archive.save(audio_data, self.config.model_rate, error=not output_text)
 
-                    return output_text
\ No newline at end of file
+                return output_text
\ No newline at end of file
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class UtteranceBuffer:
+    """
+    Growable float32 buffer the capture loop reads audio into in place.
+
+    reserve() hands out the next `frames` samples of free space to fill, and
+    view() returns the buffered audio without copying it. Capacity doubles
+    when full, so a long utterance costs a handful of allocations instead of
+    one per block. Views stay valid until reset(); growing the buffer moves it
+    to a new array and leaves existing views untouched.
+    """
+
+    def __init__(self, capacity=16000 * 10):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._start = 0  # audio before this was discarded from the front
+        self._end = 0
+        self.allocations = 1
+        self.bytes_copied = 0  # grows/compactions and feed() copies, not reads
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def reserve(self, frames):
+        """Return a writable view of the next `frames` samples and count them as used."""
+        if self._end + frames > len(self._data):
+            self._grow(len(self) + frames)
+        view = self._data[self._end : self._end + frames]
+        self._end += frames
+        return view
+
+    def append(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self.reserve(len(samples))[:] = samples
+        self.bytes_copied += samples.nbytes
+
+    def _grow(self, needed):
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        data = np.empty(capacity, dtype=np.float32)  # fresh array, old views stay intact
+        data[: len(self)] = self._data[self._start : self._end]
+        self.bytes_copied += len(self) * 4
+        self._data, self._end, self._start = data, len(self), 0
+        self.allocations += 1
+
+    def drop_last(self, frames):
+        self._end = max(self._start, self._end - frames)
+
+    def keep_last(self, frames):
+        """Discard all but the newest `frames` samples (used for the pre-roll)."""
+        self._start = max(self._start, self._end - frames)
+        if self._start > len(self._data) // 2:
+            # Slide the small tail to the front so reserve() doesn't have to grow
+            n = len(self)
+            self._data[:n] = self._data[self._start : self._end]
+            self.bytes_copied += n * 4
+            self._start, self._end = 0, n
+
+    def view(self):
+        return self._data[self._start : self._end]
+
+    def reset(self):
+        self._start = self._end = 0
@@ -0,0 +1,219 @@
+import numpy as np
+
+from .config import TranscriberConfig
+from .resample import Resampler
+from .utterance_buffer import UtteranceBuffer
+
+SILERO_RATE = 16000
+SILERO_WINDOW = 512  # samples per Silero decision at 16 kHz
+SILERO_CONTEXT = 64
+
+
+class ThresholdVAD:
+    """The original detector: mean absolute amplitude above silence_threshold."""
+
+    def __init__(self, config: TranscriberConfig):
+        self.threshold = config.silence_threshold
+
+    def is_speech(self, block):
+        return np.abs(block).mean() > self.threshold
+
+    def reset(self):
+        pass
+
+
+class EnergyVAD:
+    """
+    Energy plus spectral VAD with an adaptive noise estimate.
+
+    A per-bin noise spectrum is tracked while nobody is speaking (falling
+    quickly, rising slowly). A block is speech when its level is vad_margin_db
+    above the noise and its noise-whitened spectrum is peaky rather than flat:
+    fans and hiss whiten to a flat spectrum, voiced speech keeps its harmonics.
+    """
+
+    def __init__(self, config: TranscriberConfig):
+        self.config = config
+        self.margin_db = config.vad_margin_db
+        self.max_flatness = config.vad_max_flatness
+        self.rise = min(1.0, config.block_duration / config.vad_noise_adapt_time)
+        self.fall = 0.5
+        self.noise = None
+
+        block_size = int(config.model_rate * config.block_duration)
+        self.window = np.hanning(block_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(block_size, 1 / config.model_rate)
+        self.band = (freqs >= 100) & (freqs <= 4000)
+        # silence_threshold is a mean amplitude; the noise estimate starts no higher
+        self.max_initial_power = (config.silence_threshold * np.sqrt(np.pi / 2)) ** 2
+
+    def features(self, block):
+        """Return (dB above the noise estimate, flatness of the whitened spectrum)."""
+        power = np.abs(np.fft.rfft(block * self.window[: len(block)], len(self.window))) ** 2
+        power = power[self.band] / np.sum(self.window**2) + 1e-12
+        if self.noise is None:
+            level = power.mean()
+            self.noise = power * min(1.0, self.max_initial_power / level)
+
+        snr_db = 10 * np.log10(power.mean() / self.noise.mean())
+        whitened = power / self.noise
+        flatness = np.exp(np.mean(np.log(whitened))) / np.mean(whitened)
+        self._power = power
+        return snr_db, flatness
+
+    def is_speech(self, block):
+        snr_db, flatness = self.features(block)
+        speech = snr_db > self.margin_db and flatness < self.max_flatness
+        self.update_noise(speech)
+        return speech
+
+    def update_noise(self, speech):
+        # Rise slowly (much slower during speech) so talking doesn't become the floor
+        rise = self.rise / 10 if speech else self.rise
+        rate = np.where(self._power < self.noise, self.fall, rise)
+        self.noise += rate * (self._power - self.noise)
+
+    def reset(self):
+        pass  # the noise estimate carries over between utterances
+
+
+class SileroVAD:
+    """
+    Energy-gated Silero VAD using the ONNX model bundled with faster-whisper.
+
+    Blocks the energy detector considers noise are rejected without running the
+    network; the rest are scored in 32 ms windows (resampled to 16 kHz if needed).
+    """
+
+    def __init__(self, config: TranscriberConfig):
+        try:
+            from faster_whisper.vad import get_vad_model
+        except ImportError as e:
+            raise RuntimeError("The silero VAD requires faster-whisper and onnxruntime") from e
+
+        self.model = get_vad_model()
+        self.energy = EnergyVAD(config)
+        self.resampler = Resampler(config.model_rate, SILERO_RATE)
+        self.threshold = config.vad_speech_threshold
+        self.reset()
+
+    def reset(self):
+        self.resampler.reset()
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.context = np.zeros(SILERO_CONTEXT, dtype=np.float32)
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def probability(self, block):
+        """Highest speech probability among the complete 16 kHz windows in block."""
+        audio = np.concatenate([self.pending, self.resampler.process(block)])
+        n_windows = len(audio) // SILERO_WINDOW
+        self.pending = audio[n_windows * SILERO_WINDOW :]
+
+        best = 0.0
+        for i in range(n_windows):
+            window = audio[i * SILERO_WINDOW : (i + 1) * SILERO_WINDOW]
+            batch = np.concatenate([self.context, window])[None, :]
+            self.context = window[-SILERO_CONTEXT:]
+            encoded = self.model.encoder_session.run(None, {"input": batch})[0]
+            out, self.state = self.model.decoder_session.run(
+                None, {"input": encoded.reshape(1, -1), "state": self.state}
+            )
+            best = max(best, float(out.squeeze()))
+        return best
+
+    def is_speech(self, block):
+        snr_db, _ = self.energy.features(block)
+        if snr_db <= self.energy.margin_db:
+            self.energy.update_noise(False)
+            self.reset()  # restart the network's state at the next loud block
+            return False
+
+        speech = self.probability(block) >= self.threshold
+        self.energy.update_noise(speech)
+        return speech
+
+
+VADS = {"threshold": ThresholdVAD, "energy": EnergyVAD, "silero": SileroVAD}
+
+
+def create_vad(config: TranscriberConfig):
+    return VADS[config.vad](config)
+
+
+class Endpointer:
+    """
+    Turns per-block VAD decisions into utterances.
+
+    Speech starts after vad_min_speech seconds of consecutive speech blocks and
+    includes up to vad_preroll seconds of audio from before that, so word
+    onsets are not clipped. After the last speech block, vad_hangover seconds
+    are still kept to preserve word endings; longer pauses are dropped. The
+    utterance ends after silence_duration seconds without speech.
+
+    Audio is collected in an UtteranceBuffer; read() fills it straight from the
+    capture stream. feed()/read() return "start", "pause" (speculative_pause
+    reached), "end" or None.
+    """
+
+    def __init__(self, config: TranscriberConfig, vad=None):
+        self.vad = vad or create_vad(config)
+        blocks = lambda seconds: int(round(seconds / config.block_duration))
+        self.min_speech = max(1, blocks(config.vad_min_speech))
+        self.hangover = blocks(config.vad_hangover)
+        self.pause_limit = max(1, blocks(config.speculative_pause))
+        self.silence_limit = int(config.silence_duration / config.block_duration)
+        self.block_size = int(config.model_rate * config.block_duration)
+        self.preroll_frames = (blocks(config.vad_preroll) + self.min_speech) * self.block_size
+        self.buffer = UtteranceBuffer(capacity=config.model_rate * 10)
+        self.reset()
+
+    def reset(self):
+        self.buffer.reset()
+        self.recording = False
+        self.speech_run = 0
+        self.silence = 0  # blocks since the last speech block
+        self.vad.reset()
+
+    def feed(self, block):
+        """Classify a block the caller already has in memory (copied once)."""
+        self.buffer.append(block)
+        return self._process(len(block))
+
+    def read(self, stream, frames):
+        """Read the next block from `stream` directly into the utterance buffer."""
+        out = self.buffer.reserve(frames)
+        if hasattr(stream, "read_into"):
+            stream.read_into(out)
+        else:
+            block, _ = stream.read(frames)
+            out[:] = block.reshape(frames, -1).mean(axis=1)
+        return self._process(frames)
+
+    def _process(self, frames):
+        speech = self.vad.is_speech(self.buffer.view()[-frames:])
+
+        if not self.recording:
+            self.buffer.keep_last(self.preroll_frames)
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.min_speech:
+                self.recording = True
+                self.silence = 0
+                return "start"
+            return None
+
+        if speech:
+            self.silence = 0
+            return None
+
+        self.silence += 1
+        if self.silence > self.hangover:
+            self.buffer.drop_last(frames)
+        if self.silence > self.silence_limit:
+            return "end"
+        if self.silence == self.pause_limit:
+            return "pause"
+        return None
+
+    def audio(self):
+        """The utterance so far, as a view that stays valid until reset()."""
+        return self.buffer.view()
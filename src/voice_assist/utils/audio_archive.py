@@ -0,0 +1,105 @@
+import atexit
+import itertools
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from colorama import Fore
+
+MODES = ("off", "errors", "all")
+
+
+class AudioArchiver:
+    """
+    Saves debug audio (mic utterances, synthesized sentences) as FLAC from a
+    background thread, so a turn never waits on the disk.
+
+    save() only copies the samples onto a bounded queue. If the writer has
+    fallen `max_queue` clips behind, the clip is dropped and counted rather
+    than blocking the caller. `mode` picks what is kept: "off", "errors"
+    (clips saved with error=True) or "all". Files are named
+    `<prefix>_<date>_<time>_<microseconds>_<n>.flac`, so clips saved in the
+    same second don't overwrite each other. Once this prefix's files in
+    `directory` exceed `max_files` or `max_bytes`, the oldest are deleted.
+    """
+
+    def __init__(self, directory, prefix, mode="all", max_queue=16, max_files=500, max_bytes=200 << 20):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.mode = mode
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.saved = 0
+        self.dropped = 0  # clips skipped because the writer was behind
+        self.deleted = 0  # old files removed by retention
+        self._count = itertools.count()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._files = deque()  # (path, bytes), oldest first
+        self._bytes = 0
+        self._writer = None
+        if mode != "off":
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path in sorted(self.directory.glob(f"{prefix}_*.flac"), key=lambda p: p.stat().st_mtime):
+                self._files.append((path, path.stat().st_size))
+                self._bytes += path.stat().st_size
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def wants(self, error=False):
+        return self.mode == "all" or (self.mode == "errors" and error)
+
+    def save(self, samples, samplerate, error=False):
+        """Queue a clip for writing; returns its path, or None if it is not kept."""
+        if not self.wants(error):
+            return None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = self.directory / f"{self.prefix}_{stamp}_{next(self._count)}.flac"
+        try:
+            # Copy: callers pass views into buffers they reuse
+            self._queue.put_nowait((path, np.array(samples, dtype=np.float32), samplerate))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return path
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, samples, samplerate = item
+            try:
+                sf.write(path, np.clip(samples, -1.0, 1.0), samplerate, format="FLAC", subtype="PCM_16")
+            except Exception as e:  # never take the stage down for a debug file
+                print(Fore.RED + f"[Archive] Could not save {path}: {e}")
+                continue
+            self.saved += 1
+            size = path.stat().st_size
+            self._files.append((path, size))
+            self._bytes += size
+            self._enforce_retention()
+
+    def _enforce_retention(self):
+        while self._files and (len(self._files) > self.max_files or self._bytes > self.max_bytes):
+            path, size = self._files.popleft()
+            path.unlink(missing_ok=True)
+            self._bytes -= size
+            self.deleted += 1
+
+    def close(self, timeout=5.0):
+        """Write what is still queued (waiting at most `timeout`) and stop the writer."""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer.join(timeout)
+        self._writer = None
@@ -1,58 +1,188 @@
 import json
 import os
+import re
+import threading
+
+from voice_assist.utils.conversation_store import ConversationJournal
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Fast local estimate of the LLM token count of text.
+    Each word or punctuation mark is one token, long words one per ~4 chars.
+    """
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECES.findall(text))
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"] or "") + 4  # role/formatting overhead
 
 
 class ContextManager:
-    def __init__(self, file_path="data/context.json"):
+    def __init__(self, file_path="data/context.jsonl", flush_interval=0.5):
+        # Older versions kept everything in one JSON document; use a journal
+        # next to it and import the old history once.
+        legacy_path = None
+        if file_path.endswith(".json"):
+            legacy_path, file_path = file_path, file_path + "l"
+
         self.file_path = file_path
-        self._data = self._load_file()
+        self._journal = ConversationJournal(file_path, flush_interval=flush_interval)
 
-    def _load_file(self):
-        """Load JSON file or create empty dict if missing/invalid."""
-        if not os.path.exists(self.file_path):
-            self._save_file({})
+        if legacy_path and not self._journal.index:
+            legacy = self._load_legacy_file(legacy_path)
+            if legacy:
+                self._journal.import_data(legacy)
+
+    def _load_legacy_file(self, path):
+        """Load a legacy JSON context file, or an empty dict if missing/invalid."""
+        if not os.path.exists(path):
             return {}
         try:
-            with open(self.file_path, "r") as f:
+            with open(path, "r") as f:
                 data = json.load(f)
                 return data if isinstance(data, dict) else {}
         except json.JSONDecodeError:
             return {}
 
-    def _save_file(self, data):
-        """Save the current dictionary to the JSON file."""
-        # Ensure the directory exists before saving
-        dir_path = os.path.dirname(self.file_path)
-        if dir_path and not os.path.exists(dir_path):
-            os.makedirs(dir_path, exist_ok=True)
-        with open(self.file_path, "w") as f:
-            json.dump(data, f, indent=2)
-
     @property
     def data(self):
         """Access the conversation dictionary."""
-        return self._data
+        return self._journal.index
 
     def add_message(self, user_id, role, content):
-        """Add a message for a given user_id and auto-save."""
-        if user_id not in self._data:
-            self._data[user_id] = []
-        self._data[user_id].append({"role": role, "content": content})
-        self._save_file(self._data)
+        """Add a message for a given user_id; it is written to disk in the background."""
+        self._journal.append(user_id, {"role": role, "content": content})
 
     def is_user(self, user_id):
         """Check if user_id has a conversation"""
-        if user_id in self._data:
-            return True
-        return False
+        return user_id in self._journal.index
 
     def get_history(self, user_id):
-        """Get conversation history for a user."""
-        self._data = self._load_file()  # Reload to ensure we have the latest data
-        return self._data.get(user_id, [])
+        """Get conversation history for a user (treat the returned list as read-only)."""
+        self._journal.refresh()  # Only re-reads if another process changed the file
+        return self._journal.index.get(user_id, [])
 
     def clear_user(self, user_id):
-        """Clear conversation history for a specific user and auto-save."""
-        if user_id in self._data:
-            self._data[user_id] = []
-            self._save_file(self._data)
+        """Clear conversation history for a specific user and save immediately."""
+        if user_id in self._journal.index:
+            self._journal.clear(user_id)
+            self._journal.flush()
+
+    def get_summary(self, user_id):
+        """Return (summary, messages covered) for the user's older history."""
+        return self._journal.get_summary(user_id)
+
+    def set_summary(self, user_id, summary, upto):
+        self._journal.set_summary(user_id, summary, upto)
+
+    def flush(self):
+        """Write any buffered messages to disk."""
+        self._journal.flush()
+
+    def close(self):
+        self._journal.close()
+
+
+class ContextWindow:
+    """
+    Builds the message list sent to the LLM within a token budget.
+
+    The leading system prompt is always kept, followed by a cached summary of
+    older turns and the recent messages. The window's start only moves when
+    the messages no longer fit: it then jumps forward until they take up
+    `low_water` of the budget, so the prompt prefix (and Ollama's cached
+    evaluation of it) stays the same for many turns instead of shifting by one
+    message every turn. schedule_summary() folds the evicted chunk into the
+    summary on a background thread; call it once the reply has been played.
+    """
+
+    SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        max_tokens=4096,
+        reserve_tokens=512,
+        summarizer=None,
+        low_water=0.6,
+    ):
+        self.context_manager = context_manager
+        self.max_tokens = max_tokens
+        self.reserve_tokens = reserve_tokens  # left free for the reply
+        self.summarizer = summarizer  # (previous summary, messages) -> summary
+        self.low_water = low_water  # share of the budget kept after an eviction
+        self._starts = {}  # user_id -> index of the first message in the window
+        self._summarizing = set()
+        self._lock = threading.Lock()
+
+    def build(self, user_id, extra=None):
+        """Return the pinned system prompt, summary and recent tail (+ extra messages)."""
+        history = self.context_manager.get_history(user_id)
+        extra = extra or []
+        pinned, summary_message, start = self._layout(user_id, history, extra)
+        return pinned + summary_message + history[start:] + extra
+
+    def _layout(self, user_id, history, extra):
+        pinned = history[:1] if history and history[0]["role"] == "system" else []
+        summary, upto = self.context_manager.get_summary(user_id)
+        summary_message = (
+            [{"role": "system", "content": self.SUMMARY_PREFIX + summary}] if summary else []
+        )
+
+        budget = self.max_tokens - self.reserve_tokens
+        budget -= sum(message_tokens(m) for m in pinned + summary_message + extra)
+
+        start = max(self._starts.get(user_id, 0), upto, len(pinned))
+        if start > len(history):  # the history was cleared
+            start = len(pinned)
+        if sum(message_tokens(m) for m in history[start:]) > budget:
+            start = self._evict(history, len(pinned), budget * self.low_water)
+        self._starts[user_id] = start
+        return pinned, summary_message, start
+
+    @staticmethod
+    def _evict(history, first, budget):
+        """Start of the newest messages that fit in budget; the latest one is always kept."""
+        start = len(history)
+        used = 0
+        while start > first:
+            used += message_tokens(history[start - 1])
+            if used > budget and start < len(history):
+                break
+            start -= 1
+        return start
+
+    def schedule_summary(self, user_id):
+        """Summarize messages that fell out of the window, off the critical path."""
+        if self.summarizer is None:
+            return
+        history = self.context_manager.get_history(user_id)
+        pinned, _, start = self._layout(user_id, history, [])
+        summary, upto = self.context_manager.get_summary(user_id)
+        upto = max(upto, len(pinned))
+        if start <= upto:
+            return
+
+        with self._lock:
+            if user_id in self._summarizing:
+                return
+            self._summarizing.add(user_id)
+
+        evicted = history[upto:start]
+        threading.Thread(
+            target=self._summarize, args=(user_id, summary, evicted, start), daemon=True
+        ).start()
+
+    def _summarize(self, user_id, summary, evicted, upto):
+        try:
+            new_summary = self.summarizer(summary, evicted)
+            if new_summary:
+                self.context_manager.set_summary(user_id, new_summary.strip(), upto)
+        except Exception as e:
+            print(f"[ContextWindow] Summarization failed: {e}")
+        finally:
+            with self._lock:
+                self._summarizing.discard(user_id)
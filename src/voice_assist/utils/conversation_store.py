@@ -0,0 +1,266 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on `path` (created if missing) that other processes respect."""
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ConversationJournal:
+    """
+    Append-only JSONL conversation log with an in-memory index per user.
+
+    Every change is one small record ({"op": "add" | "clear" | "summary", ...})
+    appended to the journal, so adding a message costs O(message) instead of
+    rewriting the whole history. Writes are buffered and flushed (and fsynced) in
+    batches by a background thread. The journal is rewritten as a compact
+    snapshot once dead records (from cleared users) dominate it.
+
+    Other processes may append to the same file; refresh() notices this from
+    the file's inode/size/mtime and only reads the new tail. Appends and
+    compaction hold a lock file next to the journal, so no process writes
+    between another one's refresh and its append.
+    """
+
+    def __init__(
+        self,
+        file_path,
+        flush_interval=0.5,
+        fsync=True,
+        compact_min_records=1000,
+        compact_ratio=2.0,
+    ):
+        self.file_path = file_path
+        self.lock_path = file_path + ".lock"
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+
+        self._index = {}
+        self._summaries = {}  # user_id -> (summary text, messages covered)
+        self._pending = []  # encoded records not yet written
+        self._records = 0  # records currently in the file
+        self._offset = 0  # bytes of the file already applied to the index
+        self._stat = None  # (inode, size, mtime) seen after our last read/write
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._flusher = None
+        self._closed = False
+        self._pid = os.getpid()
+
+        dir_path = os.path.dirname(self.file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self._reload()
+        atexit.register(self.close)
+
+    @property
+    def index(self):
+        """user_id -> list of messages."""
+        return self._index
+
+    # -------------------------------
+    # Writes
+    # -------------------------------
+    def append(self, user_id, message):
+        with self._lock:
+            self._index.setdefault(user_id, []).append(message)
+            self._enqueue({"op": "add", "user": user_id, "message": message})
+
+    def clear(self, user_id):
+        with self._lock:
+            self._index[user_id] = []
+            self._summaries.pop(user_id, None)
+            self._enqueue({"op": "clear", "user": user_id})
+
+    def set_summary(self, user_id, summary, upto):
+        """Record a summary of the user's first `upto` messages."""
+        with self._lock:
+            self._summaries[user_id] = (summary, upto)
+            self._enqueue({"op": "summary", "user": user_id, "summary": summary, "upto": upto})
+
+    def get_summary(self, user_id):
+        return self._summaries.get(user_id, ("", 0))
+
+    def import_data(self, data):
+        """Load a legacy {user_id: [messages]} dict into an empty journal."""
+        with self._lock:
+            for user_id, messages in data.items():
+                for message in messages:
+                    self.append(user_id, message)
+            self.flush()
+
+    def _enqueue(self, record):
+        self._check_fork()
+        self._pending.append(json.dumps(record) + "\n")
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        with self._lock:
+            self._check_fork()
+            if not self._pending:
+                return
+            with _file_lock(self.lock_path):
+                # Pick up records appended by other processes before ours;
+                # the lock keeps anyone from appending until ours are written
+                self.refresh()
+                lines, self._pending = self._pending, []
+                data = "".join(lines).encode("utf-8")
+                with open(self.file_path, "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                self._offset += len(data)
+                self._records += len(lines)
+                self._stat = self._file_stat()
+
+            if self._needs_compaction():
+                self.compact()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"[ConversationJournal] Flush failed: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    # -------------------------------
+    # Compaction
+    # -------------------------------
+    def _needs_compaction(self):
+        live = sum(len(messages) for messages in self._index.values())
+        return (
+            self._records >= self.compact_min_records
+            and self._records > self.compact_ratio * max(live, 1)
+        )
+
+    def compact(self):
+        """Rewrite the journal as one record per live message."""
+        with self._lock, _file_lock(self.lock_path):
+            self.refresh()
+            tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+            records = 0
+            with open(tmp_path, "wb") as f:
+                for user_id, messages in self._index.items():
+                    lines = [{"op": "clear", "user": user_id}] if not messages else [
+                        {"op": "add", "user": user_id, "message": message} for message in messages
+                    ]
+                    if user_id in self._summaries:
+                        summary, upto = self._summaries[user_id]
+                        lines.append({"op": "summary", "user": user_id, "summary": summary, "upto": upto})
+                    for record in lines:
+                        f.write((json.dumps(record) + "\n").encode("utf-8"))
+                    records += len(lines)
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+            os.replace(tmp_path, self.file_path)
+            self._records = records
+            self._offset = offset
+            self._stat = self._file_stat()
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def refresh(self):
+        """Apply changes made by other processes, if the file changed."""
+        with self._lock:
+            stat = self._file_stat()
+            if stat == self._stat:
+                return
+            if stat is None or self._stat is None or stat[0] != self._stat[0] or stat[1] < self._offset:
+                self._reload()  # replaced (compacted) or truncated
+            else:
+                self._read_from(self._offset)
+
+    def _reload(self):
+        pending = [json.loads(line) for line in self._pending]
+        self._index = {}
+        self._summaries = {}
+        self._records = 0
+        self._offset = 0
+        self._read_from(0)
+        # Keep our own unwritten changes on top of the reloaded file
+        for record in pending:
+            self._apply(record)
+
+    def _read_from(self, offset):
+        if not os.path.exists(self.file_path):
+            self._stat = None
+            return
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written record, read it next time
+                offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    continue
+                self._records += 1
+        self._offset = offset
+        self._stat = self._file_stat()
+
+    def _apply(self, record):
+        if record["op"] == "add":
+            self._index.setdefault(record["user"], []).append(record["message"])
+        elif record["op"] == "clear":
+            self._index[record["user"]] = []
+            self._summaries.pop(record["user"], None)
+        elif record["op"] == "summary":
+            self._summaries[record["user"]] = (record["summary"], record["upto"])
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _check_fork(self):
+        """A forked child must not re-write its parent's buffered records."""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._pending = []
+            self._flusher = None
+            self._lock = threading.RLock()
+            self._wake = threading.Event()
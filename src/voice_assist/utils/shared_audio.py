@@ -0,0 +1,164 @@
+import math
+import queue
+import sys
+import multiprocessing as mp
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 10 s of float32 mono audio at 24 kHz per slot
+DEFAULT_SLOT_BYTES = 24000 * 4 * 10
+DEFAULT_SLOTS = 16
+
+
+def _attach(name):
+    """Attach to an existing segment; only the creating process tracks it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Children share the parent's resource tracker, so re-registering is harmless
+    return shared_memory.SharedMemory(name=name)
+
+
+@dataclass
+class AudioFrame:
+    """A buffer of PCM samples read from a SharedAudioRing."""
+
+    samples: np.ndarray
+    samplerate: int
+    timestamp: float
+    slots: tuple = ()
+    meta: dict = field(default_factory=dict)
+
+
+class SharedAudioRing:
+    """
+    Fixed-size PCM slot ring in shared memory.
+
+    Samples are copied once into a free slot by the producer; only a small
+    metadata tuple (slots, shape, dtype, sample rate, timestamp) travels
+    through a queue. The consumer gets a zero-copy NumPy view into the slot
+    and must call release() once it no longer needs the samples.
+
+    Buffers larger than one slot are spread over several slots and are
+    reassembled (one copy) on read. Each ring supports a single producer.
+    """
+
+    def __init__(self, n_slots=DEFAULT_SLOTS, slot_bytes=DEFAULT_SLOT_BYTES):
+        self.n_slots = n_slots
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=n_slots * slot_bytes)
+        self._owner = True
+        self._frames = mp.Queue()  # metadata of filled slots
+        self._free = mp.Queue()  # indices of free slots
+        for i in range(n_slots):
+            self._free.put(i)
+        self.bytes_copied = 0
+
+    # Only the segment name crosses the process boundary; children re-attach.
+    def __getstate__(self):
+        return {
+            "n_slots": self.n_slots,
+            "slot_bytes": self.slot_bytes,
+            "name": self._shm.name,
+            "frames": self._frames,
+            "free": self._free,
+        }
+
+    def __setstate__(self, state):
+        self.n_slots = state["n_slots"]
+        self.slot_bytes = state["slot_bytes"]
+        self._shm = _attach(state["name"])
+        self._owner = False
+        self._frames = state["frames"]
+        self._free = state["free"]
+        self.bytes_copied = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def put(self, samples, samplerate, timestamp, block=True, timeout=None, **meta):
+        """
+        Copy samples into free slot(s) and publish them.
+        Returns False if no slot became free in time.
+        """
+        data = np.ascontiguousarray(samples)
+        raw = data.reshape(-1).view(np.uint8)
+        n = max(1, math.ceil(raw.nbytes / self.slot_bytes))
+        if n > self.n_slots:
+            raise ValueError(
+                f"Buffer of {raw.nbytes} bytes does not fit in {self.n_slots} slots"
+            )
+
+        slots = []
+        try:
+            for _ in range(n):
+                slots.append(self._free.get(block, timeout))
+        except queue.Empty:
+            for slot in slots:
+                self._free.put(slot)
+            return False
+
+        buf = self._shm.buf
+        for k, slot in enumerate(slots):
+            chunk = raw[k * self.slot_bytes : (k + 1) * self.slot_bytes]
+            start = slot * self.slot_bytes
+            buf[start : start + chunk.nbytes] = chunk
+        self.bytes_copied += raw.nbytes
+
+        self._frames.put(
+            (tuple(slots), data.shape, data.dtype.str, samplerate, timestamp, meta)
+        )
+        return True
+
+    def get(self, block=True, timeout=None):
+        """
+        Return the next AudioFrame. Raises queue.Empty like Queue.get.
+        Single-slot frames are views into shared memory.
+        """
+        slots, shape, dtype, samplerate, timestamp, meta = self._frames.get(
+            block, timeout
+        )
+        dtype = np.dtype(dtype)
+        if len(slots) == 1:
+            samples = np.ndarray(
+                shape, dtype=dtype, buffer=self._shm.buf, offset=slots[0] * self.slot_bytes
+            )
+        else:
+            samples = np.empty(shape, dtype=dtype)
+            raw = samples.reshape(-1).view(np.uint8)
+            for k, slot in enumerate(slots):
+                chunk = raw[k * self.slot_bytes : (k + 1) * self.slot_bytes]
+                start = slot * self.slot_bytes
+                chunk[:] = np.frombuffer(
+                    self._shm.buf, dtype=np.uint8, count=chunk.nbytes, offset=start
+                )
+            self.bytes_copied += samples.nbytes
+
+        return AudioFrame(samples, samplerate, timestamp, slots, meta)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def release(self, frame: AudioFrame):
+        """Hand the frame's slots back to the producer."""
+        for slot in frame.slots:
+            self._free.put(slot)
+        frame.slots = ()
+
+    def clear(self):
+        """Drop every published frame and recycle its slots."""
+        while True:
+            try:
+                slots, *_ = self._frames.get_nowait()
+            except queue.Empty:
+                break
+            for slot in slots:
+                self._free.put(slot)
+
+    def close(self):
+        """Detach from the segment; the creating process also unlinks it."""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
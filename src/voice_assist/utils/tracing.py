@@ -0,0 +1,245 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from colorama import Fore
+
+# Milestones summarised per turn, as offsets from the end of the user's speech
+MILESTONES = [
+    ("endpoint", "endpointing", "end"),  # VAD decided the user had finished
+    ("transcript", "whisper_decode", "end"),
+    ("llm_first_token", "llm_first_token", "start"),
+    ("first_sentence", "sentence", "start"),
+    ("first_audio_ready", "synthesis_first_chunk", "start"),
+    ("first_audible", "playback", "start"),
+    ("reply_done", "playback", "end"),
+]
+
+
+def monotonic_from_wall(wall_time):
+    """Convert a time.time() value from this process to time.monotonic()."""
+    return wall_time - time.time() + time.monotonic()
+
+
+class Tracer:
+    """
+    Records per-turn timing spans from any pipeline process.
+
+    Every span is (turn, name, start, end, args) in time.monotonic() seconds.
+    That clock is system-wide on Linux, macOS and Windows, so spans from
+    different processes line up without any clock exchange. Spans go onto
+    a multiprocessing queue drained by a TraceCollector in the main
+    process; putting one only pickles a small dict. A Tracer without a
+    queue records nothing, so stages can take one unconditionally.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue
+
+    @property
+    def enabled(self):
+        return self.queue is not None
+
+    def span(self, turn, name, start, end=None, **args):
+        if self.queue is None:
+            return
+        self.queue.put(
+            {
+                "turn": turn,
+                "name": name,
+                "start": start,
+                "end": start if end is None else end,
+                "pid": os.getpid(),
+                "process": mp.current_process().name,
+                "args": args,
+            }
+        )
+
+    def mark(self, turn, name, at=None, **args):
+        """A point in time (a span without duration); `at` defaults to now."""
+        self.span(turn, name, time.monotonic() if at is None else at, **args)
+
+
+class MarkingQueue:
+    """Queue adapter that marks a span for every item put on it (None excepted)."""
+
+    def __init__(self, queue, tracer, turn, name):
+        self.queue = queue
+        self.tracer = tracer
+        self.turn = turn
+        self.name = name
+
+    def put(self, item):
+        if item is not None:
+            self.tracer.mark(self.turn, self.name, text=str(item[0])[:60])
+        self.queue.put(item)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class TraceCollector:
+    """
+    Drains a Tracer's queue on a background thread of the main process.
+
+    Every span is appended to a JSONL file as it arrives. A turn is complete
+    once `settle` seconds pass without new spans for it and after its last
+    span has ended; it is then printed as a waterfall relative to the end of
+    the user's speech, and its milestones (MILESTONES) join the p50/p95
+    summary. close() also writes the whole trace in Chrome's trace event
+    format (chrome://tracing, Perfetto) next to the JSONL file.
+    `on_turn(turn, spans, milestones)` is called, on the collector's thread,
+    for every completed turn.
+    """
+
+    def __init__(self, path, settle=1.5, waterfall=True, on_turn=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.settle = settle
+        self.waterfall = waterfall
+        self.on_turn = on_turn
+        self.queue = mp.Queue()
+        self.tracer = Tracer(self.queue)
+        self.turns = {}  # turn -> spans, until printed
+        self._arrived = {}  # turn -> when its latest span arrived
+        self.milestones = {name: [] for name, _, _ in MILESTONES}
+        self._file = open(self.path, "a")
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                span = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                span = None
+            if span is not None:
+                self._file.write(json.dumps(span) + "\n")
+                self._file.flush()
+                self.turns.setdefault(span["turn"], []).append(span)
+                self._arrived[span["turn"]] = time.monotonic()
+            self._complete(time.monotonic())
+
+    def _complete(self, now, force=False):
+        for turn in sorted(self.turns):
+            # Spans can arrive well after they end (the speech span is sent
+            # once the transcript is ready), so wait for both
+            last = max(max(s["end"] for s in self.turns[turn]), self._arrived.get(turn, 0.0))
+            if force or now > last + self.settle:
+                self._arrived.pop(turn, None)
+                self._report(turn, self.turns.pop(turn))
+
+    def _report(self, turn, spans):
+        offsets = turn_milestones(spans)
+        for name, value in offsets.items():
+            self.milestones[name].append(value)
+        if self.waterfall:
+            print(Fore.MAGENTA + format_waterfall(turn, spans))
+            print(Fore.MAGENTA + self.summary())
+        if self.on_turn:
+            self.on_turn(turn, spans, offsets)
+
+    def summary(self):
+        """p50/p95 of each milestone over the turns seen so far."""
+        parts = []
+        for name, values in self.milestones.items():
+            if values:
+                parts.append(
+                    f"{name} p50 {statistics.median(values) * 1000:.0f}ms p95 {_percentile(values, 0.95) * 1000:.0f}ms"
+                )
+        return "[Trace] " + (" | ".join(parts) if parts else "no complete turns")
+
+    def close(self):
+        """Report pending turns, write the Chrome trace and stop."""
+        self._closed.set()
+        self._thread.join()
+        while True:
+            try:
+                span = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self._file.write(json.dumps(span) + "\n")
+            self.turns.setdefault(span["turn"], []).append(span)
+        self._complete(time.monotonic(), force=True)
+        self._file.close()
+        chrome = self.path.with_suffix(".chrome.json")
+        export_chrome_trace(self.path, chrome)
+        print(Fore.MAGENTA + f"[Trace] Spans in {self.path}, Chrome trace in {chrome}")
+
+
+def turn_milestones(spans):
+    """Offsets (seconds) of MILESTONES from the end of speech in one turn's spans."""
+    origin = next((s["end"] for s in spans if s["name"] == "speech"), None)
+    if origin is None:
+        return {}
+    offsets = {}
+    for milestone, name, edge in MILESTONES:
+        times = [s[edge] for s in spans if s["name"] == name]
+        if times:
+            offsets[milestone] = (min(times) if edge == "start" else max(times)) - origin
+    return offsets
+
+
+def format_waterfall(turn, spans, width=40):
+    """Text waterfall of one turn, times relative to the end of the user's speech."""
+    spans = sorted(spans, key=lambda s: (s["start"], s["end"]))
+    origin = next((s["end"] for s in spans if s["name"] == "speech"), spans[0]["start"])
+    first = min(s["start"] for s in spans)
+    last = max(s["end"] for s in spans)
+    scale = width / max(last - first, 1e-6)
+    lines = [f"[Trace] Turn {turn} (ms from end of speech)"]
+    for s in spans:
+        lo = int((s["start"] - first) * scale)
+        hi = max(lo + 1, int((s["end"] - first) * scale))
+        bar = " " * lo + ("|" if s["end"] == s["start"] else "█" * (hi - lo))
+        label = s["name"] + (f" {s['args']['text']!r}" if "text" in s["args"] else "")
+        lines.append(
+            f"  {(s['start'] - origin) * 1000:8.0f} {(s['end'] - s['start']) * 1000:7.0f}  "
+            f"{bar:<{width + 1}} {s['process']}: {label[:50]}"
+        )
+    return "\n".join(lines)
+
+
+def export_chrome_trace(jsonl_path, out_path):
+    """Convert a JSONL trace into Chrome trace event format: a row per process, turns as args."""
+    spans = [json.loads(line) for line in Path(jsonl_path).read_text().splitlines() if line]
+    events = []
+    for pid, name in {(s["pid"], s["process"]) for s in spans}:
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+    for s in spans:
+        event = {
+            "name": s["name"],
+            "cat": f"turn {s['turn']}",
+            "ts": s["start"] * 1e6,
+            "pid": s["pid"],
+            "tid": 0,
+            "args": dict(s["args"], turn=s["turn"]),
+        }
+        if s["end"] > s["start"]:
+            event.update(ph="X", dur=(s["end"] - s["start"]) * 1e6)
+        else:
+            event.update(ph="i", s="t")
+        events.append(event)
+    Path(out_path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+if __name__ == "__main__":
+    # python -m voice_assist.utils.tracing data/traces/<trace>.jsonl
+    jsonl = Path(sys.argv[1])
+    turns = {}
+    for line in jsonl.read_text().splitlines():
+        if line:
+            span = json.loads(line)
+            turns.setdefault(span["turn"], []).append(span)
+    for turn, spans in sorted(turns.items()):
+        print(format_waterfall(turn, spans))
+    export_chrome_trace(jsonl, jsonl.with_suffix(".chrome.json"))
@@ -0,0 +1,83 @@
+import multiprocessing as mp
+
+
+class TurnTracker:
+    """
+    Process-shared counter of the current conversation turn.
+
+    Every queue message carries the turn it belongs to. Starting a new turn
+    (the user starts speaking, or says "stop.") makes all older work stale,
+    so each stage can drop or abort it without any queue flushing.
+
+    A turn started with begin_reply(), or marked with start_reply(), counts
+    as replying until the playback stage calls finish_reply() for it (its
+    last sentence has been heard) or a newer turn begins. Without barge-in,
+    the transcriber waits for that before answering the next utterance.
+    """
+
+    def __init__(self):
+        self._current = mp.Value("i", 0)
+        self._replying = mp.Value("i", 0)  # turn whose reply is being generated or played; 0 if none
+
+    @property
+    def current(self):
+        return self._current.value
+
+    def begin(self):
+        """Start a new turn, cancelling everything tagged with older ones."""
+        with self._current.get_lock():
+            self._current.value += 1
+            return self._current.value
+
+    def begin_reply(self):
+        """Start a new turn that expects a reply."""
+        with self._current.get_lock():
+            self._current.value += 1
+            self._replying.value = self._current.value
+            return self._current.value
+
+    def start_reply(self, turn_id):
+        """Mark an already begun turn as replying, unless it is stale."""
+        with self._current.get_lock():
+            if turn_id == self._current.value:
+                self._replying.value = turn_id
+
+    def finish_reply(self, turn_id):
+        with self._current.get_lock():
+            if self._replying.value == turn_id:
+                self._replying.value = 0
+
+    @property
+    def replying(self):
+        """True while the current turn's reply is still being generated or played."""
+        turn_id = self._replying.value
+        return turn_id != 0 and not self.is_stale(turn_id)
+
+    def is_stale(self, turn_id):
+        return turn_id != self._current.value
+
+    def token(self, turn_id):
+        return CancelToken(self, turn_id)
+
+
+class CancelToken:
+    """Cancelled as soon as a newer turn has begun."""
+
+    def __init__(self, tracker: TurnTracker, turn_id):
+        self.tracker = tracker
+        self.turn_id = turn_id
+
+    @property
+    def cancelled(self):
+        return self.tracker.is_stale(self.turn_id)
+
+
+class TurnQueue:
+    """Queue adapter that appends the turn id to every tuple put on it."""
+
+    def __init__(self, queue, turn_id):
+        self.queue = queue
+        self.turn_id = turn_id
+
+    def put(self, item):
+        self.queue.put(None if item is None else (*item, self.turn_id))
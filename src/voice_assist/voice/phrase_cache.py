@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+def normalize(text):
+    """Text variants that synthesize the same audio share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+class PhraseCache:
+    """
+    Content-addressed cache of synthesized audio, keyed by (engine, voice,
+    speed, normalized text).
+
+    Two tiers:
+    - memory: float32 arrays in an LRU capped at `memory_bytes`
+    - disk (optional, under `directory`): one raw int16 blob per phrase,
+      read back through np.memmap, plus index.json with its sample rate,
+      length, synthesis time and last use. The least recently used blobs
+      are deleted once the directory exceeds `disk_bytes`.
+    Disk hits are promoted to memory. Only phrases up to `max_chars` long
+    are cached, so one-off sentences don't evict the short replies that
+    recur. Every entry remembers how long it took to synthesize, which is
+    what each hit saves.
+    """
+
+    def __init__(self, directory=None, memory_bytes=32 << 20, disk_bytes=256 << 20, max_chars=80):
+        self.directory = Path(directory) if directory is not None else None
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.max_chars = max_chars
+        self._memory = OrderedDict()  # key -> (samples, sample_rate, synth_seconds)
+        self._memory_used = 0
+        self._index = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0  # synthesis time avoided by hits
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            index = self.directory / "index.json"
+            if index.exists():
+                self._index = json.loads(index.read_text())
+
+    @staticmethod
+    def key(engine, voice, speed, text):
+        return hashlib.sha1(f"{engine}|{voice}|{speed}|{normalize(text)}".encode()).hexdigest()
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._index
+
+    def cacheable(self, text):
+        return len(normalize(text)) <= self.max_chars
+
+    @property
+    def hit_rate(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+            "disk_entries": len(self._index),
+            "disk_bytes": sum(entry["bytes"] for entry in self._index.values()),
+        }
+
+    def get(self, key):
+        """Cached (samples, sample_rate) for `key`, or None. The samples are read-only."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                samples, rate, seconds = self._memory[key]
+                self.memory_hits += 1
+                self.saved_seconds += seconds
+                return samples, rate
+            entry = self._index.get(key)
+            if entry is not None:
+                try:
+                    blob = np.memmap(self.directory / f"{key}.pcm", dtype=np.int16, mode="r")
+                except FileNotFoundError:  # deleted behind our back
+                    del self._index[key]
+                    self.misses += 1
+                    return None
+                samples = blob.astype(np.float32) / 32767
+                del blob
+                entry["last_used"] = time.time()
+                self._remember(key, samples, entry["sample_rate"], entry["synth_seconds"])
+                self.disk_hits += 1
+                self.saved_seconds += entry["synth_seconds"]
+                return samples, entry["sample_rate"]
+            self.misses += 1
+            return None
+
+    def put(self, key, samples, sample_rate, synth_seconds=0.0, text=""):
+        samples = np.array(samples, dtype=np.float32).reshape(-1)  # own copy
+        with self._lock:
+            self._remember(key, samples, sample_rate, synth_seconds)
+            if self.directory is None or key in self._index:
+                return
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+            pcm.tofile(self.directory / f"{key}.pcm")
+            self._index[key] = {
+                "text": text,
+                "sample_rate": sample_rate,
+                "frames": len(pcm),
+                "bytes": pcm.nbytes,
+                "synth_seconds": synth_seconds,
+                "last_used": time.time(),
+            }
+            self._evict_disk()
+            self._save_index()
+
+    def _remember(self, key, samples, sample_rate, synth_seconds):
+        if key in self._memory:
+            self._memory_used -= self._memory.pop(key)[0].nbytes
+        samples.flags.writeable = False  # handed to every hit
+        self._memory[key] = (samples, sample_rate, synth_seconds)
+        self._memory_used += samples.nbytes
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, (old, _, _) = self._memory.popitem(last=False)
+            self._memory_used -= old.nbytes
+
+    def _evict_disk(self):
+        used = sum(entry["bytes"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if used <= self.disk_bytes:
+                break
+            used -= self._index.pop(key)["bytes"]
+            (self.directory / f"{key}.pcm").unlink(missing_ok=True)
+
+    def _save_index(self):
+        tmp = self.directory / "index.json.tmp"
+        tmp.write_text(json.dumps(self._index))
+        os.replace(tmp, self.directory / "index.json")
+
+    def flush(self):
+        """Persist last-use times, so disk eviction order survives a restart."""
+        if self.directory is not None:
+            with self._lock:
+                self._save_index()
@@ -0,0 +1,219 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import sounddevice as sd
+
+from voice_assist.transacription.resample import Resampler
+
+
+class Playback:
+    """One buffer queued on an AudioOutput."""
+
+    def __init__(self, samples, start, meta):
+        self.samples = samples  # float32 mono at the output rate
+        self.start = start  # output stream index of its first frame
+        self.meta = meta
+        self.offset = 0  # frames already handed to the device
+        self.cancelled = False
+
+    @property
+    def end(self):
+        return self.start + len(self.samples)
+
+
+class AudioOutput:
+    """
+    Speaker output that stays open for the life of the playback stage.
+
+    Instead of sd.play()/sd.wait() per buffer, which opens and tears down a
+    stream each time, play() converts a buffer to float32 mono at the
+    output rate (int16 Edge audio and float32 Kokoro audio alike, resampled
+    with a streaming Resampler per source rate) and appends it to a deque.
+    finish() plays out what the resamplers still hold back at the end of a
+    sentence; clear() drops it.
+    The PortAudio callback pops buffers from the other end; deque appends
+    and pops are atomic, so neither side takes a lock. Consecutive buffers
+    play back to back, and silence is output only when the queue runs dry.
+
+    Every frame has an index on the output timeline. The callback records
+    when the frame it is writing reaches the speaker (from the stream's
+    DAC time), so time_at() maps an index to wall-clock time; the echo
+    canceller and barge-in use it to know exactly what was audible when.
+
+    `output_stream` is any factory with sd.OutputStream's keyword arguments,
+    e.g. NullOutputStream for headless runs.
+    """
+
+    def __init__(self, samplerate=24000, channels=1, output_stream=sd.OutputStream, latency="low"):
+        self.samplerate = samplerate
+        self.channels = channels
+        self._queue = deque()
+        self._resamplers = {}  # source rate -> Resampler
+        self._written = 0  # frames handed to the device
+        self._queued_end = 0  # output index where the queued audio ends
+        self._clock = (time.time(), 0)  # (wall time the frame reaches the speaker, its index)
+        self._stream = output_stream(
+            samplerate=samplerate, channels=channels, dtype="float32", callback=self._callback, latency=latency
+        )
+        self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        while filled < frames:
+            try:
+                item = self._queue[0]
+            except IndexError:  # nothing queued (or cleared meanwhile)
+                break
+            if item.cancelled:
+                self._queue.popleft()
+                continue
+            n = min(frames - filled, len(item.samples) - item.offset)
+            out[filled : filled + n] = item.samples[item.offset : item.offset + n]
+            item.offset += n
+            filled += n
+            if item.offset == len(item.samples):
+                self._queue.popleft()
+        out[filled:] = 0.0
+        if self.channels > 1:
+            outdata[:, 1:] = outdata[:, :1]
+
+        latency = time_info.outputBufferDacTime - time_info.currentTime if time_info else 0.0
+        self._clock = (time.time() + latency, self._written)
+        self._written += frames
+
+    def _convert(self, samples, samplerate):
+        samples = np.asarray(samples)
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768
+        samples = samples.reshape(len(samples), -1).mean(axis=1, dtype=np.float32)
+        if samplerate == self.samplerate:
+            return samples
+        if samplerate not in self._resamplers:
+            self._resamplers[samplerate] = Resampler(samplerate, self.samplerate)
+        return self._resamplers[samplerate].process(samples)
+
+    def play(self, samples, samplerate, **meta):
+        """Queue a buffer to play after everything already queued; returns its Playback."""
+        samples = self._convert(samples, samplerate)
+        # Audio queued while the output is idle starts with the next callback
+        start = self.end
+        playback = Playback(samples, start, meta)
+        self._queued_end = playback.end
+        self._queue.append(playback)
+        return playback
+
+    def finish(self, **meta):
+        """
+        Queue the end of the sentence just played that the resamplers still
+        hold back (their filter delay), and start them afresh for the next
+        one. Returns its Playback, or None if nothing was held back.
+        """
+        tails = [resampler.flush() for resampler in self._resamplers.values()]
+        tail = np.concatenate(tails) if tails else np.zeros(0, dtype=np.float32)
+        if not len(tail):
+            return None
+        playback = Playback(tail, self.end, meta)
+        self._queued_end = playback.end
+        self._queue.append(playback)
+        return playback
+
+    def time_at(self, index):
+        """Wall-clock time (time.time()) at which output frame `index` is audible."""
+        clock, written = self._clock
+        return clock + (index - written) / self.samplerate
+
+    @property
+    def position(self):
+        """Index of the output frame audible now."""
+        clock, written = self._clock
+        return written + int((time.time() - clock) * self.samplerate)
+
+    @property
+    def end(self):
+        """Output index where the queued audio ends."""
+        return max(self._queued_end, self._written)
+
+    @property
+    def pending(self):
+        """Seconds of queued audio not audible yet."""
+        return max(0, self._queued_end - self.position) / self.samplerate
+
+    def clear(self):
+        """Drop everything not handed to the device yet; returns when the output falls silent."""
+        for item in list(self._queue):
+            item.cancelled = True
+        self._queue.clear()
+        for resampler in self._resamplers.values():
+            resampler.reset()
+        self._queued_end = self._written
+        return self.time_at(self._written)
+
+    def drain(self, poll_interval=0.01):
+        """Block until everything queued has been played."""
+        while self._queue or self.position < self._queued_end:
+            time.sleep(poll_interval)
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NullOutputStream:
+    """
+    Stand-in for sd.OutputStream with no device: a background thread pulls
+    blocks from the callback in real time, like a sound card would, and
+    drops them (or keeps them in `recorded` when record=True).
+    """
+
+    def __init__(
+        self,
+        samplerate,
+        channels=1,
+        dtype="float32",
+        callback=None,
+        blocksize=None,
+        latency=None,
+        record=False,
+    ):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.callback = callback
+        self.blocksize = blocksize or samplerate // 100  # 10 ms, like a typical device
+        self.recorded = [] if record else None
+        self._running = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        started = time.perf_counter()
+        delivered = 0
+        while self._running.is_set():
+            due = started + delivered / self.samplerate
+            time.sleep(max(0.0, due - time.perf_counter()))
+            block = np.empty((self.blocksize, self.channels), dtype=self.dtype)
+            self.callback(block, self.blocksize, None, None)
+            if self.recorded is not None:
+                self.recorded.append(block)
+            delivered += self.blocksize
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
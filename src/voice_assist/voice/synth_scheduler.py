@@ -0,0 +1,145 @@
+import itertools
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+
+class SynthesisJob:
+    """One sentence. Its audio chunks arrive on a queue while a worker synthesizes it."""
+
+    def __init__(self, seq, text, meta):
+        self.seq = seq
+        self.text = text
+        self.meta = meta
+        self.submitted = time.monotonic()  # all job times are time.monotonic()
+        self.started = None  # when a worker picked it up
+        self.first_chunk = None  # when its first chunk was ready
+        self.finished = None
+        self.cancelled = threading.Event()
+        self._chunks = queue.Queue()
+
+    def cancel(self):
+        self.cancelled.set()
+        self._chunks.put(None)  # wake a waiting consumer
+
+    def __iter__(self):
+        """Yield (samples, sample_rate) chunks as they are produced; re-raises a synthesis error."""
+        while True:
+            item = self._chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class SynthesisScheduler:
+    """
+    Synthesizes sentences on a pool of workers and hands them back in order.
+
+    Each worker thread owns one Vocalizer (one Kokoro session, or one Edge
+    TTS client), so up to len(vocalizers) sentences are synthesized at once;
+    ONNX Runtime releases the GIL while a session runs. submit() blocks
+    while `lookahead` sentences are waiting for the consumer, which bounds
+    how far synthesis runs ahead of playback. next() returns jobs in
+    submission order however they finish, and the consumer iterates a job's
+    chunks as they are produced, so the sentence being played still streams.
+    `stale(job)` is checked before a job starts and between its chunks;
+    stale jobs end early instead of synthesizing audio nobody will hear.
+    A job whose text is None synthesizes nothing; it marks a point in the
+    ordered stream, such as the end of a reply.
+    """
+
+    def __init__(self, vocalizers, lookahead=3, stale=None):
+        self.lookahead = lookahead
+        self.stale = stale or (lambda job: False)
+        self._seq = itertools.count()
+        self._window = threading.Semaphore(lookahead)  # free places for sentences ahead of playback
+        self._pending = queue.Queue()  # jobs no worker has picked up yet
+        self._ordered = queue.Queue()  # every job, in submission order
+        self.workers = [
+            threading.Thread(target=self._work, args=(vocalizer,), daemon=True) for vocalizer in vocalizers
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, text, **meta):
+        """Queue `text` for synthesis; `meta` is kept on the job for the consumer."""
+        self._window.acquire()
+        job = SynthesisJob(next(self._seq), text, meta)
+        self._ordered.put(job)
+        self._pending.put(job)
+        return job
+
+    def next(self, timeout=None):
+        """The next job in submission order (raises queue.Empty after `timeout`)."""
+        job = self._ordered.get(timeout=timeout)
+        self._window.release()
+        return job
+
+    def _work(self, vocalizer):
+        while True:
+            job = self._pending.get()
+            job.started = time.monotonic()
+            try:
+                if job.text is not None and not job.cancelled.is_set() and not self.stale(job):
+                    for chunk in vocalizer.create_audio_stream(job.text):
+                        if job.first_chunk is None:
+                            job.first_chunk = time.monotonic()
+                        job._chunks.put(chunk)
+                        if job.cancelled.is_set() or self.stale(job):
+                            break
+            except Exception as e:  # re-raised in the consumer
+                job._chunks.put(e)
+            job.finished = time.monotonic()
+            job._chunks.put(None)
+
+
+class GapMeter:
+    """
+    Silence between consecutive sentences of a reply that synthesis caused.
+
+    Call audio() whenever a chunk is handed to playback. The meter tracks
+    when the audio handed on so far finishes playing; at each sentence
+    boundary, the time from then until the sentence's first chunk is a gap.
+    If the sentence's text only arrived later (job.meta["arrived"], else
+    when it was submitted), the gap counts from its arrival: waiting for the
+    LLM is not synthesis's fault. A new turn resets the clock. Times are
+    time.monotonic(). Percentiles cover the last `window` boundaries; the
+    counts cover all of them.
+    """
+
+    def __init__(self, window=1000):
+        self.gaps = deque(maxlen=window)
+        self.boundaries = 0
+        self.audible = 0  # gaps over 10 ms
+        self._turn = None
+        self._seq = None
+        self.playing_until = None
+
+    def audio(self, job, samples, sample_rate, now=None):
+        now = time.monotonic() if now is None else now
+        turn = job.meta.get("turn")
+        if turn != self._turn:
+            self._turn, self.playing_until = turn, None
+        if self.playing_until is not None and job.seq != self._seq:
+            gap = max(0.0, now - max(self.playing_until, job.meta.get("arrived", job.submitted)))
+            self.gaps.append(gap)
+            self.boundaries += 1
+            self.audible += gap > 0.01
+        self._seq = job.seq
+        self.playing_until = max(self.playing_until or now, now) + len(samples) / sample_rate
+
+    def stats(self):
+        if not self.gaps:
+            return {"boundaries": 0, "gap_p50_s": 0.0, "gap_p95_s": 0.0, "gap_max_s": 0.0, "gaps": 0}
+        ordered = sorted(self.gaps)
+        return {
+            "boundaries": self.boundaries,
+            "gap_p50_s": round(statistics.median(ordered), 3),
+            "gap_p95_s": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+            "gap_max_s": round(ordered[-1], 3),
+            "gaps": self.audible,
+        }
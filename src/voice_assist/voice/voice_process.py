@@ -1,4 +1,8 @@
+import os
+import threading
 import soundfile as sf
+from voice_assist.voice.playback import AudioOutput
+from voice_assist.voice.synth_scheduler import SynthesisScheduler
 from voice_assist.voice.voice_synth import Vocalizer
 import sounddevice as sd
 from colorama import Fore
@@ -35,40 +39,61 @@ def create_speech(text, vocalizer, debug=False):
     play_audio(data, sample_rate)
 
 
-def speech_process(speech_queue):
-    """Example speech process that instantiates a single Vocalizer per process."""
-    vocalizer = Vocalizer()  # Only once per process
-    print(vocalizer, "Vocalizer object created for this process")
-    last_end_time = None  # track when last audio finished
-
-    while True:
-        text = speech_queue.get()  # blocking until next text
-        if text is None:  # Exit signal
-            break
-
-        # Clean text
-        text = "".join(
-            c for c in text if c.isalnum() or c.isspace() or c in ".,!?;:'\"-"
-        )
-        print(f"[Speech] {text}")
-
-        start_wait = time.time()
-        data, sample_rate = synthesize_speech(text, vocalizer)
-        wait_duration = time.time() - start_wait
-        print(f"[Metrics] Synthesis took {wait_duration:.3f}s")
-
-        # Measure playback duration
-        start_play = time.time()
-        if last_end_time is not None:
-            idle_time = start_play - last_end_time
-            print(f"[Metrics] Idle time before next speech: {idle_time:.3f}s")
-
-        play_audio(data, sample_rate)
-        end_play = time.time()
-        play_duration = end_play - start_play
-        print(f"[Metrics] Audio played | Duration: {play_duration:.3f}s")
-
-        last_end_time = end_play
+def speech_process(speech_queue, workers=2, lookahead=2):
+    """
+    Example speech process: sentences are synthesized by `workers` Vocalizers
+    in parallel, up to `lookahead` ahead of the one playing, and played in order.
+    Each chunk is queued on the speaker as soon as it is synthesized.
+    """
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    vocalizers = [Vocalizer(kokoro_threads=threads) for _ in range(workers)]  # Only once per process
+    print(vocalizers, "Vocalizer objects created for this process")
+    scheduler = SynthesisScheduler(vocalizers, lookahead=lookahead)
+
+    def submit_sentences():
+        while True:
+            text = speech_queue.get()  # blocking until next text
+            if text is None:  # Exit signal
+                scheduler.submit(None)
+                break
+
+            # Clean text
+            text = "".join(
+                c for c in text if c.isalnum() or c.isspace() or c in ".,!?;:'\"-"
+            )
+            print(f"[Speech] {text}")
+            scheduler.submit(text)
+
+    threading.Thread(target=submit_sentences, daemon=True).start()
+    last_end_time = None  # when the audio queued so far finishes playing
+
+    with AudioOutput() as output:
+        while True:
+            job = scheduler.next()
+            if job.text is None:
+                output.drain()
+                break
+
+            start_wait = time.time()
+            duration = 0.0
+            first = True
+            for samples, sample_rate in job:
+                if first:
+                    first = False
+                    start_play = time.time()
+                    print(f"[Metrics] Waited {start_play - start_wait:.3f}s for the first chunk")
+                    if last_end_time is not None:
+                        idle_time = start_play - last_end_time
+                        print(f"[Metrics] Idle time before next speech: {max(0.0, idle_time):.3f}s")
+                output.play(samples, sample_rate)
+                duration += len(samples) / sample_rate
+            output.finish()
+            if first:  # no audio for this sentence
+                continue
+
+            print(f"[Metrics] Synthesis took {job.finished - job.started:.3f}s")
+            print(f"[Metrics] Audio queued | Duration: {duration:.3f}s")
+            last_end_time = output.time_at(output.end)
 
 
 if __name__ == "__main__":
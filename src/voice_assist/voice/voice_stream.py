@@ -1,5 +1,6 @@
 import multiprocessing as mp
-from voice_assist.voice.voice_process import synthesize_speech, play_audio
+from voice_assist.voice.playback import AudioOutput
+from voice_assist.voice.voice_process import synthesize_speech
 from colorama import Fore
 
 def generate_audio_process(text: str, audio_buffer_queue: mp.Queue, debug= False) -> None:
@@ -19,9 +20,11 @@ def generate_audio_process(text: str, audio_buffer_queue: mp.Queue, debug= False
 
 def audio_output_process(audio_queue: mp.Queue, playback_active: mp.Event) -> None:
     """
-    Continuously play audio buffers from the queue.
-    Terminates when a sentinel value (None) is received.
+    Continuously play audio buffers from the queue on one long-lived output
+    stream, back to back. A sentinel value (None) marks the end of a reply:
+    playback_active is cleared once everything queued has been heard.
     """
+    output = AudioOutput()
     while True:
         item = audio_queue.get()  # blocking
         
@@ -30,11 +33,13 @@ def audio_output_process(audio_queue: mp.Queue, playback_active: mp.Event) -> No
                 if playback_active:
                     playback_active.set()   # 🔴 signal: audio is playing
                 audio_buffer, sample_rate = item
-                play_audio(audio_buffer, sample_rate)
+                output.play(audio_buffer, sample_rate)
+                output.finish()  # each item is a whole sentence
 
             except Exception as e:
                 print(Fore.RED + f"[Error] Failed to play audio: {e}")
         else:
+            output.drain()
             print("Playback Status ", playback_active)
             playback_active.clear()
             print("Playback Status ", playback_active)
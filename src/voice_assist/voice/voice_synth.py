@@ -1,11 +1,97 @@
 import asyncio
-import tempfile
-import os
+import queue
+import re
+import threading
+import time
+import aiohttp
+import av
 import numpy as np
-import soundfile as sf
+import onnxruntime as rt
 from kokoro_onnx import Kokoro
+from kokoro_onnx.config import MAX_PHONEME_LENGTH
 from edge_tts import Communicate
 import sounddevice as sd
+from voice_assist.voice.phrase_cache import PhraseCache
+
+EDGE_SAMPLE_RATE = 24000  # Edge TTS's default output format is 24 kHz mono MP3
+
+
+def phoneme_batches(phonemes, first=30, limit=MAX_PHONEME_LENGTH):
+    """
+    Split a phoneme string into batches for streaming synthesis. Batches end
+    at clause punctuation where possible; the first is at least `first`
+    phonemes and each later one at least twice the previous target, so
+    synthesis of the next batch stays ahead of playback of the current one.
+    A batch that would grow past three times the target is cut between words.
+    No batch is longer than `limit`, the most Kokoro accepts at once.
+    """
+    pieces = []
+    for clause in re.findall(r"[^.,!?;:]+[.,!?;:]*|[.,!?;:]+", phonemes):
+        clause = clause.strip()
+        while len(clause) > limit:  # very long clause: split at the last space that fits
+            cut = clause.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            pieces.append(clause[:cut])
+            clause = clause[cut:].strip()
+        if clause:
+            pieces.append(clause)
+
+    batch, target = "", first
+    for piece in pieces:
+        # A clause far longer than the target is split between words rather than delay the audio
+        while len(batch) + len(piece) > 3 * target:
+            cut = piece.find(" ", max(0, 2 * target - len(batch)))
+            if cut < 0:
+                break
+            yield f"{batch} {piece[:cut]}" if batch else piece[:cut]
+            batch, piece, target = "", piece[cut + 1 :], min(2 * target, limit)
+        if batch and len(batch) + 1 + len(piece) > limit:
+            yield batch
+            batch, target = "", min(2 * target, limit)
+        batch = f"{batch} {piece}" if batch else piece
+        if len(batch) >= target:
+            yield batch
+            batch, target = "", min(2 * target, limit)
+    if batch:
+        yield batch
+
+
+class MP3StreamDecoder:
+    """Incremental in-memory MP3 decoder: feed() bytes as they arrive, get float32 PCM back."""
+
+    def __init__(self):
+        self._codec = av.CodecContext.create("mp3", "r")
+        self._convert = av.AudioResampler(format="flt", layout="mono")  # whatever the decoder outputs
+        self.sample_rate = None
+
+    def _decode(self, packets):
+        pcm = []
+        for packet in packets:
+            for frame in self._codec.decode(packet):
+                self.sample_rate = frame.sample_rate
+                pcm += [converted.to_ndarray().reshape(-1) for converted in self._convert.resample(frame)]
+        return np.concatenate(pcm) if pcm else np.zeros(0, dtype=np.float32)
+
+    def feed(self, data):
+        return self._decode(self._codec.parse(data))
+
+    def flush(self):
+        return self._decode(self._codec.parse(b"") + [None])
+
+
+class _SharedConnector(aiohttp.TCPConnector):
+    """
+    Connector kept across Edge TTS requests, so DNS lookups are cached between
+    sentences. edge_tts opens and closes a ClientSession per request, and
+    closing a session closes its connector; that close is ignored here and
+    shutdown() does it instead.
+    """
+
+    async def close(self, *args, **kwargs):
+        pass
+
+    async def shutdown(self):
+        await super().close()
 
 
 class Vocalizer:
@@ -16,13 +102,23 @@ class Vocalizer:
         kokoro_voices_path="src/voice_assist/voice/kokoro/voices-v1.0.bin",
         kokoro_voice="af_bella",
         kokoro_speed=1.25,
-        edge_voice="en-US-AvaNeural"
+        edge_voice="en-US-AvaNeural",
+        kokoro_first_batch=30,  # phonemes in the first streamed chunk (~2 s of speech)
+        edge_chunk_seconds=0.5,  # decoded Edge audio handed on at a time
+        cache=None,  # PhraseCache for phrases that recur
+        kokoro_threads=0,  # ONNX Runtime intra-op threads; 0 uses every core
     ):
         self.kokoro_model_path = kokoro_model_path
         self.kokoro_voices_path = kokoro_voices_path
         self.kokoro_voice = kokoro_voice
         self.kokoro_speed = kokoro_speed
         self.edge_voice = edge_voice
+        self.kokoro_first_batch = kokoro_first_batch
+        self.edge_chunk_seconds = edge_chunk_seconds
+        self.cache = cache
+        self.kokoro_threads = kokoro_threads
+        self._loop = None  # event loop thread for Edge TTS, started on first use
+        self._connector = None
 
         self.engine = None
         self.model = None
@@ -34,15 +130,63 @@ class Vocalizer:
         self.engine = engine
 
         if engine == "kokoro":
-            self.model = Kokoro(self.kokoro_model_path, self.kokoro_voices_path)
+            if self.kokoro_threads:
+                # Several sessions run side by side; keep them from oversubscribing the cores
+                options = rt.SessionOptions()
+                options.intra_op_num_threads = self.kokoro_threads
+                options.inter_op_num_threads = 1
+                session = rt.InferenceSession(self.kokoro_model_path, options, providers=["CPUExecutionProvider"])
+                self.model = Kokoro.from_session(session, self.kokoro_voices_path)
+            else:
+                self.model = Kokoro(self.kokoro_model_path, self.kokoro_voices_path)
             print(f"[Vocalizer] Switched to Kokoro (voice={self.kokoro_voice}, speed={self.kokoro_speed})")
         elif engine == "edge":
             self.model = None  # Edge TTS doesn’t preload a model
+            self._start_loop()
             print(f"[Vocalizer] Switched to Edge TTS (voice={self.edge_voice})")
         else:
             raise ValueError("engine must be 'kokoro' or 'edge'")
 
+    def _cache_key(self, text):
+        if self.engine == "kokoro":
+            return PhraseCache.key("kokoro", self.kokoro_voice, self.kokoro_speed, text)
+        return PhraseCache.key(self.engine, self.edge_voice, 1.0, text)
+
     def create_audio(self, text):
+        """Synthesize `text`, or return it from the phrase cache."""
+        if self.cache is None or not self.cache.cacheable(text):
+            return self._synthesize(text)
+        key = self._cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        samples, sample_rate = self._synthesize(text)
+        if len(samples):
+            self.cache.put(key, samples, sample_rate, time.perf_counter() - start, text)
+        return samples, sample_rate
+
+    def prewarm(self, phrases):
+        """
+        Synthesize any of `phrases` not cached yet; returns how many were.
+        A phrase that fails (e.g. Edge TTS unreachable) is skipped and
+        synthesized when it is first spoken instead.
+        """
+        missing = [p for p in phrases if self.cache.cacheable(p) and self._cache_key(p) not in self.cache]
+        warmed = 0
+        for phrase in missing:
+            start = time.perf_counter()
+            try:
+                samples, sample_rate = self._synthesize(phrase)
+            except Exception as e:
+                print(f"[Vocalizer] Could not prewarm {phrase!r}: {e}")
+                continue
+            if len(samples):
+                self.cache.put(self._cache_key(phrase), samples, sample_rate, time.perf_counter() - start, phrase)
+                warmed += 1
+        return warmed
+
+    def _synthesize(self, text):
         if self.engine == "kokoro":
             samples, sample_rate = self.model.create(
                 text,
@@ -53,31 +197,98 @@ class Vocalizer:
             return samples, sample_rate
 
         elif self.engine == "edge":
-            return self._edge_tts_to_buffer(text)
+            chunks = list(self._edge_stream(text))
+            if not chunks:  # nothing speakable, e.g. only punctuation
+                return np.zeros(0, dtype=np.float32), EDGE_SAMPLE_RATE
+            return np.concatenate([samples for samples, _ in chunks]), chunks[0][1]
 
         else:
             raise RuntimeError("Engine not set. Call use('kokoro') or use('edge').")
 
-    def _edge_tts_to_buffer(self, text):
-        """Run Edge TTS → return (samples, sample_rate) without writing permanent files."""
-        tmpfile = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        tmpfile.close()  # let Edge TTS write into it
-        asyncio.run(self._edge_tts_to_file(text, tmpfile.name))
+    def create_audio_stream(self, text):
+        """
+        Yield (samples, sample_rate) chunks of `text` as they are synthesized,
+        so playback can start on the first while later ones are produced.
+        Kokoro synthesizes the sentence in phoneme batches (see
+        phoneme_batches()); Edge TTS audio is decoded as it downloads and
+        handed on edge_chunk_seconds at a time. A cached phrase comes as one
+        chunk, and a phrase streamed to the end is added to the cache.
+        """
+        if self.cache is None or not self.cache.cacheable(text):
+            yield from self._synthesize_stream(text)
+            return
+        key = self._cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        start = time.perf_counter()
+        chunks = []
+        for samples, sample_rate in self._synthesize_stream(text):
+            chunks.append(samples.reshape(-1))
+            yield samples, sample_rate
+        if chunks:
+            self.cache.put(key, np.concatenate(chunks), sample_rate, time.perf_counter() - start, text)
+
+    def _synthesize_stream(self, text):
+        if self.engine == "kokoro":
+            phonemes = self.model.tokenizer.phonemize(text, "en-us")
+            for batch in phoneme_batches(phonemes, self.kokoro_first_batch):
+                yield self.model.create(batch, voice=self.kokoro_voice, speed=self.kokoro_speed, is_phonemes=True)
+        else:
+            yield from self._edge_stream(text)
+
+    def _start_loop(self):
+        """One event loop thread for all Edge TTS requests, instead of asyncio.run() per sentence."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+        async def connector():
+            return _SharedConnector(ttl_dns_cache=300)
+
+        self._connector = asyncio.run_coroutine_threadsafe(connector(), self._loop).result()
 
-        data, sample_rate = sf.read(tmpfile.name, dtype='int16')
-        os.remove(tmpfile.name)
+    def _edge_stream(self, text):
+        """Stream Edge TTS MP3 from the loop thread and decode it here, in memory."""
+        received = queue.Queue()
 
-        if not isinstance(data, np.ndarray):
-            data = np.array(data, dtype=np.int16)
+        async def download():
+            try:
+                communicate = Communicate(text, self.edge_voice, connector=self._connector)
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        received.put(chunk["data"])
+                received.put(None)
+            except Exception as e:  # re-raised in the consuming thread
+                received.put(e)
 
-        return data, sample_rate
+        future = asyncio.run_coroutine_threadsafe(download(), self._loop)
+        decoder = MP3StreamDecoder()
+        pending, frames = [], 0
+        try:
+            while True:
+                data = received.get()
+                if isinstance(data, Exception):
+                    raise data
+                pcm = decoder.feed(data) if data is not None else decoder.flush()
+                pending.append(pcm)
+                frames += len(pcm)
+                if frames and (data is None or frames >= self.edge_chunk_seconds * decoder.sample_rate):
+                    yield np.concatenate(pending), decoder.sample_rate
+                    pending, frames = [], 0
+                if data is None:
+                    return
+        finally:
+            future.cancel()  # stop downloading if the consumer gave up (barge-in)
 
-    async def _edge_tts_to_file(self, text, filename):
-        communicate = Communicate(text, self.edge_voice)
-        with open(filename, "wb") as out:
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    out.write(chunk["data"])
+    def close(self):
+        """Stop the Edge TTS event loop thread."""
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._connector.shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = self._connector = None
 
 
 if __name__ == "__main__":